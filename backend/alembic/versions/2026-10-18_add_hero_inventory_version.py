@@ -0,0 +1,30 @@
+"""add hero inventory version
+
+Revision ID: 9d2c4e6b7a15
+Revises: 3f7b9e1c5a20
+Create Date: 2026-10-18 18:02:41.207315
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "9d2c4e6b7a15"
+down_revision = "3f7b9e1c5a20"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "heroes",
+        sa.Column(
+            "inventory_version", sa.Integer(), server_default="0", nullable=False
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("heroes", "inventory_version")
@@ -0,0 +1,30 @@
+"""add in-progress sessions index
+
+Revision ID: 5b1f0c7a9d42
+Revises: 022da91158a0
+Create Date: 2026-10-18 09:12:31.418207
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "5b1f0c7a9d42"
+down_revision = "022da91158a0"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_sessions_in_progress_started_at",
+        "sessions",
+        ["started_at"],
+        postgresql_where=sa.text("status IN ('pending', 'active')"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_sessions_in_progress_started_at", table_name="sessions")
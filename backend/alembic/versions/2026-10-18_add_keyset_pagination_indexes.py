@@ -0,0 +1,33 @@
+"""add keyset pagination indexes
+
+Revision ID: 3f7b9e1c5a20
+Revises: c4a92e7d18b3
+Create Date: 2026-10-18 16:24:09.531842
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "3f7b9e1c5a20"
+down_revision = "c4a92e7d18b3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_task_templates_owner_created_at",
+        "task_templates",
+        ["tenant_id", "user_id", "created_at", "id"],
+    )
+    op.create_index(
+        "ix_sessions_owner_started_at",
+        "sessions",
+        ["tenant_id", "user_id", "started_at", "id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_sessions_owner_started_at", table_name="sessions")
+    op.drop_index("ix_task_templates_owner_created_at", table_name="task_templates")
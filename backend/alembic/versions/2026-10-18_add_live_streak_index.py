@@ -0,0 +1,30 @@
+"""add live streak index
+
+Revision ID: 8e3d6a2f41c7
+Revises: 5b1f0c7a9d42
+Create Date: 2026-10-18 11:03:52.760914
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "8e3d6a2f41c7"
+down_revision = "5b1f0c7a9d42"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_world_states_live_streak_last_session",
+        "world_states",
+        ["last_session_date", "id"],
+        postgresql_where=sa.text("day_streak > 0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_world_states_live_streak_last_session", table_name="world_states")
@@ -0,0 +1,30 @@
+"""add tenant slug pattern index
+
+Revision ID: d3a7e51c8b06
+Revises: b7e2c9d4f153
+Create Date: 2026-10-18 21:05:47.230914
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "d3a7e51c8b06"
+down_revision = "b7e2c9d4f153"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # The unique constraint's index only serves LIKE prefixes in the C
+    # collation; this one does in any.
+    op.create_index(
+        "ix_tenant_slug_pattern",
+        "tenant",
+        ["slug"],
+        postgresql_ops={"slug": "varchar_pattern_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tenant_slug_pattern", table_name="tenant")
@@ -0,0 +1,103 @@
+"""create focus daily stats
+
+Revision ID: b7e2c9d4f153
+Revises: 6a8f3d1e9c24
+Create Date: 2026-10-18 19:42:31.508213
+
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "b7e2c9d4f153"
+down_revision = "6a8f3d1e9c24"
+branch_labels = None
+depends_on = None
+
+session_room_enum = postgresql.ENUM(
+    "study_room",
+    "build_room",
+    "training_room",
+    name="session_room",
+    create_type=False,
+)
+
+COUNTERS = (
+    "sessions_success",
+    "sessions_cancel",
+    "sessions_timeout",
+    "minutes_focused",
+    "reward_exp",
+    "reward_gold",
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "focus_daily_stats",
+        sa.Column(
+            "tenant_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("tenant.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column(
+            "user_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("user.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("room", session_room_enum, nullable=False),
+        *(
+            sa.Column(name, sa.Integer(), nullable=False, server_default="0")
+            for name in COUNTERS
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("now()"),
+        ),
+        sa.PrimaryKeyConstraint(
+            "tenant_id",
+            "user_id",
+            "day",
+            "room",
+            name="focus_daily_stats_pkey",
+        ),
+    )
+    op.create_index(
+        "ix_focus_daily_stats_tenant_day",
+        "focus_daily_stats",
+        ["tenant_id", "day"],
+    )
+
+    # Backfill from the sessions finished so far.
+    op.execute(
+        """
+        INSERT INTO focus_daily_stats
+            (tenant_id, user_id, day, room, sessions_success, sessions_cancel,
+             sessions_timeout, minutes_focused, reward_exp, reward_gold)
+        SELECT s.tenant_id, s.user_id, (s.ended_at AT TIME ZONE 'UTC')::date,
+            s.room,
+            count(*) FILTER (WHERE s.status = 'success'),
+            count(*) FILTER (WHERE s.status = 'cancel'),
+            count(*) FILTER (WHERE s.status = 'timeout'),
+            coalesce(sum(s.duration_minutes) FILTER (WHERE s.status = 'success'), 0),
+            coalesce(sum(s.reward_exp), 0),
+            coalesce(sum(s.reward_gold), 0)
+        FROM sessions AS s
+        WHERE s.status IN ('success', 'cancel', 'timeout')
+          AND s.ended_at IS NOT NULL
+        GROUP BY 1, 2, 3, 4
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_focus_daily_stats_tenant_day", table_name="focus_daily_stats")
+    op.drop_table("focus_daily_stats")
@@ -0,0 +1,102 @@
+"""create leaderboard scores
+
+Revision ID: c4a92e7d18b3
+Revises: 8e3d6a2f41c7
+Create Date: 2026-10-18 13:26:08.114562
+
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "c4a92e7d18b3"
+down_revision = "8e3d6a2f41c7"
+branch_labels = None
+depends_on = None
+
+leaderboard_period_enum = postgresql.ENUM(
+    "daily",
+    "weekly",
+    "all_time",
+    name="leaderboard_period",
+    create_type=False,
+)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    leaderboard_period_enum.create(bind, checkfirst=True)
+
+    op.create_table(
+        "leaderboard_scores",
+        sa.Column(
+            "tenant_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("tenant.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("period", leaderboard_period_enum, nullable=False),
+        sa.Column("period_start", sa.Date(), nullable=False),
+        sa.Column(
+            "user_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("user.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("score", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("now()"),
+        ),
+        sa.PrimaryKeyConstraint(
+            "tenant_id",
+            "period",
+            "period_start",
+            "user_id",
+            name="leaderboard_scores_pkey",
+        ),
+    )
+    op.create_index(
+        "ix_leaderboard_scores_ranking",
+        "leaderboard_scores",
+        [
+            "tenant_id",
+            "period",
+            "period_start",
+            sa.text("score DESC"),
+            "user_id",
+        ],
+    )
+
+    # Backfill from the sessions completed so far.
+    op.execute(
+        """
+        INSERT INTO leaderboard_scores
+            (tenant_id, period, period_start, user_id, score)
+        SELECT s.tenant_id, p.period, p.period_start, s.user_id, sum(s.reward_exp)
+        FROM sessions AS s
+        CROSS JOIN LATERAL (
+            VALUES
+                ('daily'::leaderboard_period,
+                 (s.ended_at AT TIME ZONE 'UTC')::date),
+                ('weekly'::leaderboard_period,
+                 date_trunc('week', s.ended_at AT TIME ZONE 'UTC')::date),
+                ('all_time'::leaderboard_period, DATE '1970-01-01')
+        ) AS p (period, period_start)
+        WHERE s.status = 'success' AND s.ended_at IS NOT NULL
+        GROUP BY s.tenant_id, p.period, p.period_start, s.user_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_leaderboard_scores_ranking", table_name="leaderboard_scores")
+    op.drop_table("leaderboard_scores")
+
+    bind = op.get_bind()
+    leaderboard_period_enum.drop(bind, checkfirst=True)
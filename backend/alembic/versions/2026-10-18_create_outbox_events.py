@@ -0,0 +1,42 @@
+"""create outbox events
+
+Revision ID: 6a8f3d1e9c24
+Revises: 9d2c4e6b7a15
+Create Date: 2026-10-18 19:11:52.604118
+
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "6a8f3d1e9c24"
+down_revision = "9d2c4e6b7a15"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "outbox_events",
+        sa.Column("id", sa.BigInteger(), sa.Identity(), nullable=False),
+        sa.Column("event_type", sa.String(length=64), nullable=False),
+        sa.Column("tenant_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("payload", postgresql.JSONB(), nullable=False),
+        sa.Column(
+            "occurred_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_outbox_events_user_id_id", "outbox_events", ["user_id", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_outbox_events_user_id_id", table_name="outbox_events")
+    op.drop_table("outbox_events")
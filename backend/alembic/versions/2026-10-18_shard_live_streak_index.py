@@ -0,0 +1,41 @@
+"""shard live streak index
+
+Revision ID: e81f4b2c6d93
+Revises: d3a7e51c8b06
+Create Date: 2026-10-18 16:42:07.318254
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e81f4b2c6d93"
+down_revision = "d3a7e51c8b06"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_world_states_live_streak_shard",
+        "world_states",
+        [
+            sa.text("((hashtext(tenant_id::text) & 2147483647) % 64)"),
+            "last_session_date",
+            "id",
+        ],
+        postgresql_where=sa.text("day_streak > 0"),
+    )
+    op.drop_index("ix_world_states_live_streak_last_session", table_name="world_states")
+
+
+def downgrade() -> None:
+    op.create_index(
+        "ix_world_states_live_streak_last_session",
+        "world_states",
+        ["last_session_date", "id"],
+        postgresql_where=sa.text("day_streak > 0"),
+    )
+    op.drop_index("ix_world_states_live_streak_shard", table_name="world_states")
@@ -0,0 +1,5 @@
+"""Benchmarks for hot API paths.
+
+Run from ``backend/`` against a migrated database, e.g.
+``python -m benchmarks.session_complete``.
+"""
@@ -0,0 +1,180 @@
+"""Completions under pool saturation, with and without admission control.
+
+Each of ``--players`` players completes ``--completions`` finished timers one
+after the other. Meanwhile ``--readers`` clients list session history
+without pause, far more requests than the pool has connections, backing
+off for ``Retry-After`` when shed like the mobile clients do. The run
+happens twice, with ADMISSION_CONTROL_ENABLED off and then on. Each run
+reports completion latency and throughput, and how many history requests
+were shed with a 503. The pool should be small enough to saturate
+in-process::
+
+    DATABASE_POOL_SIZE=4 DATABASE_POOL_MAX_OVERFLOW=0 \
+        python -m benchmarks.admission --players 8 --readers 64
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from types import SimpleNamespace
+
+import httpx
+
+from benchmarks.common import (
+    LatencySummary,
+    create_finished_timers,
+    create_player,
+    write_results,
+)
+from src.auth.services.users import jwt_strategy
+from src.config import settings
+from src.database import async_session_factory, engine
+from src.main import app
+
+
+async def complete_all(
+    client: httpx.AsyncClient,
+    headers: dict[str, str],
+    session_ids: list,
+    samples: list[float],
+) -> None:
+    for session_id in session_ids:
+        started = time.perf_counter()
+        response = await client.post(
+            "/api/session/complete",
+            headers=headers,
+            json={"session_id": str(session_id)},
+        )
+        samples.append(time.perf_counter() - started)
+        response.raise_for_status()
+
+
+async def read_history(
+    client: httpx.AsyncClient,
+    headers: dict[str, str],
+    done: asyncio.Event,
+    samples: list[float],
+    statuses: dict[int, int],
+) -> None:
+    while not done.is_set():
+        started = time.perf_counter()
+        response = await client.get("/api/sessions/history?limit=20", headers=headers)
+        samples.append(time.perf_counter() - started)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        if retry_after := response.headers.get("Retry-After"):
+            await asyncio.sleep(int(retry_after))
+
+
+async def run(
+    client: httpx.AsyncClient,
+    players: list[dict[str, str]],
+    completions: int,
+    readers: int,
+    admission: bool,
+) -> list[LatencySummary]:
+    settings.ADMISSION_CONTROL_ENABLED = admission
+    timers = []
+    async with async_session_factory() as session:
+        for player in players:
+            timers.append(
+                await create_finished_timers(session, player["player"], completions)
+            )
+
+    done = asyncio.Event()
+    complete_samples: list[float] = []
+    history_samples: list[float] = []
+    statuses: dict[int, int] = {}
+    label = "on" if admission else "off"
+    reader_tasks = [
+        asyncio.create_task(
+            read_history(
+                client,
+                players[index % len(players)]["headers"],
+                done,
+                history_samples,
+                statuses,
+            )
+        )
+        for index in range(readers)
+    ]
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(
+            *(
+                complete_all(client, player["headers"], ids, complete_samples)
+                for player, ids in zip(players, timers, strict=True)
+            )
+        )
+    finally:
+        elapsed = time.perf_counter() - started
+        done.set()
+        await asyncio.gather(*reader_tasks)
+
+    return [
+        LatencySummary.from_samples(
+            f"admission {label} complete",
+            complete_samples,
+            requests_per_second=round(len(complete_samples) / elapsed, 1),
+        ),
+        LatencySummary.from_samples(
+            f"admission {label} history",
+            history_samples,
+            ok=statuses.get(200, 0),
+            shed=statuses.get(503, 0),
+            other=sum(
+                count for code, count in statuses.items() if code not in (200, 503)
+            ),
+        ),
+    ]
+
+
+async def main(
+    players: int, completions: int, readers: int, output: str | None
+) -> None:
+    print(
+        f"pool: size={settings.DATABASE_POOL_SIZE} "
+        f"overflow={settings.DATABASE_POOL_MAX_OVERFLOW}"
+    )
+    accounts = []
+    async with async_session_factory() as session:
+        for _ in range(players):
+            player = await create_player(session)
+            token = await jwt_strategy.write_token(SimpleNamespace(id=player.user_id))
+            accounts.append(
+                {"player": player, "headers": {"Authorization": f"Bearer {token}"}}
+            )
+
+    summaries: list[LatencySummary] = []
+    try:
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://bench", timeout=120
+            ) as client:
+                for account in accounts:
+                    # Warm-up, also creates the hero on the first request.
+                    response = await client.get(
+                        "/api/sessions/history", headers=account["headers"]
+                    )
+                    response.raise_for_status()
+                for admission in (False, True):
+                    summaries.extend(
+                        await run(client, accounts, completions, readers, admission)
+                    )
+    finally:
+        await engine.dispose()
+    write_results(output, summaries)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--players", type=int, default=8)
+    parser.add_argument("--completions", type=int, default=20, help="per player")
+    parser.add_argument("--readers", type=int, default=64)
+    parser.add_argument("--output", default=None, help="write JSON results here")
+    args = parser.parse_args()
+    asyncio.run(main(args.players, args.completions, args.readers, args.output))
@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import json
+import statistics
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any
+from uuid import UUID, uuid4
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from src.auth.models import Tenant, User, UserTenant, UserTenantRole
+from src.game.enums import Room, SessionStatus
+from src.game.models import Session, TaskTemplate
+
+
+@dataclass
+class RoundTripCounter:
+    """Counts BEGIN/COMMIT/ROLLBACK plus every statement sent to the server."""
+
+    statements: int = 0
+    transactions: int = 0
+
+    @property
+    def round_trips(self) -> int:
+        return self.statements + self.transactions
+
+
+@contextmanager
+def count_round_trips(engine: AsyncEngine) -> Iterator[RoundTripCounter]:
+    counter = RoundTripCounter()
+    sync_engine = engine.sync_engine
+
+    def on_statement(*_args, **_kwargs) -> None:
+        counter.statements += 1
+
+    def on_transaction(*_args, **_kwargs) -> None:
+        counter.transactions += 1
+
+    hooks = [
+        ("before_cursor_execute", on_statement),
+        ("begin", on_transaction),
+        ("commit", on_transaction),
+        ("rollback", on_transaction),
+    ]
+    for name, hook in hooks:
+        event.listen(sync_engine, name, hook)
+    try:
+        yield counter
+    finally:
+        for name, hook in hooks:
+            event.remove(sync_engine, name, hook)
+
+
+# Statements of the request the current task is waiting on. ASGITransport
+# runs the app inline in the caller's task, so the app sees this value.
+_task_statements: ContextVar[list[int] | None] = ContextVar(
+    "benchmark_task_statements", default=None
+)
+
+
+def _count_task_statement(*_args, **_kwargs) -> None:
+    counter = _task_statements.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+def count_task_statements(engine: AsyncEngine) -> None:
+    """Make :func:`task_statements` see the statements of ``engine``."""
+    event.listen(engine.sync_engine, "before_cursor_execute", _count_task_statement)
+
+
+@contextmanager
+def task_statements() -> Iterator[list[int]]:
+    """Count statements run by this task, e.g. an in-process ASGI request.
+
+    The count is ``counter[0]``; unlike :func:`count_round_trips` it is not
+    mixed up with concurrent requests.
+    """
+    counter = [0]
+    token = _task_statements.set(counter)
+    try:
+        yield counter
+    finally:
+        _task_statements.reset(token)
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+@dataclass
+class LatencySummary:
+    name: str
+    count: int
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    mean_ms: float
+    extra: dict[str, float] = field(default_factory=dict)
+
+    @classmethod
+    def from_samples(
+        cls, name: str, samples: list[float], **extra: float
+    ) -> "LatencySummary":
+        millis = [sample * 1000 for sample in samples]
+        return cls(
+            name=name,
+            count=len(millis),
+            p50_ms=round(percentile(millis, 50), 3),
+            p95_ms=round(percentile(millis, 95), 3),
+            p99_ms=round(percentile(millis, 99), 3),
+            mean_ms=round(statistics.fmean(millis), 3) if millis else 0.0,
+            extra=extra,
+        )
+
+    def render(self) -> str:
+        extras = " ".join(f"{key}={value}" for key, value in self.extra.items())
+        return (
+            f"{self.name:<28} n={self.count:<6} p50={self.p50_ms:>8.3f}ms "
+            f"p95={self.p95_ms:>8.3f}ms p99={self.p99_ms:>8.3f}ms {extras}"
+        ).rstrip()
+
+
+def write_results(
+    path: str | None,
+    summaries: list[LatencySummary],
+    meta: dict[str, Any] | None = None,
+) -> None:
+    """Print the summaries and optionally save them as JSON.
+
+    With ``meta`` the file holds ``{"meta": ..., "results": [...]}``,
+    otherwise just the list; ``benchmarks.compare`` reads both.
+    """
+    for summary in summaries:
+        print(summary.render())
+    if path:
+        results = [asdict(summary) for summary in summaries]
+        payload = results if meta is None else {"meta": meta, "results": results}
+        Path(path).write_text(json.dumps(payload, indent=2, default=str))
+
+
+@dataclass
+class Player:
+    user_id: UUID
+    tenant_id: UUID
+    template_id: UUID
+
+
+async def create_player(session: AsyncSession, *, room: Room = Room.STUDY) -> Player:
+    """Insert a user, a tenant membership and a task template."""
+    suffix = uuid4().hex[:12]
+    user = User(
+        id=uuid4(),
+        email=f"bench-{suffix}@example.com",
+        hashed_password="!",
+        is_active=True,
+        is_verified=True,
+    )
+    tenant = Tenant(id=uuid4(), name=f"Bench {suffix}", slug=f"bench-{suffix}")
+    template = TaskTemplate(
+        id=uuid4(),
+        tenant_id=tenant.id,
+        user_id=user.id,
+        name="Bench",
+        default_duration_minutes=25,
+        room=room,
+    )
+    session.add_all([user, tenant])
+    await session.flush()
+    session.add_all(
+        [
+            UserTenant(
+                user_id=user.id,
+                tenant_id=tenant.id,
+                role=UserTenantRole.OWNER,
+                is_default=True,
+            ),
+            template,
+        ]
+    )
+    await session.commit()
+    return Player(user_id=user.id, tenant_id=tenant.id, template_id=template.id)
+
+
+async def create_finished_timers(
+    session: AsyncSession,
+    player: Player,
+    count: int,
+    *,
+    duration_minutes: int = 25,
+) -> list[UUID]:
+    """Insert pending sessions whose completion window has already elapsed."""
+    started_at = datetime.now(UTC) - timedelta(minutes=duration_minutes * 2)
+    ids = [uuid4() for _ in range(count)]
+    session.add_all(
+        [
+            Session(
+                id=session_id,
+                tenant_id=player.tenant_id,
+                user_id=player.user_id,
+                task_template_id=player.template_id,
+                duration_minutes=duration_minutes,
+                room=Room.STUDY,
+                started_at=started_at + timedelta(seconds=index),
+                status=SessionStatus.PENDING,
+            )
+            for index, session_id in enumerate(ids)
+        ]
+    )
+    await session.commit()
+    return ids
@@ -0,0 +1,61 @@
+"""Compare two saved benchmark runs.
+
+Reads JSON written by any benchmark's ``--output`` and prints, for each
+result name present in both, the p50/p95/p99 of the baseline and the
+candidate with the relative change, plus any extra numbers that differ.
+
+python -m benchmarks.compare baseline.json candidate.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+from typing import Any
+
+PERCENTILES = ("p50_ms", "p95_ms", "p99_ms")
+
+
+def load(path: str) -> tuple[dict[str, Any], dict[str, dict[str, Any]]]:
+    payload = json.loads(Path(path).read_text())
+    if isinstance(payload, list):
+        payload = {"meta": {}, "results": payload}
+    return payload["meta"], {result["name"]: result for result in payload["results"]}
+
+
+def change(before: float, after: float) -> str:
+    if not before:
+        return "    n/a"
+    return f"{(after - before) / before:+7.1%}"
+
+
+def main(baseline: str, candidate: str) -> None:
+    before_meta, before = load(baseline)
+    after_meta, after = load(candidate)
+    print(
+        f"baseline {before_meta.get('commit') or baseline} -> "
+        f"candidate {after_meta.get('commit') or candidate}"
+    )
+    for name in sorted(before.keys() & after.keys()):
+        old, new = before[name], after[name]
+        columns = " ".join(
+            f"{key[:3]}={old[key]:.3f}->{new[key]:.3f}ms {change(old[key], new[key])}"
+            for key in PERCENTILES
+        )
+        extras = " ".join(
+            f"{key}={value}->{new['extra'][key]}"
+            for key, value in old["extra"].items()
+            if key in new["extra"] and new["extra"][key] != value
+        )
+        print(f"{name:<28} {columns} {extras}".rstrip())
+    for name in sorted(before.keys() ^ after.keys()):
+        print(f"{name:<28} only in {'baseline' if name in before else 'candidate'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    args = parser.parse_args()
+    main(args.baseline, args.candidate)
@@ -0,0 +1,143 @@
+"""Cosmetic drop sampling, linear rarity scan vs. alias-method drop tables.
+
+Runs in memory on synthetic catalogs; no database access.
+
+python -m benchmarks.drop_tables --sizes 100 10000 100000 --draws 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import time
+from collections.abc import Iterable, Sequence
+from uuid import uuid4
+
+from benchmarks.common import LatencySummary, write_results
+from src.game.catalog import CatalogItem, ItemCatalog
+from src.game.drops import RARITY_WEIGHTS, OwnedItems
+from src.game.enums import ItemRarity, ItemType, Room
+
+HERO_LEVEL = 25
+MAX_UNLOCK_LEVEL = 50
+# Capped at a quarter of the eligible items for small catalogs.
+OWNED_ITEMS = 50
+BATCH = 100
+
+
+def make_catalog(size: int, rng: random.Random) -> ItemCatalog:
+    rarities = list(RARITY_WEIGHTS)
+    affinities: list[Room | None] = [None, *Room]
+    items = [
+        CatalogItem(
+            id=uuid4(),
+            name=f"Item {index}",
+            type=rng.choice(list(ItemType)),
+            rarity=rng.choices(rarities, weights=[70, 25, 5])[0],
+            sprite_key=f"item_{index}",
+            room_affinity=rng.choice(affinities),
+            unlock_level=rng.randint(1, MAX_UNLOCK_LEVEL),
+        )
+        for index in range(size)
+    ]
+    return ItemCatalog.build((size, None), items)
+
+
+def legacy_choose_weighted_rarity(candidates: Iterable[ItemRarity]) -> ItemRarity:
+    """The pre-alias rarity pick, kept here as the baseline."""
+    unique_rarities = {rarity for rarity in candidates}
+    weights = [(rarity, RARITY_WEIGHTS.get(rarity, 0.0)) for rarity in unique_rarities]
+    total_weight = sum(weight for _, weight in weights)
+    if total_weight == 0:
+        return ItemRarity.COMMON
+    pick = random.random() * total_weight
+    cumulative = 0.0
+    for rarity, weight in weights:
+        cumulative += weight
+        if pick <= cumulative:
+            return rarity
+    return ItemRarity.COMMON
+
+
+def legacy_pick(available_items: Sequence[CatalogItem]) -> CatalogItem | None:
+    if not available_items:
+        return None
+    chosen_rarity = legacy_choose_weighted_rarity(
+        item.rarity for item in available_items
+    )
+    candidates = [item for item in available_items if item.rarity == chosen_rarity]
+    if not candidates:
+        candidates = available_items
+    return random.choice(candidates)
+
+
+def time_draws(name: str, draw, draws: int, **extra: float) -> LatencySummary:
+    samples: list[float] = []
+    for _ in range(max(1, draws // BATCH)):
+        started = time.perf_counter()
+        for _ in range(BATCH):
+            draw()
+        samples.append((time.perf_counter() - started) / BATCH)
+    return LatencySummary.from_samples(
+        name,
+        samples,
+        us_per_draw=round(statistics.fmean(samples) * 1_000_000, 2),
+        **extra,
+    )
+
+
+def run_size(size: int, draws: int, rng: random.Random) -> list[LatencySummary]:
+    catalog = make_catalog(size, rng)
+    room = Room.STUDY
+    eligible = [
+        item
+        for item in catalog.items.values()
+        if item.unlock_level <= HERO_LEVEL and item.room_affinity in (None, room)
+    ]
+    owned_count = min(OWNED_ITEMS, len(eligible) // 4)
+    owned = OwnedItems(item.id for item in rng.sample(eligible, owned_count))
+    available = [item for item in eligible if item.id not in owned]
+
+    started = time.perf_counter()
+    table = catalog.drop_table(room=room, hero_level=HERO_LEVEL)
+    build_ms = round((time.perf_counter() - started) * 1000, 3)
+
+    return [
+        # The legacy pick gets its candidate list for free; in production it
+        # came from a query per roll.
+        time_draws(
+            f"legacy_scan[{size}]",
+            lambda: legacy_pick(available),
+            # The linear scan is O(n) per draw; keep its run time bounded.
+            max(BATCH, draws * 100 // size),
+        ),
+        time_draws(
+            f"alias_table[{size}]",
+            lambda: table.sample(owned),
+            draws,
+            build_ms=build_ms,
+        ),
+        time_draws(
+            f"alias_table_unowned[{size}]",
+            lambda: table.sample(),
+            draws,
+        ),
+    ]
+
+
+def main(sizes: list[int], draws: int, output: str | None) -> None:
+    rng = random.Random(1234)
+    summaries: list[LatencySummary] = []
+    for size in sizes:
+        summaries.extend(run_size(size, draws, rng))
+    write_results(output, summaries)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 10_000, 100_000])
+    parser.add_argument("--draws", type=int, default=20_000)
+    parser.add_argument("--output", default=None, help="write JSON results here")
+    args = parser.parse_args()
+    main(args.sizes, args.draws, args.output)
@@ -0,0 +1,196 @@
+"""Requests per second for list endpoints, response_model vs. fast responses.
+
+Drives ``/api/sessions/history`` (full 50-row pages) and ``/api/inventory``
+in-process, once with FAST_JSON_RESPONSES off and once on, and reports
+requests/sec on one worker. It also times the serialization step alone,
+FastAPI's ``serialize_response`` against ``render``, on the same payloads,
+and checks both produce the same JSON. Catalog items added for the
+inventory are deleted afterwards.
+
+python -m benchmarks.fast_responses --requests 500 --items 60
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+from collections.abc import Awaitable, Callable
+from types import SimpleNamespace
+from uuid import uuid4
+
+import httpx
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from pydantic import BaseModel
+from sqlalchemy import delete, insert, text
+
+from benchmarks.common import LatencySummary, create_player, write_results
+from src.auth.services.users import jwt_strategy
+from src.config import settings
+from src.database import async_session_factory, engine
+from src.game.enums import ItemRarity, ItemType, SessionStatus
+from src.game.models import Inventory, Item
+from src.game.responses import render
+from src.game.schemas import InventoryResponse, SessionHistoryResponse
+from src.main import app
+
+INSERT_HISTORY_SQL = f"""
+INSERT INTO sessions (
+    id, tenant_id, user_id, duration_minutes, room, started_at, ended_at,
+    status, reward_exp, reward_gold
+)
+SELECT gen_random_uuid(), :tenant_id, :user_id, 25, 'study_room',
+    now() - interval '1 hour' * n,
+    now() - interval '1 hour' * n + interval '25 minutes',
+    '{SessionStatus.SUCCESS.value}', 50, 25
+FROM generate_series(1, :rows) AS n
+"""
+
+ENDPOINTS = (
+    ("/api/sessions/history?limit=50", SessionHistoryResponse),
+    ("/api/inventory", InventoryResponse),
+)
+SERIALIZE_REPEATS = 2_000
+
+
+async def throughput(
+    client: httpx.AsyncClient,
+    path: str,
+    headers: dict[str, str],
+    requests: int,
+    fast: bool,
+) -> LatencySummary:
+    settings.FAST_JSON_RESPONSES = fast
+    samples: list[float] = []
+    started = time.perf_counter()
+    for _ in range(requests):
+        request_started = time.perf_counter()
+        response = await client.get(path, headers=headers)
+        samples.append(time.perf_counter() - request_started)
+        response.raise_for_status()
+    elapsed = time.perf_counter() - started
+    return LatencySummary.from_samples(
+        f"{'fast' if fast else 'model'} GET {path.split('?')[0]}",
+        samples,
+        requests_per_second=round(requests / elapsed, 1),
+        bytes=len(response.content),
+    )
+
+
+async def time_calls(name: str, call: Callable[[], Awaitable[bytes]]) -> LatencySummary:
+    samples: list[float] = []
+    for _ in range(SERIALIZE_REPEATS):
+        started = time.perf_counter()
+        await call()
+        samples.append(time.perf_counter() - started)
+    return LatencySummary.from_samples(
+        name, samples, us_per_call=round(min(samples) * 1_000_000, 2)
+    )
+
+
+async def serialization(
+    path: str, model_class: type[BaseModel], body: bytes
+) -> list[LatencySummary]:
+    """The response step alone, on a model built like the route builds it."""
+    payload = model_class.model_validate_json(body)
+    trusted = model_class.model_construct(**dict(payload))
+    field = create_response_field(name="Response", type_=model_class)
+    settings.FAST_JSON_RESPONSES = True
+
+    async def model_step() -> bytes:
+        value = await serialize_response(
+            field=field, response_content=trusted, is_coroutine=True
+        )
+        return JSONResponse(value).body
+
+    async def fast_step() -> bytes:
+        return render(trusted).body
+
+    if json.loads(await model_step()) != json.loads(await fast_step()):
+        raise AssertionError(f"{path}: fast response differs from response_model")
+    name = path.split("?")[0]
+    return [
+        await time_calls(f"serialize model {name}", model_step),
+        await time_calls(f"serialize fast {name}", fast_step),
+    ]
+
+
+async def seed(rows: int, items: int):
+    async with async_session_factory() as session:
+        player = await create_player(session)
+        await session.execute(
+            text(INSERT_HISTORY_SQL),
+            {"tenant_id": player.tenant_id, "user_id": player.user_id, "rows": rows},
+        )
+        item_ids = [uuid4() for _ in range(items)]
+        await session.execute(
+            insert(Item),
+            [
+                {
+                    "id": item_id,
+                    "name": f"Bench item {index}",
+                    "type": ItemType.HAT,
+                    "rarity": ItemRarity.COMMON,
+                    "sprite_key": f"bench_item_{index}",
+                    "unlock_level": 1000,
+                }
+                for index, item_id in enumerate(item_ids)
+            ],
+        )
+        await session.execute(
+            insert(Inventory),
+            [
+                {
+                    "id": uuid4(),
+                    "tenant_id": player.tenant_id,
+                    "user_id": player.user_id,
+                    "item_id": item_id,
+                }
+                for item_id in item_ids
+            ],
+        )
+        await session.commit()
+    return player, item_ids
+
+
+async def main(requests: int, rows: int, items: int, output: str | None) -> None:
+    player, item_ids = await seed(rows, items)
+    token = await jwt_strategy.write_token(SimpleNamespace(id=player.user_id))
+    headers = {"Authorization": f"Bearer {token}"}
+    summaries: list[LatencySummary] = []
+    try:
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://bench"
+            ) as client:
+                for path, model_class in ENDPOINTS:
+                    # Warm-up, also creates the hero on the first request.
+                    response = await client.get(path, headers=headers)
+                    response.raise_for_status()
+                    for fast in (False, True):
+                        summaries.append(
+                            await throughput(client, path, headers, requests, fast)
+                        )
+                    summaries.extend(
+                        await serialization(path, model_class, response.content)
+                    )
+    finally:
+        async with async_session_factory() as session:
+            await session.execute(delete(Item).where(Item.id.in_(item_ids)))
+            await session.commit()
+        await engine.dispose()
+    write_results(output, summaries)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--rows", type=int, default=200, help="session history")
+    parser.add_argument("--items", type=int, default=60, help="inventory size")
+    parser.add_argument("--output", default=None, help="write JSON results here")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.rows, args.items, args.output))
@@ -0,0 +1,183 @@
+"""Focus stats from the daily rollups vs. aggregating raw sessions.
+
+Seeds ``--rows`` finished sessions for one player spread over the last
+``--days`` days, adds them to ``focus_daily_stats`` in chunks the way the
+writers do, then times the heatmap and weekly summary queries against the
+rollups and against ``sessions``. It checks that both give the same
+numbers and that a rebuild of the tenant reproduces the incremental rows.
+
+python -m benchmarks.focus_stats --rows 100000 --days 365 --repeats 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import select, text
+
+from benchmarks.common import LatencySummary, create_player, write_results
+from src.database import async_session_factory, engine
+from src.game.enums import SessionStatus
+from src.game.focus_stats import (
+    COUNTERS,
+    DayStats,
+    _totals,
+    finished_sessions_sql,
+    get_daily_stats,
+    get_weekly_stats,
+    rebuild_focus_stats,
+    record_finished_sessions,
+    week_start,
+)
+from src.game.models import FocusDailyStats, Session
+
+STATUSES = (SessionStatus.SUCCESS, SessionStatus.CANCEL, SessionStatus.TIMEOUT)
+
+INSERT_SESSIONS_SQL = f"""
+INSERT INTO sessions (
+    id, tenant_id, user_id, duration_minutes, room, started_at, ended_at,
+    status, reward_exp, reward_gold
+)
+SELECT gen_random_uuid(), :tenant_id, :user_id, 25,
+    (ARRAY['study_room', 'build_room', 'training_room'])[1 + n % 3]::session_room,
+    now() - interval '1 minute' * (n * :spread),
+    now() - interval '1 minute' * (n * :spread) + interval '25 minutes',
+    (ARRAY[{", ".join(f"'{state.value}'" for state in STATUSES)}])[
+        1 + (n * 7) % {len(STATUSES)}
+    ]::session_status,
+    50, 25
+FROM generate_series(1, :rows) AS n
+RETURNING id
+"""
+
+# What the stats endpoints would run without the rollups.
+RAW_SQL = f"""
+SELECT r.day, r.room, {", ".join(f"r.{name}" for name in COUNTERS)}
+FROM {
+    finished_sessions_sql(
+        '''(
+        SELECT * FROM sessions
+        WHERE tenant_id = :tenant_id AND user_id = :user_id
+          AND ended_at >= CAST(:start AS date)
+          AND ended_at < CAST(:end AS date) + 1
+    )'''
+    )
+} AS r
+"""
+
+CHUNK = 500
+
+
+async def seed(rows: int, days: int):
+    async with async_session_factory() as session:
+        player = await create_player(session)
+        result = await session.execute(
+            text(INSERT_SESSIONS_SQL),
+            {
+                "tenant_id": player.tenant_id,
+                "user_id": player.user_id,
+                "rows": rows,
+                "spread": days * 24 * 60 / rows,
+            },
+        )
+        session_ids = list(result.scalars())
+        for offset in range(0, len(session_ids), CHUNK):
+            chunk = session_ids[offset : offset + CHUNK]
+            await record_finished_sessions(
+                session, [Session(id=session_id) for session_id in chunk]
+            )
+        await session.commit()
+    return player
+
+
+async def time_calls(
+    name: str, call: Callable[[], Awaitable[list[DayStats]]], repeats: int
+) -> tuple[LatencySummary, list[DayStats]]:
+    samples: list[float] = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        stats = await call()
+        samples.append(time.perf_counter() - started)
+    return LatencySummary.from_samples(name, samples, buckets=len(stats)), stats
+
+
+async def rollup_rows(tenant_id) -> set[tuple]:
+    columns = [getattr(FocusDailyStats, name) for name in COUNTERS]
+    async with async_session_factory() as session:
+        result = await session.execute(
+            select(
+                FocusDailyStats.user_id,
+                FocusDailyStats.day,
+                FocusDailyStats.room,
+                *columns,
+            ).where(FocusDailyStats.tenant_id == tenant_id)
+        )
+        return {tuple(row) for row in result}
+
+
+async def main(rows: int, days: int, repeats: int, output: str | None) -> None:
+    player = await seed(rows, days)
+    end = datetime.now(UTC).date()
+    start = end - timedelta(days=days)
+    scope = {"tenant_id": player.tenant_id, "user_id": player.user_id}
+    summaries: list[LatencySummary] = []
+
+    async with async_session_factory() as session:
+
+        async def raw_rows():
+            result = await session.execute(
+                text(RAW_SQL), {**scope, "start": start, "end": end}
+            )
+            return result.all()
+
+        async def raw_daily() -> list[DayStats]:
+            return _totals(await raw_rows(), lambda day: day)
+
+        async def raw_weekly() -> list[DayStats]:
+            return _totals(await raw_rows(), week_start)
+
+        async def rollup_daily() -> list[DayStats]:
+            return await get_daily_stats(session, **scope, start=start, end=end)
+
+        async def rollup_weekly() -> list[DayStats]:
+            return await get_weekly_stats(session, **scope, start=start, end=end)
+
+        for name, raw, rollup in (
+            ("heatmap", raw_daily, rollup_daily),
+            ("weekly", raw_weekly, rollup_weekly),
+        ):
+            raw_summary, raw_stats = await time_calls(f"raw {name}", raw, repeats)
+            rollup_summary, rollup_stats = await time_calls(
+                f"rollup {name}", rollup, repeats
+            )
+            if raw_stats != rollup_stats:
+                raise AssertionError(f"{name}: rollups differ from raw sessions")
+            summaries.extend([raw_summary, rollup_summary])
+
+    incremental = await rollup_rows(player.tenant_id)
+    async with engine.begin() as connection:
+        started = time.perf_counter()
+        await rebuild_focus_stats(connection, tenant_id=player.tenant_id)
+        summaries.append(
+            LatencySummary.from_samples(
+                "rebuild tenant", [time.perf_counter() - started], sessions=rows
+            )
+        )
+    if await rollup_rows(player.tenant_id) != incremental:
+        raise AssertionError("rebuild differs from the incremental rollups")
+    await engine.dispose()
+    write_results(output, summaries)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--repeats", type=int, default=200)
+    parser.add_argument("--output", default=None, help="write JSON results here")
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.days, args.repeats, args.output))
@@ -0,0 +1,261 @@
+"""Check Google sign-in against a local stub key server.
+
+The stub serves a JSON Web Key Set like ``OAUTH_GOOGLE_JWKS_URL`` does, with
+a ``Cache-Control: max-age`` and an artificial ``--key-delay`` standing in
+for the round trip to Google, and counts how often it is fetched. Tokens are
+signed locally with the stub's RSA keys. Each case checks the outcome and
+how many fetches it caused:
+
+* sign-ins through ``POST /api/google`` succeed on the keys the
+  lifespan fetched, without fetching again;
+* ``--verifications`` verifications in a row fetch nothing (their latency
+  is reported);
+* after a key rotation, the first token with the new key id fetches once
+  and concurrent ones share that fetch;
+* tokens with made-up key ids, the wrong audience or issuer, or past their
+  expiry are rejected, the made-up key ids without another fetch;
+* with the stub failing, cached keys keep verifying and tokens with
+  unknown key ids are still rejected as invalid, not as an outage.
+
+Run ``python -m benchmarks.google_signin``; it exits non-zero when a case
+fails.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import socket
+import sys
+import time
+from contextlib import suppress
+from uuid import uuid4
+
+import httpx
+import jwt
+import uvicorn
+from cryptography.hazmat.primitives.asymmetric import rsa
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from benchmarks.common import LatencySummary, write_results
+from src.auth.security import google
+from src.auth.security.google import (
+    GoogleKeysUnavailable,
+    GoogleTokenError,
+    google_verifier,
+)
+from src.config import settings
+from src.database import engine
+from src.main import app
+
+CLIENT_ID = "stub-client.apps.googleusercontent.com"
+ISSUER = "https://accounts.google.com"
+# Shorter than in production so the rotation case does not wait half a minute.
+MIN_REFRESH_SECONDS = 0.5
+
+
+class StubKeyServer:
+    def __init__(self, delay: float, max_age: int) -> None:
+        self.delay = delay
+        self.max_age = max_age
+        self.fetches = 0
+        self.failing = False
+        self.keys: dict[str, rsa.RSAPrivateKey] = {}
+        self.rotate()
+        self.app = Starlette(routes=[Route("/certs", self.certs)])
+
+    def rotate(self) -> str:
+        kid = uuid4().hex
+        self.keys[kid] = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        return kid
+
+    @property
+    def current_kid(self) -> str:
+        return next(reversed(self.keys))
+
+    async def certs(self, _request: Request) -> JSONResponse:
+        self.fetches += 1
+        await asyncio.sleep(self.delay)
+        if self.failing:
+            return JSONResponse({"error": "unavailable"}, status_code=503)
+        keys = []
+        for kid, key in self.keys.items():
+            jwk = jwt.algorithms.RSAAlgorithm.to_jwk(key.public_key(), as_dict=True)
+            keys.append({**jwk, "kid": kid, "alg": "RS256", "use": "sig"})
+        return JSONResponse(
+            {"keys": keys},
+            headers={"Cache-Control": f"public, max-age={self.max_age}"},
+        )
+
+    def token(
+        self,
+        *,
+        kid: str | None = None,
+        audience: str = CLIENT_ID,
+        issuer: str = ISSUER,
+        expires_in: int = 3600,
+    ) -> str:
+        kid = kid or self.current_kid
+        now = int(time.time())
+        suffix = uuid4().hex[:12]
+        claims = {
+            "iss": issuer,
+            "aud": audience,
+            "sub": suffix,
+            "email": f"google-{suffix}@example.com",
+            "email_verified": True,
+            "name": f"Google {suffix}",
+            "iat": now - 10,
+            "exp": now + expires_in,
+        }
+        # A made-up key id is signed with the current key.
+        key = self.keys.get(kid) or self.keys[self.current_kid]
+        return jwt.encode(claims, key, algorithm="RS256", headers={"kid": kid})
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def rejected(token: str) -> bool:
+    try:
+        await google_verifier.verify(token, CLIENT_ID)
+    except GoogleTokenError:
+        return True
+    return False
+
+
+async def run(
+    client: httpx.AsyncClient, stub: StubKeyServer, verifications: int
+) -> tuple[bool, list[LatencySummary]]:
+    ok = True
+
+    def expect(case: str, passed: bool, fetches_before: int, fetches: int) -> None:
+        nonlocal ok
+        fetched = stub.fetches - fetches_before
+        passed = passed and fetched == fetches
+        ok = ok and passed
+        print(
+            f"{case:<36} fetches={fetched} (expected {fetches})  "
+            f"{'ok' if passed else 'FAIL'}"
+        )
+
+    # The lifespan started the refresher; let its first fetch land.
+    for _ in range(100):
+        if stub.fetches and google_verifier._keys:
+            break
+        await asyncio.sleep(0.05)
+    before = stub.fetches
+    signin_samples = []
+    statuses = []
+    for _ in range(3):
+        started = time.perf_counter()
+        response = await client.post("/api/google", json={"credential": stub.token()})
+        signin_samples.append(time.perf_counter() - started)
+        statuses.append(response.status_code)
+        client.cookies.clear()
+    expect("sign-in", statuses == [200] * 3, before, 0)
+
+    before = stub.fetches
+    verify_samples = []
+    for _ in range(verifications):
+        token = stub.token()
+        started = time.perf_counter()
+        await google_verifier.verify(token, CLIENT_ID)
+        verify_samples.append(time.perf_counter() - started)
+    expect("cached verifications", True, before, 0)
+
+    await asyncio.sleep(MIN_REFRESH_SECONDS)
+    before = stub.fetches
+    new_kid = stub.rotate()
+    results = await asyncio.gather(
+        *(google_verifier.verify(stub.token(kid=new_kid), CLIENT_ID) for _ in range(20))
+    )
+    expect("rotated key, 20 concurrent", len(results) == 20, before, 1)
+
+    before = stub.fetches
+    made_up = await asyncio.gather(
+        *(rejected(stub.token(kid=uuid4().hex)) for _ in range(20))
+    )
+    expect("made-up key ids rejected", all(made_up), before, 0)
+    before = stub.fetches
+    expect(
+        "wrong audience rejected",
+        await rejected(stub.token(audience="someone-else")),
+        before,
+        0,
+    )
+    expect(
+        "wrong issuer rejected",
+        await rejected(stub.token(issuer="https://evil.example.com")),
+        before,
+        0,
+    )
+    expect("expired rejected", await rejected(stub.token(expires_in=-60)), before, 0)
+
+    stub.failing = True
+    with suppress(GoogleKeysUnavailable):
+        await google_verifier.refresh()
+    before = stub.fetches
+    claims = await google_verifier.verify(stub.token(), CLIENT_ID)
+    expect("key server down, cached keys", claims["aud"] == CLIENT_ID, before, 0)
+    # Past the refresh floor, so the unknown key id fetches (and fails).
+    await asyncio.sleep(MIN_REFRESH_SECONDS)
+    before = stub.fetches
+    expect(
+        "key server down, unknown key id",
+        await rejected(stub.token(kid=uuid4().hex)),
+        before,
+        1,
+    )
+    stub.failing = False
+
+    return ok, [
+        LatencySummary.from_samples("google sign-in", signin_samples),
+        LatencySummary.from_samples("google verify", verify_samples),
+    ]
+
+
+async def main(key_delay: float, max_age: int, verifications: int) -> bool:
+    stub = StubKeyServer(key_delay, max_age)
+    port = free_port()
+    server = uvicorn.Server(
+        uvicorn.Config(stub.app, host="127.0.0.1", port=port, log_level="warning")
+    )
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    settings.OAUTH_GOOGLE_CLIENT_ID = CLIENT_ID
+    google.MIN_REFRESH_SECONDS = MIN_REFRESH_SECONDS
+    google_verifier.jwks_url = f"http://127.0.0.1:{port}/certs"
+    try:
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://google", timeout=60
+            ) as client:
+                ok, summaries = await run(client, stub, verifications)
+    finally:
+        server.should_exit = True
+        await serving
+        await engine.dispose()
+    write_results(None, summaries)
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--key-delay", type=float, default=0.2, help="seconds")
+    parser.add_argument("--max-age", type=int, default=3600, help="seconds")
+    parser.add_argument("--verifications", type=int, default=1000)
+    args = parser.parse_args()
+    sys.exit(
+        0 if asyncio.run(main(args.key_delay, args.max_age, args.verifications)) else 1
+    )
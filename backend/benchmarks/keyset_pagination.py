@@ -0,0 +1,160 @@
+"""Walking a long session history page by page.
+
+Compares three walks over one player's history. Every ``--ties`` sessions
+share a ``started_at``:
+- the old timestamp-only cursor, which loses rows at page edges that fall
+  inside a tie;
+- keyset pagination on ``(started_at, id)``;
+- keyset pagination again with ``ix_sessions_owner_started_at`` dropped
+  inside a rolled-back transaction.
+Each walk reports per-page latency and how many rows it missed or repeated.
+
+python -m benchmarks.keyset_pagination --rows 100000 --page-size 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from datetime import datetime
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from benchmarks.common import LatencySummary, Player, create_player, write_results
+from src.database import async_session_factory, engine
+from src.game.enums import SessionStatus
+from src.game.models import Session
+from src.game.pagination import CursorCodec, paginate
+
+INSERT_HISTORY_SQL = f"""
+INSERT INTO sessions (
+    id, tenant_id, user_id, duration_minutes, room, started_at, ended_at,
+    status, reward_exp, reward_gold
+)
+SELECT gen_random_uuid(), :tenant_id, :user_id, 25, 'study_room',
+    now() - interval '1 minute' * (n / :ties),
+    now() - interval '1 minute' * (n / :ties) + interval '25 minutes',
+    '{SessionStatus.SUCCESS.value}', 50, 25
+FROM generate_series(1, :rows) AS n
+"""
+
+Page = Callable[[str | None], Awaitable[tuple[list[Session], str | None]]]
+
+
+def owner_filter(player: Player):
+    return select(Session).where(
+        Session.tenant_id == player.tenant_id,
+        Session.user_id == player.user_id,
+    )
+
+
+def legacy_pages(session: AsyncSession, player: Player, page_size: int) -> Page:
+    """The pre-keyset ``started_at < cursor`` walk, kept here as the baseline."""
+
+    async def page(cursor: str | None) -> tuple[list[Session], str | None]:
+        statement = owner_filter(player).order_by(Session.started_at.desc())
+        if cursor:
+            statement = statement.where(
+                Session.started_at < datetime.fromisoformat(cursor)
+            )
+        result = await session.execute(statement.limit(page_size + 1))
+        rows = list(result.scalars().all())
+        if len(rows) <= page_size:
+            return rows, None
+        return rows[:page_size], rows[page_size - 1].started_at.isoformat()
+
+    return page
+
+
+def keyset_pages(session: AsyncSession, player: Player, page_size: int) -> Page:
+    codec = CursorCodec("benchmark")
+
+    async def page(cursor: str | None) -> tuple[list[Session], str | None]:
+        result = await paginate(
+            session,
+            owner_filter(player),
+            sort_column=Session.started_at,
+            id_column=Session.id,
+            codec=codec,
+            cursor=cursor,
+            limit=page_size,
+        )
+        return result.items, result.next_cursor
+
+    return page
+
+
+async def walk(name: str, page: Page, rows: int) -> LatencySummary:
+    samples: list[float] = []
+    seen: set = set()
+    returned = 0
+    cursor: str | None = None
+    while True:
+        started = time.perf_counter()
+        items, cursor = await page(cursor)
+        samples.append(time.perf_counter() - started)
+        returned += len(items)
+        seen.update(item.id for item in items)
+        if cursor is None:
+            break
+    return LatencySummary.from_samples(
+        name,
+        samples,
+        pages=len(samples),
+        missed=rows - len(seen),
+        repeated=returned - len(seen),
+        last_page_ms=round(samples[-1] * 1000, 3),
+    )
+
+
+async def main(rows: int, page_size: int, ties: int, output: str | None) -> None:
+    async with async_session_factory() as session:
+        player = await create_player(session)
+        await session.execute(
+            text(INSERT_HISTORY_SQL),
+            {
+                "tenant_id": player.tenant_id,
+                "user_id": player.user_id,
+                "rows": rows,
+                "ties": ties,
+            },
+        )
+        await session.commit()
+        await session.execute(text("ANALYZE sessions"))
+        await session.commit()
+
+    summaries: list[LatencySummary] = []
+    async with async_session_factory() as session:
+        summaries.append(
+            await walk(
+                "timestamp_cursor", legacy_pages(session, player, page_size), rows
+            )
+        )
+        summaries.append(
+            await walk("keyset", keyset_pages(session, player, page_size), rows)
+        )
+        await session.rollback()
+        await session.execute(text("DROP INDEX ix_sessions_owner_started_at"))
+        summaries.append(
+            await walk(
+                "keyset_without_index",
+                keyset_pages(session, player, page_size),
+                rows,
+            )
+        )
+        await session.rollback()
+    write_results(output, summaries)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--ties", type=int, default=3)
+    parser.add_argument("--output", default=None, help="write JSON results here")
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.page_size, args.ties, args.output))
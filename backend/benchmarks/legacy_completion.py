@@ -0,0 +1,239 @@
+"""The completion flow as it was before the CTE, pinned for comparison.
+
+A copy of the ``POST /session/complete`` handler path from before the
+atomic statement, the progression upsert, the item catalog, the alias
+tables and the level curve: helpers from ``src.game`` have been rewritten
+since, so :func:`legacy_complete` must not call them. Only the models are
+shared. Do not update this module to follow the application code; it is
+the fixed "before" side of ``benchmarks.session_complete``.
+"""
+
+from __future__ import annotations
+
+import random
+from collections.abc import Iterable
+from datetime import UTC, date, datetime, timedelta
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.game.enums import ItemRarity, ItemType, SessionStatus
+from src.game.models import (
+    CosmeticDropLog,
+    Hero,
+    Inventory,
+    Item,
+    Session,
+    WorldState,
+)
+
+DROP_CHANCE = 0.10
+RARITY_WEIGHTS: dict[ItemRarity, float] = {
+    ItemRarity.COMMON: 0.75,
+    ItemRarity.RARE: 0.2,
+    ItemRarity.EPIC: 0.05,
+}
+ROOM_THRESHOLDS = {
+    "study_room_level_2": 5,
+    "build_room_level_2": 15,
+    "plaza_level_2": 30,
+}
+
+
+def exp_to_next_level(level: int) -> int:
+    return max(level, 1) * 100
+
+
+def compute_rewards(duration_minutes: int) -> tuple[int, int]:
+    return duration_minutes * 2, duration_minutes * 1
+
+
+def validate_completion_window(session_obj: Session) -> None:
+    elapsed = datetime.now(UTC) - session_obj.started_at
+    required_minutes = session_obj.duration_minutes * 0.8
+    if elapsed.total_seconds() < required_minutes * 60:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Session cannot be completed yet.",
+        )
+
+
+async def get_session_for_user(
+    session: AsyncSession, *, session_id: UUID, user_id: UUID, tenant_id: UUID
+) -> Session | None:
+    statement = (
+        select(Session)
+        .where(
+            Session.id == session_id,
+            Session.user_id == user_id,
+            Session.tenant_id == tenant_id,
+        )
+        .with_for_update()
+    )
+    result = await session.execute(statement)
+    return result.scalars().first()
+
+
+async def initialize_progression(
+    session: AsyncSession, *, user_id: UUID, tenant_id: UUID
+) -> tuple[Hero, WorldState]:
+    result = await session.execute(
+        select(Hero).where(Hero.user_id == user_id, Hero.tenant_id == tenant_id)
+    )
+    hero = result.scalars().first()
+    if not hero:
+        hero = Hero(user_id=user_id, tenant_id=tenant_id)
+        session.add(hero)
+        await session.commit()
+        await session.refresh(hero)
+
+    result = await session.execute(
+        select(WorldState).where(
+            WorldState.user_id == user_id, WorldState.tenant_id == tenant_id
+        )
+    )
+    world_state = result.scalars().first()
+    if not world_state:
+        world_state = WorldState(user_id=user_id, tenant_id=tenant_id)
+        session.add(world_state)
+        await session.commit()
+        await session.refresh(world_state)
+
+    return hero, world_state
+
+
+def apply_rewards(hero: Hero, exp_reward: int, gold_reward: int) -> None:
+    hero.exp += exp_reward
+    hero.gold += gold_reward
+    while hero.exp >= exp_to_next_level(hero.level):
+        hero.exp -= exp_to_next_level(hero.level)
+        hero.level += 1
+
+
+def update_world_state_on_success(world_state: WorldState) -> None:
+    world_state.total_sessions_success += 1
+    today = date.today()
+    if world_state.last_session_date:
+        delta = today - world_state.last_session_date
+        if delta == timedelta(days=0):
+            pass
+        elif delta == timedelta(days=1):
+            world_state.day_streak += 1
+        else:
+            world_state.day_streak = 1
+    else:
+        world_state.day_streak = 1
+    world_state.last_session_date = today
+
+    if world_state.total_sessions_success >= ROOM_THRESHOLDS["plaza_level_2"]:
+        world_state.plaza_level = 2
+    if world_state.total_sessions_success >= ROOM_THRESHOLDS["build_room_level_2"]:
+        world_state.build_room_level = 2
+    if world_state.total_sessions_success >= ROOM_THRESHOLDS["study_room_level_2"]:
+        world_state.study_room_level = 2
+
+
+def choose_weighted_rarity(candidates: Iterable[ItemRarity]) -> ItemRarity:
+    unique_rarities = {rarity for rarity in candidates}
+    weights = [(rarity, RARITY_WEIGHTS.get(rarity, 0.0)) for rarity in unique_rarities]
+    total_weight = sum(weight for _, weight in weights)
+    if total_weight == 0:
+        return ItemRarity.COMMON
+    pick = random.random() * total_weight
+    cumulative = 0.0
+    for rarity, weight in weights:
+        cumulative += weight
+        if pick <= cumulative:
+            return rarity
+    return ItemRarity.COMMON
+
+
+async def maybe_roll_cosmetic_drop(
+    session: AsyncSession,
+    *,
+    user_id: UUID,
+    tenant_id: UUID,
+    hero: Hero,
+    session_obj: Session,
+) -> None:
+    if random.random() >= DROP_CHANCE:
+        return
+
+    stmt = (
+        select(Item)
+        .outerjoin(
+            Inventory,
+            and_(
+                Inventory.item_id == Item.id,
+                Inventory.user_id == user_id,
+                Inventory.tenant_id == tenant_id,
+            ),
+        )
+        .where(Inventory.id.is_(None))
+        .where(Item.unlock_level <= hero.level)
+        .where(
+            (Item.room_affinity.is_(None)) | (Item.room_affinity == session_obj.room)
+        )
+    )
+    result = await session.execute(stmt)
+    available_items: list[Item] = list(result.scalars().all())
+    if not available_items:
+        return
+
+    chosen_rarity = choose_weighted_rarity(item.rarity for item in available_items)
+    candidates = [item for item in available_items if item.rarity == chosen_rarity]
+    item = random.choice(candidates or available_items)
+
+    session.add(Inventory(tenant_id=tenant_id, user_id=user_id, item_id=item.id))
+    session.add(
+        CosmeticDropLog(tenant_id=tenant_id, session_id=session_obj.id, item_id=item.id)
+    )
+    session_obj.drop_item_id = item.id
+
+    if item.type == ItemType.HAT and not hero.equipped_hat_id:
+        hero.equipped_hat_id = item.id
+    elif item.type == ItemType.OUTFIT and not hero.equipped_outfit_id:
+        hero.equipped_outfit_id = item.id
+    elif item.type == ItemType.ACCESSORY and not hero.equipped_accessory_id:
+        hero.equipped_accessory_id = item.id
+
+
+async def legacy_complete(
+    session: AsyncSession, *, session_id: UUID, user_id: UUID, tenant_id: UUID
+) -> None:
+    """The pre-CTE handler body, response building aside."""
+    session_obj = await get_session_for_user(
+        session, session_id=session_id, user_id=user_id, tenant_id=tenant_id
+    )
+    if not session_obj or session_obj.status not in (
+        SessionStatus.PENDING,
+        SessionStatus.ACTIVE,
+    ):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT)
+    validate_completion_window(session_obj)
+    hero, world_state = await initialize_progression(
+        session, user_id=user_id, tenant_id=tenant_id
+    )
+    exp_reward, gold_reward = compute_rewards(session_obj.duration_minutes)
+    apply_rewards(hero, exp_reward, gold_reward)
+    session_obj.reward_exp = exp_reward
+    session_obj.reward_gold = gold_reward
+    session_obj.status = SessionStatus.SUCCESS
+    session_obj.ended_at = datetime.now(UTC)
+    update_world_state_on_success(world_state)
+    await maybe_roll_cosmetic_drop(
+        session,
+        user_id=user_id,
+        tenant_id=tenant_id,
+        hero=hero,
+        session_obj=session_obj,
+    )
+    await session.commit()
+    await session.refresh(hero)
+    await session.refresh(world_state)
+    await session.refresh(session_obj)
+
+
+__all__ = ["legacy_complete"]
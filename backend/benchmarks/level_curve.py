@@ -0,0 +1,84 @@
+"""Applying exp grants, level-by-level loop vs. level curves.
+
+Times the production linear curve and ``TabulatedCurve`` on the same
+exp-per-level, from level 10. ``tests/test_level_curve.py`` checks that
+both agree with the loop. Runs in memory; no database access.
+
+python -m benchmarks.level_curve --grants 1000 1000000 1000000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from collections.abc import Callable
+
+from benchmarks.common import LatencySummary, write_results
+from src.game.levels import EXP_PER_LEVEL, LinearCurve, TabulatedCurve
+
+START_LEVEL = 10
+REPEATS = 50
+
+
+def legacy_add_exp(
+    exp_to_next: Callable[[int], int], level: int, exp: int, gained: int
+) -> tuple[int, int]:
+    """The pre-curve ``apply_rewards`` loop, kept here as the baseline."""
+    exp += gained
+    while exp >= exp_to_next(level):
+        exp -= exp_to_next(level)
+        level += 1
+    return level, exp
+
+
+def linear_exp_to_next(level: int) -> int:
+    return max(level, 1) * EXP_PER_LEVEL
+
+
+def time_grant(name: str, add_exp: Callable[[], object]) -> LatencySummary:
+    samples: list[float] = []
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        add_exp()
+        samples.append(time.perf_counter() - started)
+    return LatencySummary.from_samples(
+        name, samples, us_per_grant=round(min(samples) * 1_000_000, 2)
+    )
+
+
+def main(grants: list[int], output: str | None) -> None:
+    linear = LinearCurve(EXP_PER_LEVEL)
+    tabulated = TabulatedCurve(linear_exp_to_next)
+
+    summaries: list[LatencySummary] = []
+    for grant in grants:
+        summaries.extend(
+            [
+                time_grant(
+                    f"loop[{grant:.0e}]",
+                    lambda: legacy_add_exp(linear_exp_to_next, START_LEVEL, 0, grant),
+                ),
+                time_grant(
+                    f"linear[{grant:.0e}]",
+                    lambda: linear.add_exp(START_LEVEL, 0, grant),
+                ),
+                time_grant(
+                    f"tabulated[{grant:.0e}]",
+                    lambda: tabulated.add_exp(START_LEVEL, 0, grant),
+                ),
+            ]
+        )
+    write_results(output, summaries)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--grants",
+        type=int,
+        nargs="+",
+        default=[10**3, 10**5, 10**7, 10**9],
+    )
+    parser.add_argument("--output", default=None, help="write JSON results here")
+    args = parser.parse_args()
+    main(args.grants, args.output)
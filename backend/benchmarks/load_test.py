@@ -0,0 +1,296 @@
+"""Load test of the focus-session lifecycle with simulated players.
+
+``--users`` players run concurrently. Each one signs up, signs in and
+creates a task template per room. Then it plays ``--sessions`` sessions.
+For each session it starts a timer, then either cancels it
+(``--cancel-rate``) or travels forward in time and completes it. After
+that it polls its profile, inventory, world state and history. Players
+wait an exponentially distributed ``--think-ms`` between actions. Every
+random choice comes from ``--seed``, so a run sends the same requests
+each time.
+
+By default the app is driven in-process through an ASGI transport. Then
+the report also has SQL statements per request, counted per request even
+under concurrency. ``--base-url`` targets a running server instead, for
+example ``docker compose up`` on http://localhost:8020. Time travel moves
+``started_at`` back directly in the database named by the DATABASE_*
+settings, so the server must use the same database.
+
+The report has requests/sec and p50/p95/p99 per route. ``--output`` saves
+it as JSON with the commit and arguments, and ``python -m
+benchmarks.compare`` compares two saved runs.
+
+python -m benchmarks.load_test --users 20 --sessions 10 --output run.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import subprocess
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from typing import Any
+from uuid import uuid4
+
+import httpx
+from sqlalchemy import text
+
+from benchmarks.common import (
+    LatencySummary,
+    count_task_statements,
+    task_statements,
+    write_results,
+)
+from src.database import engine
+from src.game.enums import Room
+from src.main import app
+
+PASSWORD = "load-test-password-1"
+DURATION_MINUTES = 25
+POLLS = (
+    ("GET /profile", "/api/profile"),
+    ("GET /inventory", "/api/inventory"),
+    ("GET /worldstate", "/api/worldstate"),
+    ("GET /sessions/history", "/api/sessions/history?limit=20"),
+)
+
+TIME_TRAVEL_SQL = text(
+    "UPDATE sessions SET started_at = started_at - make_interval(mins => :minutes) "
+    "WHERE id = :session_id"
+)
+
+
+@dataclass
+class RouteStats:
+    samples: list[float] = field(default_factory=list)
+    statements: int = 0
+    errors: int = 0
+
+
+@dataclass
+class Recorder:
+    in_process: bool
+    routes: dict[str, RouteStats] = field(
+        default_factory=lambda: defaultdict(RouteStats)
+    )
+
+    async def request(
+        self, client: httpx.AsyncClient, name: str, method: str, path: str, **kwargs
+    ) -> httpx.Response:
+        with task_statements() as counter:
+            started = time.perf_counter()
+            response = await client.request(method, path, **kwargs)
+            elapsed = time.perf_counter() - started
+        stats = self.routes[name]
+        stats.samples.append(elapsed)
+        stats.statements += counter[0]
+        if response.status_code >= 400:
+            stats.errors += 1
+        return response
+
+    def summaries(self, elapsed: float) -> list[LatencySummary]:
+        summaries = []
+        for name, stats in sorted(self.routes.items()):
+            extra: dict[str, Any] = {
+                "requests_per_second": round(len(stats.samples) / elapsed, 1),
+                "errors": stats.errors,
+            }
+            if self.in_process:
+                extra["statements_per_request"] = round(
+                    stats.statements / len(stats.samples), 2
+                )
+            summaries.append(LatencySummary.from_samples(name, stats.samples, **extra))
+        return summaries
+
+
+async def think(rng: random.Random, think_ms: float) -> None:
+    if think_ms > 0:
+        await asyncio.sleep(rng.expovariate(1000 / think_ms))
+
+
+async def sign_in(client: httpx.AsyncClient, recorder: Recorder) -> dict[str, str]:
+    suffix = uuid4().hex[:12]
+    email = f"load-{suffix}@example.com"
+    response = await recorder.request(
+        client,
+        "POST /signup",
+        "POST",
+        "/api/signup",
+        json={
+            "email": email,
+            "password": PASSWORD,
+            "organization_name": f"Load test {suffix}",
+        },
+    )
+    response.raise_for_status()
+    response = await recorder.request(
+        client,
+        "POST /signin",
+        "POST",
+        "/api/signin",
+        json={"email": email, "password": PASSWORD},
+    )
+    response.raise_for_status()
+    # Authenticate with the bearer token only, like the mobile clients.
+    client.cookies.clear()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def play(
+    client: httpx.AsyncClient,
+    recorder: Recorder,
+    rng: random.Random,
+    *,
+    sessions: int,
+    cancel_rate: float,
+    think_ms: float,
+) -> None:
+    headers = await sign_in(client, recorder)
+    template_ids = []
+    for room in Room:
+        response = await recorder.request(
+            client,
+            "POST /tasks",
+            "POST",
+            "/api/tasks",
+            headers=headers,
+            json={
+                "name": f"Load {room.value}",
+                "default_duration_minutes": DURATION_MINUTES,
+                "room": room.value,
+            },
+        )
+        response.raise_for_status()
+        template_ids.append(response.json()["id"])
+
+    for _ in range(sessions):
+        await think(rng, think_ms)
+        response = await recorder.request(
+            client,
+            "POST /session/start",
+            "POST",
+            "/api/session/start",
+            headers=headers,
+            json={
+                "task_template_id": rng.choice(template_ids),
+                "duration_minutes": DURATION_MINUTES,
+            },
+        )
+        response.raise_for_status()
+        session_id = response.json()["session_id"]
+
+        await think(rng, think_ms)
+        if rng.random() < cancel_rate:
+            name, path = "POST /session/cancel", "/api/session/cancel"
+        else:
+            async with engine.begin() as connection:
+                await connection.execute(
+                    TIME_TRAVEL_SQL,
+                    {"minutes": DURATION_MINUTES, "session_id": session_id},
+                )
+            name, path = "POST /session/complete", "/api/session/complete"
+        await recorder.request(
+            client, name, "POST", path, headers=headers, json={"session_id": session_id}
+        )
+
+        for name, path in POLLS:
+            await think(rng, think_ms)
+            await recorder.request(client, name, "GET", path, headers=headers)
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args: argparse.Namespace, recorder: Recorder, transport) -> float:
+    base_url = args.base_url or "http://load-test"
+    clients = [
+        httpx.AsyncClient(transport=transport, base_url=base_url, timeout=60)
+        for _ in range(args.users)
+    ]
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(
+            *(
+                play(
+                    client,
+                    recorder,
+                    random.Random(f"{args.seed}:{index}"),
+                    sessions=args.sessions,
+                    cancel_rate=args.cancel_rate,
+                    think_ms=args.think_ms,
+                )
+                for index, client in enumerate(clients)
+            )
+        )
+        return time.perf_counter() - started
+    finally:
+        for client in clients:
+            await client.aclose()
+
+
+async def main(args: argparse.Namespace) -> None:
+    recorder = Recorder(in_process=args.base_url is None)
+    started_at = datetime.now(UTC)
+    try:
+        if recorder.in_process:
+            count_task_statements(engine)
+            async with app.router.lifespan_context(app):
+                elapsed = await run(args, recorder, httpx.ASGITransport(app=app))
+        else:
+            elapsed = await run(args, recorder, httpx.AsyncHTTPTransport())
+    finally:
+        await engine.dispose()
+
+    summaries = recorder.summaries(elapsed)
+    total = [sample for stats in recorder.routes.values() for sample in stats.samples]
+    summaries.append(
+        LatencySummary.from_samples(
+            "all requests",
+            total,
+            requests_per_second=round(len(total) / elapsed, 1),
+            errors=sum(stats.errors for stats in recorder.routes.values()),
+        )
+    )
+    write_results(
+        args.output,
+        summaries,
+        meta={
+            "benchmark": "load_test",
+            "commit": git_commit(),
+            "started_at": started_at.isoformat(),
+            "elapsed_seconds": round(elapsed, 3),
+            "target": args.base_url or "in-process",
+            **{
+                key: value
+                for key, value in vars(args).items()
+                if key not in ("base_url", "output")
+            },
+        },
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--sessions", type=int, default=10, help="per player")
+    parser.add_argument("--cancel-rate", type=float, default=0.2)
+    parser.add_argument("--think-ms", type=float, default=0.0)
+    parser.add_argument("--seed", default="focus")
+    parser.add_argument("--base-url", default=None, help="target a running server")
+    parser.add_argument("--output", default=None, help="write JSON results here")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,122 @@
+"""Draining the gameplay event outbox with concurrent relays.
+
+Fills ``outbox_events`` with ``--events`` events spread over ``--users``
+players, then drains it with ``--relays`` relays running side by side, each
+writing NDJSON files to a temporary directory. Afterwards it checks that
+every event was delivered exactly once and that each player's events were
+delivered in ``id`` order, and reports events/sec and per-batch latency.
+Any events already in the outbox are relayed too but left out of the
+checks.
+
+python -m benchmarks.outbox_relay --events 100000 --users 500 --relays 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import tempfile
+import time
+from collections.abc import Sequence
+from uuid import UUID, uuid4
+
+from sqlalchemy import text
+
+from benchmarks.common import LatencySummary, write_results
+from src.database import engine
+from src.game.enums import GameEventType
+from src.game.event_sinks import NdjsonFileSink, RelayedEvent
+from src.game.outbox import relay_batch
+
+INSERT_EVENTS_SQL = f"""
+INSERT INTO outbox_events (event_type, tenant_id, user_id, payload)
+SELECT '{GameEventType.SESSION_SUCCESS.value}', :tenant_id,
+    (CAST(:user_ids AS uuid[]))[1 + (n * 7919) % :users],
+    jsonb_build_object('sequence', n)
+FROM generate_series(1, :events) AS n
+"""
+
+
+class RecordingSink(NdjsonFileSink):
+    """Also records the global order in which events reach any sink."""
+
+    def __init__(self, directory: str, delivered: list[tuple[UUID, int]]) -> None:
+        super().__init__(directory, max_bytes=16 * 1024 * 1024)
+        self.delivered = delivered
+
+    async def write(self, events: Sequence[RelayedEvent]) -> None:
+        await super().write(events)
+        self.delivered.extend((event.user_id, event.id) for event in events)
+
+
+async def relay(sink: RecordingSink, batch_size: int) -> list[float]:
+    samples: list[float] = []
+    while True:
+        started = time.perf_counter()
+        relayed = await relay_batch(sink, batch_size=batch_size)
+        if not relayed:
+            return samples
+        samples.append(time.perf_counter() - started)
+
+
+def check(delivered: list[tuple[UUID, int]], seeded: set[int]) -> tuple[int, int]:
+    ids = [event_id for _, event_id in delivered if event_id in seeded]
+    missing = len(seeded - set(ids))
+    duplicated = len(ids) - len(set(ids))
+    last: dict[UUID, int] = {}
+    for user_id, event_id in delivered:
+        if last.get(user_id, 0) > event_id:
+            raise AssertionError(f"user {user_id}: event {event_id} out of order")
+        last[user_id] = event_id
+    return missing, duplicated
+
+
+async def main(
+    events: int, users: int, relays: int, batch_size: int, output: str | None
+) -> None:
+    async with engine.begin() as connection:
+        result = await connection.execute(
+            text(INSERT_EVENTS_SQL + " RETURNING id"),
+            {
+                "tenant_id": uuid4(),
+                "user_ids": [uuid4() for _ in range(users)],
+                "users": users,
+                "events": events,
+            },
+        )
+        seeded = set(result.scalars())
+    await engine.dispose()
+
+    delivered: list[tuple[UUID, int]] = []
+    with tempfile.TemporaryDirectory() as directory:
+        sinks = [RecordingSink(directory, delivered) for _ in range(relays)]
+        started = time.perf_counter()
+        batches = await asyncio.gather(*(relay(sink, batch_size) for sink in sinks))
+        elapsed = time.perf_counter() - started
+        for sink in sinks:
+            await sink.close()
+
+    missing, duplicated = check(delivered, seeded)
+    summary = LatencySummary.from_samples(
+        f"relay x{relays} batch={batch_size}",
+        [sample for samples in batches for sample in samples],
+        events=len(delivered),
+        events_per_second=round(len(delivered) / elapsed),
+        missing=missing,
+        duplicated=duplicated,
+    )
+    write_results(output, [summary])
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--relays", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--output", default=None, help="write JSON results here")
+    args = parser.parse_args()
+    asyncio.run(
+        main(args.events, args.users, args.relays, args.batch_size, args.output)
+    )
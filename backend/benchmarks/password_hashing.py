@@ -0,0 +1,158 @@
+"""/profile latency while a burst of sign-ins hashes passwords.
+
+One account signs up, then ``--logins`` sign-ins for it start at once while
+``--pollers`` clients fetch ``GET /api/profile`` back to back until the last
+sign-in answers. The run happens twice: with passwords verified on the event
+loop (``PASSWORD_HASH_WORKERS=0``, what fastapi-users does) and on
+``--workers`` hashing threads. Each run reports /profile latency, whose tail
+is the point, and sign-in latency and throughput, each with how many
+requests failed (503s once pool checkouts time out)::
+
+    python -m benchmarks.password_hashing --logins 50 --workers 2
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from collections import Counter
+from uuid import uuid4
+
+import httpx
+
+from benchmarks.common import LatencySummary, write_results
+from src.auth.security.passwords import PooledPasswordHelper
+from src.auth.services import users
+from src.database import engine
+from src.main import app
+
+PASSWORD = "hashing-password-1"
+
+
+async def poll_profile(
+    client: httpx.AsyncClient,
+    headers: dict[str, str],
+    done: asyncio.Event,
+    samples: list[float],
+    statuses: Counter[int],
+) -> None:
+    while not done.is_set():
+        started = time.perf_counter()
+        response = await client.get("/api/profile", headers=headers)
+        samples.append(time.perf_counter() - started)
+        statuses[response.status_code] += 1
+
+
+async def sign_in(
+    client: httpx.AsyncClient,
+    email: str,
+    samples: list[float],
+    statuses: Counter[int],
+) -> None:
+    started = time.perf_counter()
+    response = await client.post(
+        "/api/signin", json={"email": email, "password": PASSWORD}
+    )
+    samples.append(time.perf_counter() - started)
+    statuses[response.status_code] += 1
+
+
+async def run(
+    client: httpx.AsyncClient,
+    email: str,
+    headers: dict[str, str],
+    logins: int,
+    pollers: int,
+    workers: int,
+) -> list[LatencySummary]:
+    # UserManager picks the helper up from its module on each request.
+    users.password_helper = PooledPasswordHelper(workers)
+    label = f"workers={workers}"
+    done = asyncio.Event()
+    profile_samples: list[float] = []
+    signin_samples: list[float] = []
+    profile_statuses: Counter[int] = Counter()
+    signin_statuses: Counter[int] = Counter()
+    poller_tasks = [
+        asyncio.create_task(
+            poll_profile(client, headers, done, profile_samples, profile_statuses)
+        )
+        for _ in range(pollers)
+    ]
+    # Let the pollers settle before the burst.
+    await asyncio.sleep(0.2)
+    profile_samples.clear()
+    profile_statuses.clear()
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(
+            *(
+                sign_in(client, email, signin_samples, signin_statuses)
+                for _ in range(logins)
+            )
+        )
+    finally:
+        elapsed = time.perf_counter() - started
+        done.set()
+        await asyncio.gather(*poller_tasks)
+    return [
+        LatencySummary.from_samples(
+            f"{label} profile",
+            profile_samples,
+            max_ms=round(max(profile_samples) * 1000, 1),
+            ok=profile_statuses[200],
+            failed=profile_statuses.total() - profile_statuses[200],
+        ),
+        LatencySummary.from_samples(
+            f"{label} signin",
+            signin_samples,
+            requests_per_second=round(len(signin_samples) / elapsed, 1),
+            ok=signin_statuses[200],
+            failed=signin_statuses.total() - signin_statuses[200],
+        ),
+    ]
+
+
+async def main(logins: int, pollers: int, workers: int, output: str | None) -> None:
+    summaries: list[LatencySummary] = []
+    try:
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://bench", timeout=300
+            ) as client:
+                suffix = uuid4().hex[:12]
+                email = f"hashing-{suffix}@example.com"
+                response = await client.post(
+                    "/api/signup",
+                    json={
+                        "email": email,
+                        "password": PASSWORD,
+                        "organization_name": f"Hashing {suffix}",
+                    },
+                )
+                response.raise_for_status()
+                # Requests authenticate by header only, like the mobile clients.
+                client.cookies.clear()
+                token = response.json()["access_token"]
+                headers = {"Authorization": f"Bearer {token}"}
+                for pool_workers in (0, workers):
+                    summaries.extend(
+                        await run(client, email, headers, logins, pollers, pool_workers)
+                    )
+    finally:
+        await engine.dispose()
+    write_results(output, summaries)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--logins", type=int, default=50)
+    parser.add_argument("--pollers", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=2, help="hashing threads")
+    parser.add_argument("--output", default=None, help="write JSON results here")
+    args = parser.parse_args()
+    asyncio.run(main(args.logins, args.pollers, args.workers, args.output))
@@ -0,0 +1,330 @@
+"""Check the statement budgets declared on routes.
+
+Runs with QUERY_BUDGETS=raise and a drop on every completion. It signs up a
+player and gives them a few items, then calls every game and tenant route
+``--rounds`` times, letting the player's data and the batch size grow
+between rounds so N+1 queries show up. For each
+route it prints the budget, the most statements one request used and any
+overruns. It exits non-zero on an overrun or when a budgeted route was not
+reached; ``tests/test_query_budgets.py`` plays the same rounds in the test
+suite::
+
+    python -m benchmarks.query_budgets --rounds 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+from dataclasses import dataclass, field
+from uuid import uuid4
+
+import httpx
+from fastapi.routing import APIRoute
+from sqlalchemy import insert, select, text
+
+from benchmarks.common import count_task_statements, task_statements
+from benchmarks.load_test import DURATION_MINUTES, TIME_TRAVEL_SQL
+from src.config import settings
+from src.database import async_session_factory, engine
+from src.game import completion
+from src.game.enums import Room, SessionStatus
+from src.game.models import Inventory, Item
+from src.main import app
+from src.query_budget import QueryBudget, QueryBudgetExceeded
+
+QUEUE_SESSIONS_SQL = text(
+    f"""
+    INSERT INTO sessions (
+        id, tenant_id, user_id, task_template_id, duration_minutes, room,
+        started_at, status, reward_exp, reward_gold
+    )
+    VALUES (
+        :id, :tenant_id, :user_id, :template_id, :minutes, '{Room.STUDY.value}',
+        now() - make_interval(mins => :minutes * 2),
+        '{SessionStatus.PENDING.value}', 0, 0
+    )
+    """
+)
+# The rounds' sessions run in the study room. The player never keeps an item
+# that can drop there, so every completion can drop one, and a batch drops
+# for some sessions and not others, which is its costliest path.
+RETURN_DROPS_SQL = text(
+    f"""
+    DELETE FROM inventory
+    WHERE tenant_id = :tenant_id AND user_id = :user_id
+      AND item_id IN (
+          SELECT id FROM items
+          WHERE room_affinity IS NULL OR room_affinity = '{Room.STUDY.value}'
+      )
+    """
+)
+
+
+@dataclass
+class RouteCheck:
+    budget: QueryBudget | None
+    calls: int = 0
+    max_statements: int = 0
+    overruns: list[str] = field(default_factory=list)
+
+
+def declared_budgets() -> dict[tuple[str, str], RouteCheck]:
+    checks = {}
+    for route in app.routes:
+        if not isinstance(route, APIRoute):
+            continue
+        budget = next(
+            (
+                depends.dependency
+                for depends in route.dependencies
+                if isinstance(depends.dependency, QueryBudget)
+            ),
+            None,
+        )
+        for method in route.methods:
+            # The first route registered for a path is the one that answers.
+            checks.setdefault((method, route.path_format), RouteCheck(budget))
+    return checks
+
+
+class Driver:
+    def __init__(self, client: httpx.AsyncClient, checks: dict) -> None:
+        self.client = client
+        self.checks = checks
+        self.headers: dict[str, str] = {}
+        self.tenant_id: str | None = None
+        self.user_id: str | None = None
+
+    async def call(
+        self, method: str, route: str, path: str | None = None, **kwargs
+    ) -> httpx.Response | None:
+        check = self.checks[(method, route)]
+        with task_statements() as counter:
+            try:
+                response = await self.client.request(
+                    method, path or route, headers=self.headers, **kwargs
+                )
+            except QueryBudgetExceeded as exc:
+                check.overruns.append(str(exc))
+                response = None
+        check.calls += 1
+        check.max_statements = max(check.max_statements, counter[0])
+        if response is not None:
+            response.raise_for_status()
+        return response
+
+    async def sign_up(self) -> dict:
+        suffix = uuid4().hex[:12]
+        response = await self.call(
+            "POST",
+            "/api/signup",
+            json={
+                "email": f"budget-{suffix}@example.com",
+                "password": "budget-password-1",
+                "organization_name": f"Budget {suffix}",
+            },
+        )
+        self.client.cookies.clear()
+        self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        user = response.json()["user"]
+        self.tenant_id = user["active_organization_id"]
+        self.user_id = user["id"]
+        return user
+
+    async def queue_finished_sessions(self, template_id: str, count: int) -> list[str]:
+        session_ids = [str(uuid4()) for _ in range(count)]
+        if not session_ids:
+            return session_ids
+        async with engine.begin() as connection:
+            await connection.execute(
+                QUEUE_SESSIONS_SQL,
+                [
+                    {
+                        "id": session_id,
+                        "tenant_id": self.tenant_id,
+                        "user_id": self.user_id,
+                        "template_id": template_id,
+                        "minutes": DURATION_MINUTES,
+                    }
+                    for session_id in session_ids
+                ],
+            )
+        return session_ids
+
+    async def start_session(self, template_id: str, *, finished: bool) -> str:
+        response = await self.call(
+            "POST",
+            "/api/session/start",
+            json={"task_template_id": template_id, "duration_minutes": 25},
+        )
+        session_id = response.json()["session_id"]
+        if finished:
+            async with engine.begin() as connection:
+                await connection.execute(
+                    TIME_TRAVEL_SQL,
+                    {"minutes": DURATION_MINUTES, "session_id": session_id},
+                )
+        return session_id
+
+    async def return_drops(self) -> None:
+        async with engine.begin() as connection:
+            await connection.execute(
+                RETURN_DROPS_SQL,
+                {"tenant_id": self.tenant_id, "user_id": self.user_id},
+            )
+
+
+async def give_items(user_id: str, tenant_id: str, count: int) -> list[str]:
+    async with async_session_factory() as session:
+        result = await session.execute(
+            select(Item.id)
+            .where(Item.room_affinity.is_distinct_from(Room.STUDY))
+            .limit(count)
+        )
+        item_ids = list(result.scalars())
+        await session.execute(
+            insert(Inventory),
+            [
+                {
+                    "id": uuid4(),
+                    "tenant_id": tenant_id,
+                    "user_id": user_id,
+                    "item_id": item_id,
+                }
+                for item_id in item_ids
+            ],
+        )
+        await session.commit()
+    return [str(item_id) for item_id in item_ids]
+
+
+async def play_round(driver: Driver, round_number: int, item_ids: list[str]) -> None:
+    call = driver.call
+    response = await call(
+        "POST",
+        "/api/tasks",
+        json={
+            "name": f"Budget {round_number}",
+            "default_duration_minutes": DURATION_MINUTES,
+            "room": Room.STUDY.value,
+        },
+    )
+    template_id = response.json()["id"]
+    await call("GET", "/api/tasks")
+    await call(
+        "PUT",
+        "/api/tasks/{task_id}",
+        f"/api/tasks/{template_id}",
+        json={"name": f"Budget {round_number} renamed"},
+    )
+
+    session_id = await driver.start_session(template_id, finished=True)
+    await driver.return_drops()
+    await call("POST", "/api/session/complete", json={"session_id": session_id})
+    session_id = await driver.start_session(template_id, finished=False)
+    await call("POST", "/api/session/cancel", json={"session_id": session_id})
+    # Two via the API (the in-progress limit), the rest queued directly.
+    session_ids = [
+        await driver.start_session(template_id, finished=True) for _ in range(2)
+    ]
+    session_ids += await driver.queue_finished_sessions(template_id, round_number)
+    await driver.return_drops()
+    await call("POST", "/api/session/complete/batch", json={"session_ids": session_ids})
+
+    for route in (
+        "/api/sessions/history",
+        "/api/inventory",
+        "/api/worldstate",
+        "/api/leaderboard",
+        "/api/stats/heatmap",
+        "/api/stats/weekly",
+        "/api/stats/organization/weekly",
+    ):
+        await call("GET", route)
+    await call(
+        "POST",
+        "/api/inventory/equip",
+        json={"item_id": item_ids[round_number % len(item_ids)]},
+    )
+
+    await call("GET", "/api/tenants/")
+    tenant_id = driver.tenant_id
+    await call("GET", "/api/tenants/{tenant_id}", f"/api/tenants/{tenant_id}")
+    await call(
+        "PATCH",
+        "/api/tenants/{tenant_id}",
+        f"/api/tenants/{tenant_id}",
+        json={"name": f"Budget org {round_number}"},
+    )
+    await call(
+        "POST",
+        "/api/tenants/{tenant_id}/make-default",
+        f"/api/tenants/{tenant_id}/make-default",
+    )
+    suffix = uuid4().hex[:12]
+    await call(
+        "POST",
+        "/api/tenants/",
+        json={"name": f"Budget {suffix}", "slug": f"budget-{suffix}"},
+    )
+    await call("DELETE", "/api/tasks/{task_id}", f"/api/tasks/{template_id}")
+
+
+def report(checks: dict[tuple[str, str], RouteCheck]) -> bool:
+    ok = True
+    for (method, route), check in sorted(checks.items(), key=lambda item: item[0][1]):
+        if check.budget is None and not check.calls:
+            continue
+        budget = (
+            f"{check.budget.statements} (repeats {check.budget.repeats})"
+            if check.budget
+            else "none"
+        )
+        status = "ok"
+        if check.overruns:
+            status, ok = "OVER", False
+        elif not check.calls:
+            status, ok = "not reached", False
+        elif check.budget is None:
+            status = "no budget"
+        print(
+            f"{method:<6} {route:<36} budget={budget:<16} "
+            f"max={check.max_statements:<3} calls={check.calls:<3} {status}"
+        )
+        for overrun in dict.fromkeys(check.overruns):
+            print(f"    {overrun}")
+    return ok
+
+
+async def main(rounds: int, items: int) -> bool:
+    settings.QUERY_BUDGETS = "raise"
+    # Every completion drops an item, the path with the most statements.
+    completion.DROP_CHANCE = 1.0
+    count_task_statements(engine)
+    checks = declared_budgets()
+    try:
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://budgets"
+            ) as client:
+                driver = Driver(client, checks)
+                await driver.sign_up()
+                item_ids = await give_items(driver.user_id, driver.tenant_id, items)
+                for round_number in range(rounds):
+                    await play_round(driver, round_number, item_ids)
+    finally:
+        await engine.dispose()
+    return report(checks)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--items", type=int, default=5, help="inventory size")
+    args = parser.parse_args()
+    sys.exit(0 if asyncio.run(main(args.rounds, args.items)) else 1)
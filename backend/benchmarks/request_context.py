@@ -0,0 +1,109 @@
+"""SQL statements and latency per request for authenticated game endpoints.
+
+Drives the ASGI app in-process with a bearer token, so the numbers include
+authentication and tenant resolution. ``--principal-cache`` turns on the
+per-worker principal cache, as PRINCIPAL_CACHE_ENABLED would. Set
+AUTH_TENANT_CLAIMS=true to measure tokens that carry tenant claims.
+``--conditional`` replays each endpoint's ETag in If-None-Match, so the
+endpoints that support it answer 304.
+
+python -m benchmarks.request_context --requests 200 [--principal-cache] [--conditional]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from types import SimpleNamespace
+
+import httpx
+
+from benchmarks.common import (
+    LatencySummary,
+    count_round_trips,
+    create_player,
+    write_results,
+)
+from src.auth.principal_cache import principal_cache
+from src.auth.services.users import jwt_strategy
+from src.database import async_session_factory, engine
+from src.main import app
+
+ENDPOINTS = (
+    "/api/worldstate",
+    "/api/inventory",
+    "/api/sessions/history",
+    "/api/leaderboard",
+    "/api/profile",
+)
+
+
+async def measure(
+    client: httpx.AsyncClient,
+    path: str,
+    headers: dict[str, str],
+    requests: int,
+    conditional: bool,
+) -> LatencySummary:
+    if conditional:
+        response = await client.get(path, headers=headers)
+        response.raise_for_status()
+        if etag := response.headers.get("etag"):
+            headers = {**headers, "If-None-Match": etag}
+    samples: list[float] = []
+    not_modified = 0
+    hits = principal_cache.hits
+    with count_round_trips(engine) as counter:
+        for _ in range(requests):
+            started = time.perf_counter()
+            response = await client.get(path, headers=headers)
+            samples.append(time.perf_counter() - started)
+            if response.status_code == 304:
+                not_modified += 1
+            else:
+                response.raise_for_status()
+    return LatencySummary.from_samples(
+        f"GET {path}",
+        samples,
+        not_modified=not_modified,
+        statements_per_request=round(counter.statements / requests, 2),
+        round_trips_per_request=round(counter.round_trips / requests, 2),
+        principal_cache_hits=principal_cache.hits - hits,
+    )
+
+
+async def main(
+    requests: int, output: str | None, principal_cache_on: bool, conditional: bool
+) -> None:
+    principal_cache.enabled = principal_cache_on
+    async with app.router.lifespan_context(app):
+        async with async_session_factory() as session:
+            player = await create_player(session)
+        token = await jwt_strategy.write_token(SimpleNamespace(id=player.user_id))
+        headers = {"Authorization": f"Bearer {token}"}
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench"
+        ) as client:
+            # Creates the hero and world state so every endpoint is steady-state.
+            (await client.get("/api/profile", headers=headers)).raise_for_status()
+            summaries = [
+                await measure(client, path, headers, requests, conditional)
+                for path in ENDPOINTS
+            ]
+    write_results(output, summaries)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--principal-cache", action="store_true")
+    parser.add_argument("--conditional", action="store_true")
+    parser.add_argument("--output", default=None, help="write JSON results here")
+    args = parser.parse_args()
+    asyncio.run(
+        main(args.requests, args.output, args.principal_cache, args.conditional)
+    )
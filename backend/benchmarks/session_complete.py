@@ -0,0 +1,78 @@
+"""Round trips and latency of session completion, ORM flow vs. atomic CTE.
+
+The ORM flow is the pinned copy in ``benchmarks.legacy_completion``, so the
+baseline stays the original handler as the application code moves on.
+
+python -m benchmarks.session_complete --sessions 500 --output complete.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from uuid import UUID
+
+from benchmarks.common import (
+    LatencySummary,
+    count_round_trips,
+    create_finished_timers,
+    create_player,
+    write_results,
+)
+from benchmarks.legacy_completion import legacy_complete
+from src.database import async_session_factory, engine
+from src.game.completion import complete_session_atomic
+
+
+async def atomic_complete(session, *, session_id: UUID, user_id, tenant_id) -> None:
+    await complete_session_atomic(
+        session, session_id=session_id, user_id=user_id, tenant_id=tenant_id
+    )
+    await session.commit()
+
+
+async def run_variant(name: str, handler, sessions: int) -> LatencySummary:
+    async with async_session_factory() as session:
+        player = await create_player(session)
+        session_ids = await create_finished_timers(session, player, sessions)
+
+    samples: list[float] = []
+    with count_round_trips(engine) as counter:
+        for session_id in session_ids:
+            # A fresh AsyncSession per call, like a request.
+            async with async_session_factory() as session:
+                started = time.perf_counter()
+                await handler(
+                    session,
+                    session_id=session_id,
+                    user_id=player.user_id,
+                    tenant_id=player.tenant_id,
+                )
+                samples.append(time.perf_counter() - started)
+
+    return LatencySummary.from_samples(
+        name,
+        samples,
+        round_trips_per_call=round(counter.round_trips / sessions, 2),
+        statements_per_call=round(counter.statements / sessions, 2),
+    )
+
+
+async def main(sessions: int, output: str | None) -> None:
+    # Warm the pool so connection setup is not attributed to either variant.
+    await run_variant("warmup", atomic_complete, 5)
+    summaries = [
+        await run_variant("legacy_orm", legacy_complete, sessions),
+        await run_variant("atomic_cte", atomic_complete, sessions),
+    ]
+    write_results(output, summaries)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--output", default=None, help="write JSON results here")
+    args = parser.parse_args()
+    asyncio.run(main(args.sessions, args.output))
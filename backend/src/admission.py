@@ -0,0 +1,75 @@
+"""Admission control for low-priority routes.
+
+When the connection pool is saturated every request queues behind the same
+connections, and completions time out along with history listings. Routes
+that can be retried later without losing progress opt in to shedding::
+
+    @router.get("/sessions/history", dependencies=[Depends(shed_when_saturated)])
+
+While a checkout has waited ``ADMISSION_POOL_WAIT_SECONDS`` or longer (now,
+or within the last ``ADMISSION_WINDOW_SECONDS``), those routes answer 503
+with ``Retry-After`` before touching the database, which leaves the pool to
+the routes that did not opt in. The signal is per worker, like the pool.
+
+A checkout that waits ``DATABASE_POOL_TIMEOUT`` fails on any route; the
+handler installed by :func:`install_pool_timeout_handler` turns it into the
+same 503 instead of a 500.
+"""
+
+from __future__ import annotations
+
+from fastapi import FastAPI, Request
+from fastapi.exception_handlers import http_exception_handler
+from fastapi.responses import Response
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from src import metrics
+from src.config import settings
+from src.database import engine
+from src.db_timing import TimedAsyncQueuePool
+from src.exceptions import ServiceUnavailable
+
+REQUESTS_SHED = metrics.counter(
+    "http_requests_shed_total",
+    "Low-priority requests answered 503 while the connection pool was saturated.",
+    ["route"],
+)
+POOL_TIMEOUTS = metrics.counter(
+    "db_pool_timeouts_total",
+    "Requests that failed waiting for a pooled connection.",
+)
+
+
+def pool_saturated() -> bool:
+    pool = engine.sync_engine.pool
+    if not isinstance(pool, TimedAsyncQueuePool):
+        return False
+    wait = pool.recent_wait(settings.ADMISSION_WINDOW_SECONDS)
+    return wait >= settings.ADMISSION_POOL_WAIT_SECONDS
+
+
+async def shed_when_saturated(request: Request) -> None:
+    """Dependency that rejects the request while the pool is saturated."""
+    if not settings.ADMISSION_CONTROL_ENABLED or not pool_saturated():
+        return
+    route = request.scope.get("route")
+    REQUESTS_SHED.labels(route=getattr(route, "path_format", "unmatched")).inc()
+    raise ServiceUnavailable(settings.ADMISSION_RETRY_AFTER_SECONDS)
+
+
+async def _pool_timeout_handler(request: Request, _exc: PoolTimeoutError) -> Response:
+    POOL_TIMEOUTS.inc()
+    return await http_exception_handler(
+        request, ServiceUnavailable(settings.ADMISSION_RETRY_AFTER_SECONDS)
+    )
+
+
+def install_pool_timeout_handler(app: FastAPI) -> None:
+    app.add_exception_handler(PoolTimeoutError, _pool_timeout_handler)
+
+
+__all__ = [
+    "install_pool_timeout_handler",
+    "pool_saturated",
+    "shed_when_saturated",
+]
@@ -29,6 +29,7 @@ class AuthConfig:
     cookie_samesite: str
     access_cookie_name: str
     refresh_cookie_name: str
+    tenant_claims: bool
 
     @property
     def access_cookie_max_age(self) -> int:
@@ -58,4 +59,5 @@ auth_config = AuthConfig(
     cookie_samesite=settings.AUTH_COOKIE_SAMESITE,
     access_cookie_name=settings.AUTH_COOKIE_ACCESS_NAME,
     refresh_cookie_name=settings.AUTH_COOKIE_REFRESH_NAME,
+    tenant_claims=settings.AUTH_TENANT_CLAIMS,
 )
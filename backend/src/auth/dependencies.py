@@ -1,21 +1,30 @@
 from __future__ import annotations
 
 import logging
+from collections.abc import Sequence
 from dataclasses import dataclass
+from datetime import datetime
 from typing import Annotated
 from uuid import UUID
 
-from fastapi import Depends, Header, HTTPException, Request, status
+from fastapi import Depends, Header, HTTPException, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.auth.config import auth_config
 from src.auth.models import Tenant, User, UserTenant, UserTenantRole
+from src.auth.principal_cache import principal_cache
 from src.auth.schemas import (
     OrganizationMembershipPublic,
     OrganizationPublic,
     UserPublic,
 )
-from src.auth.services.users import current_active_user
+from src.auth.security.jwt import TenantAccess, read_access_token
+from src.auth.services.users import (
+    bearer_transport,
+    cookie_transport,
+    jwt_strategy,
+)
 from src.database import get_async_session
 
 logger = logging.getLogger(__name__)
@@ -34,23 +43,158 @@ ROLE_PRIORITY: dict[UserTenantRole, int] = {
 }
 
 
-async def get_current_user(
-    user: User = Depends(current_active_user),
-    session: AsyncSession = Depends(get_async_session),
-) -> UserPublic:
+@dataclass(frozen=True)
+class UserSnapshot:
+    """The fields of a ``User`` that authenticated routes read."""
+
+    id: UUID
+    email: str
+    full_name: str | None
+    profile_picture: str | None
+    is_active: bool
+    created_at: datetime
+    updated_at: datetime
+
+    @classmethod
+    def of(cls, user: User) -> UserSnapshot:
+        return cls(
+            id=user.id,
+            email=user.email,
+            full_name=user.full_name,
+            profile_picture=user.profile_picture,
+            is_active=user.is_active,
+            created_at=user.created_at,
+            updated_at=user.updated_at,
+        )
+
+
+@dataclass(frozen=True)
+class TenantSnapshot:
+    id: UUID
+    name: str
+    slug: str
+    business_image: str | None
+    created_at: datetime
+
+
+@dataclass(frozen=True)
+class MembershipSnapshot:
+    """A membership and its tenant, as of when the principal was loaded."""
+
+    tenant: TenantSnapshot
+    role: UserTenantRole
+    is_default: bool
+
+    @classmethod
+    def of(cls, membership: UserTenant, tenant: Tenant) -> MembershipSnapshot:
+        return cls(
+            tenant=TenantSnapshot(
+                id=tenant.id,
+                name=tenant.name,
+                slug=tenant.slug,
+                business_image=tenant.business_image,
+                created_at=tenant.created_at,
+            ),
+            role=membership.role,
+            is_default=membership.is_default,
+        )
+
+    @property
+    def access(self) -> TenantAccess:
+        return TenantAccess(
+            tenant_id=self.tenant.id, role=self.role, is_default=self.is_default
+        )
+
+
+@dataclass(frozen=True)
+class RequestContext:
+    """The authenticated user and their memberships, loaded once per request.
+
+    Immutable snapshots rather than ORM instances: ``principal_cache`` hands
+    the same context to concurrent requests.
+    """
+
+    user: UserSnapshot
+    memberships: tuple[MembershipSnapshot, ...]
+
+
+async def load_request_context(
+    session: AsyncSession,
+    user_id: UUID,
+) -> RequestContext | None:
     statement = (
-        select(UserTenant, Tenant)
-        .join(Tenant, Tenant.id == UserTenant.tenant_id)
-        .where(UserTenant.user_id == user.id)
+        select(User, UserTenant, Tenant)
+        .outerjoin(UserTenant, UserTenant.user_id == User.id)
+        .outerjoin(Tenant, Tenant.id == UserTenant.tenant_id)
+        .where(User.id == user_id)
         .order_by(UserTenant.created_at.asc())
     )
     result = await session.execute(statement)
     rows = result.all()
+    if not rows:
+        return None
+    return RequestContext(
+        user=UserSnapshot.of(rows[0][0]),
+        memberships=tuple(
+            MembershipSnapshot.of(membership, tenant)
+            for _, membership, tenant in rows
+            if membership is not None
+        ),
+    )
+
+
+async def get_request_context(
+    cookie_token: str | None = Depends(cookie_transport.scheme),
+    bearer_token: str | None = Depends(bearer_transport.scheme),
+    session: AsyncSession = Depends(get_async_session),
+) -> RequestContext:
+    """Authenticate like ``current_active_user`` with a single query.
+
+    Same answers too: 401 without a valid token, 403 for an inactive user.
+
+    FastAPI caches dependencies per request, so ``CurrentUser`` and
+    ``current_tenant`` share this result; ``principal_cache`` can also
+    share it across requests carrying the same token.
+    """
+    context: RequestContext | None = None
+    # Same precedence as the fastapi-users backends: cookie, then bearer.
+    for token in (cookie_token, bearer_token):
+        if token is None:
+            continue
+        context = principal_cache.get(token)
+        if context is not None:
+            break
+        claims = read_access_token(jwt_strategy, token)
+        if claims is None:
+            continue
+        context = await load_request_context(session, claims.user_id)
+        if context is not None:
+            if context.user.is_active:
+                principal_cache.put(token, context, token_expires_at=claims.expires_at)
+            break
+
+    if context is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Authentication required.",
+        )
+    if not context.user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User account is inactive.",
+        )
+    return context
 
+
+def build_user_public(
+    user: UserSnapshot,
+    rows: Sequence[MembershipSnapshot],
+) -> UserPublic:
     memberships: list[OrganizationMembershipPublic] = []
     active_org_id: UUID | None = None
 
-    for membership, tenant in rows:
+    for membership in rows:
+        tenant = membership.tenant
         organization = OrganizationPublic(
             id=tenant.id,
             name=tenant.name,
@@ -85,6 +229,78 @@ async def get_current_user(
     return user_public
 
 
+async def get_current_user(
+    context: RequestContext = Depends(get_request_context),
+) -> UserPublic:
+    return build_user_public(context.user, context.memberships)
+
+
+async def load_user_public(user: User, session: AsyncSession) -> UserPublic:
+    statement = (
+        select(UserTenant, Tenant)
+        .join(Tenant, Tenant.id == UserTenant.tenant_id)
+        .where(UserTenant.user_id == user.id)
+        .order_by(UserTenant.created_at.asc())
+    )
+    result = await session.execute(statement)
+    return build_user_public(
+        UserSnapshot.of(user),
+        [MembershipSnapshot.of(membership, tenant) for membership, tenant in result],
+    )
+
+
+def choose_tenant_access(
+    accesses: Sequence[TenantAccess],
+    tenant_id: UUID | None,
+) -> TenantAccess:
+    if tenant_id:
+        accesses = [access for access in accesses if access.tenant_id == tenant_id]
+    if not accesses:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Tenant access denied",
+        )
+
+    if tenant_id or len(accesses) == 1:
+        return accesses[0]
+
+    default = next((access for access in accesses if access.is_default), None)
+    if default:
+        return default
+
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Tenant context is ambiguous. Provide X-Tenant-Id header.",
+    )
+
+
+def select_tenant(
+    rows: list[tuple[UserTenant, Tenant]],
+    tenant_id: UUID | None,
+) -> TenantContext:
+    access = choose_tenant_access(
+        [TenantAccess.from_membership(membership) for membership, _ in rows],
+        tenant_id,
+    )
+    membership, tenant = next(row for row in rows if row[1].id == access.tenant_id)
+    return TenantContext(tenant=tenant, membership=membership)
+
+
+def select_membership(
+    memberships: Sequence[MembershipSnapshot],
+    tenant_id: UUID | None,
+) -> MembershipSnapshot:
+    """``select_tenant`` for the memberships of a :class:`RequestContext`."""
+    access = choose_tenant_access(
+        [membership.access for membership in memberships], tenant_id
+    )
+    return next(
+        membership
+        for membership in memberships
+        if membership.tenant.id == access.tenant_id
+    )
+
+
 async def resolve_tenant(
     *,
     tenant_id: UUID | None,
@@ -92,71 +308,93 @@ async def resolve_tenant(
     session: AsyncSession,
 ) -> TenantContext:
     statement = (
-        select(Tenant, UserTenant)
-        .join(UserTenant, UserTenant.tenant_id == Tenant.id)
+        select(UserTenant, Tenant)
+        .join(Tenant, Tenant.id == UserTenant.tenant_id)
         .where(UserTenant.user_id == user.id)
     )
     if tenant_id:
         statement = statement.where(Tenant.id == tenant_id)
 
     result = await session.execute(statement)
-    rows = result.all()
-    if not rows:
+    return select_tenant([tuple(row) for row in result.all()], tenant_id)
+
+
+def parse_tenant_header(tenant_header: str | None) -> UUID | None:
+    if not tenant_header:
+        return None
+    try:
+        return UUID(tenant_header)
+    except ValueError as exc:  # pragma: no cover - defensive
         raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Tenant access denied",
-        )
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid tenant id",
+        ) from exc
 
-    if tenant_id:
-        tenant, membership = rows[0]
-        return TenantContext(tenant=tenant, membership=membership)
 
-    if len(rows) == 1:
-        tenant, membership = rows[0]
-        return TenantContext(tenant=tenant, membership=membership)
+async def current_tenant(
+    tenant_header: str | None = Header(default=None, alias="X-Tenant-Id"),
+    context: RequestContext = Depends(get_request_context),
+) -> MembershipSnapshot:
+    return select_membership(context.memberships, parse_tenant_header(tenant_header))
 
-    default = next((row for row in rows if row[1].is_default), None)
-    if default:
-        tenant, membership = default
-        return TenantContext(tenant=tenant, membership=membership)
 
-    raise HTTPException(
-        status_code=status.HTTP_400_BAD_REQUEST,
-        detail="Tenant context is ambiguous. Provide X-Tenant-Id header.",
-    )
+@dataclass(frozen=True)
+class Principal:
+    """The caller and the tenant they act in, without the rows behind them."""
 
+    user_id: UUID
+    tenant_id: UUID
+    role: UserTenantRole
 
-async def current_tenant(
-    request: Request,
+
+async def current_principal(
     tenant_header: str | None = Header(default=None, alias="X-Tenant-Id"),
-    user: User = Depends(current_active_user),
+    cookie_token: str | None = Depends(cookie_transport.scheme),
+    bearer_token: str | None = Depends(bearer_transport.scheme),
     session: AsyncSession = Depends(get_async_session),
-) -> TenantContext:
-    tenant_id: UUID | None = None
-    if tenant_header:
-        try:
-            tenant_id = UUID(tenant_header)
-        except ValueError as exc:  # pragma: no cover - defensive
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid tenant id",
-            ) from exc
+) -> Principal:
+    """Authorize from the token's tenant claims when ``AUTH_TENANT_CLAIMS`` is on.
+
+    Such requests never touch the database for auth, so a deactivated user
+    or a removed membership keeps access until the token expires. Tokens
+    without claims fall back to ``get_request_context``.
+    """
+    tenant_id = parse_tenant_header(tenant_header)
+    if auth_config.tenant_claims:
+        for token in (cookie_token, bearer_token):
+            claims = read_access_token(jwt_strategy, token)
+            if claims is None:
+                continue
+            if claims.tenants is not None:
+                access = choose_tenant_access(claims.tenants, tenant_id)
+                return Principal(
+                    user_id=claims.user_id,
+                    tenant_id=access.tenant_id,
+                    role=access.role,
+                )
+            break
 
-    return await resolve_tenant(tenant_id=tenant_id, user=user, session=session)
+    context = await get_request_context(cookie_token, bearer_token, session)
+    membership = select_membership(context.memberships, tenant_id)
+    return Principal(
+        user_id=context.user.id,
+        tenant_id=membership.tenant.id,
+        role=membership.role,
+    )
 
 
 def require_role(min_role: UserTenantRole):
     async def dependency(
-        context: TenantContext = Depends(current_tenant),
-    ) -> TenantContext:
-        current_priority = ROLE_PRIORITY[context.membership.role]
+        principal: Principal = Depends(current_principal),
+    ) -> Principal:
+        current_priority = ROLE_PRIORITY[principal.role]
         required_priority = ROLE_PRIORITY[min_role]
         if current_priority < required_priority:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Insufficient tenant role",
             )
-        return context
+        return principal
 
     return dependency
 
@@ -165,11 +403,24 @@ CurrentUser = Annotated[UserPublic, Depends(get_current_user)]
 
 
 __all__ = [
+    "MembershipSnapshot",
+    "Principal",
+    "RequestContext",
     "TenantContext",
+    "TenantSnapshot",
+    "UserSnapshot",
+    "build_user_public",
+    "choose_tenant_access",
+    "current_principal",
     "current_tenant",
     "resolve_tenant",
     "ROLE_PRIORITY",
     "require_role",
     "get_current_user",
+    "get_request_context",
+    "load_request_context",
+    "load_user_public",
+    "select_membership",
+    "select_tenant",
     "CurrentUser",
 ]
@@ -80,6 +80,14 @@ class User(SQLAlchemyBaseUserTableUUID, TimestampMixin, Base):
 
 class Tenant(Base):
     __tablename__ = "tenant"
+    __table_args__ = (
+        # Prefix scans for slug variants (src/utils.py generate_unique_slug).
+        Index(
+            "ix_tenant_slug_pattern",
+            "slug",
+            postgresql_ops={"slug": "varchar_pattern_ops"},
+        ),
+    )
 
     id: Mapped[UUID] = mapped_column(
         PGUUID(as_uuid=True), primary_key=True, default=uuid4
@@ -0,0 +1,126 @@
+"""Per-worker cache of authenticated principals.
+
+Access tokens only carry the user id, so every authenticated request would
+otherwise load the user, their memberships and tenants. With
+``PRINCIPAL_CACHE_ENABLED`` the resolved :class:`RequestContext` is kept per
+access token in a bounded LRU for ``PRINCIPAL_CACHE_TTL_SECONDS`` (never
+past the token's own expiry), so repeated requests skip the query.
+
+Writes that change a principal call the ``invalidate_*`` hooks after they
+commit. The hooks only reach the worker that handled the write; other
+workers serve the old principal until the TTL runs out, which bounds how
+long a removed membership or deactivated account can keep access.
+
+Contexts hold frozen snapshots of the user, memberships and tenants, not
+ORM instances, so the requests sharing one cannot change it or lazy-load
+through it.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+from uuid import UUID
+
+from src import metrics
+from src.config import settings
+
+if TYPE_CHECKING:
+    from src.auth.dependencies import RequestContext
+
+PRINCIPAL_CACHE_LOOKUPS = metrics.counter(
+    "auth_principal_cache_lookups_total",
+    "Principal cache lookups by result (hit or miss).",
+    ["result"],
+)
+
+
+@dataclass
+class _Entry:
+    context: RequestContext
+    expires_at: float
+
+
+class PrincipalCache:
+    def __init__(self, *, enabled: bool, ttl_seconds: float, max_entries: int):
+        self.enabled = enabled and ttl_seconds > 0 and max_entries > 0
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+
+    def get(self, token: str) -> RequestContext | None:
+        if not self.enabled:
+            return None
+        entry = self._entries.get(token)
+        if entry is not None and entry.expires_at <= time.time():
+            del self._entries[token]
+            entry = None
+        if entry is None:
+            self.misses += 1
+            PRINCIPAL_CACHE_LOOKUPS.labels(result="miss").inc()
+            return None
+        self._entries.move_to_end(token)
+        self.hits += 1
+        PRINCIPAL_CACHE_LOOKUPS.labels(result="hit").inc()
+        return entry.context
+
+    def put(
+        self,
+        token: str,
+        context: RequestContext,
+        *,
+        token_expires_at: float | None,
+    ) -> None:
+        if not self.enabled:
+            return
+        expires_at = time.time() + self.ttl_seconds
+        if token_expires_at is not None:
+            expires_at = min(expires_at, token_expires_at)
+        self._entries[token] = _Entry(context=context, expires_at=expires_at)
+        self._entries.move_to_end(token)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id: UUID) -> None:
+        """Drop every token of ``user_id`` (profile or membership changes)."""
+        self._drop(lambda context: context.user.id == user_id)
+
+    def invalidate_tenant(self, tenant_id: UUID) -> None:
+        """Drop every principal that is a member of ``tenant_id``."""
+        self._drop(
+            lambda context: any(
+                membership.tenant.id == tenant_id for membership in context.memberships
+            )
+        )
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def _drop(self, predicate) -> None:
+        # Writes are rare next to reads, so a scan beats keeping reverse indexes.
+        stale = [
+            token for token, entry in self._entries.items() if predicate(entry.context)
+        ]
+        for token in stale:
+            del self._entries[token]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+principal_cache = PrincipalCache(
+    enabled=settings.PRINCIPAL_CACHE_ENABLED,
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    max_entries=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+)
+
+
+__all__ = [
+    "PRINCIPAL_CACHE_LOOKUPS",
+    "PrincipalCache",
+    "principal_cache",
+]
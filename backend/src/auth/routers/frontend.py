@@ -4,21 +4,26 @@ import logging
 from datetime import UTC, datetime
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status
 from fastapi.responses import JSONResponse
 from fastapi.security import OAuth2PasswordRequestForm
 from fastapi_users import exceptions as fastapi_users_exceptions
 from fastapi_users.authentication import Strategy
 from fastapi_users.manager import BaseUserManager
-from google.auth import exceptions as google_exceptions
-from google.auth.transport import requests as google_requests
-from google.oauth2 import id_token
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.auth.config import auth_config
-from src.auth.dependencies import ROLE_PRIORITY, get_current_user, resolve_tenant
+from src.auth.dependencies import (
+    ROLE_PRIORITY,
+    RequestContext,
+    build_user_public,
+    get_request_context,
+    load_user_public,
+    resolve_tenant,
+)
 from src.auth.models import Invitation, Tenant, User, UserTenant, UserTenantRole
+from src.auth.principal_cache import principal_cache
 from src.auth.schemas import (
     AuthResponse,
     ChangePasswordRequest,
@@ -37,11 +42,15 @@ from src.auth.schemas import (
     SigninRequest,
     SignupRequest,
     SwitchOrganizationRequest,
-    TenantCreate,
     UpdateProfileRequest,
     UserCreate,
     UserPublic,
 )
+from src.auth.security.google import (
+    GoogleKeysUnavailable,
+    GoogleTokenError,
+    google_verifier,
+)
 from src.auth.security.refresh import RefreshTokenNotFound, RefreshTokenService
 from src.auth.services.invitations import InvitationService
 from src.auth.services.tenants import TenantService
@@ -53,7 +62,8 @@ from src.auth.services.users import (
 )
 from src.config import settings
 from src.database import get_async_session
-from src.utils import generate_unique_slug
+from src.etags import make_etag, not_modified, not_modified_response, set_etag
+from src.replicas import get_read_session
 
 router = APIRouter(tags=["auth-app"])
 logger = logging.getLogger(__name__)
@@ -64,7 +74,7 @@ async def _serialize_user_public(
     user: User,
     session: AsyncSession,
 ) -> UserPublic:
-    return await get_current_user(user=user, session=session)
+    return await load_user_public(user, session)
 
 
 def _serialize_invitation_public(
@@ -160,9 +170,22 @@ async def _build_auth_response(
     return response
 
 
+def _profile_etag(context: RequestContext) -> str:
+    # The snapshots hold every field of the response, and more.
+    return make_etag("profile", context.user, *context.memberships)
+
+
 @router.get("/profile", response_model=UserPublic, name="auth:profile")
-async def get_profile(user: UserPublic = Depends(get_current_user)) -> UserPublic:
-    return user
+async def get_profile(
+    response: Response,
+    context: RequestContext = Depends(get_request_context),
+    if_none_match: str | None = Header(default=None),
+) -> UserPublic | Response:
+    etag = _profile_etag(context)
+    if not_modified(if_none_match, etag):
+        return not_modified_response(etag)
+    set_etag(response, etag)
+    return build_user_public(context.user, context.memberships)
 
 
 @router.patch("/profile", response_model=UserPublic, name="auth:update_profile")
@@ -181,6 +204,7 @@ async def update_profile(
 
     session.add(user)
     await session.commit()
+    principal_cache.invalidate_user(user.id)
     await session.refresh(user)
     return await _serialize_user_public(user=user, session=session)
 
@@ -218,7 +242,7 @@ async def change_password(
     session: AsyncSession = Depends(get_async_session),
     user_manager: UserManager = Depends(get_user_manager),
 ) -> JSONResponse:
-    valid, new_hash = user_manager.password_helper.verify_and_update(
+    valid, new_hash = await user_manager.password_helper.verify_and_update_async(
         payload.current_password,
         user.hashed_password,
     )
@@ -231,7 +255,9 @@ async def change_password(
         user.hashed_password = new_hash
 
     await user_manager.validate_password(payload.new_password, user)
-    user.hashed_password = user_manager.password_helper.hash(payload.new_password)
+    user.hashed_password = await user_manager.password_helper.hash_async(
+        payload.new_password
+    )
 
     session.add(user)
 
@@ -274,12 +300,16 @@ async def signin_with_google(
         )
 
     try:
-        id_info = id_token.verify_oauth2_token(
-            payload.credential,
-            google_requests.Request(),
-            settings.OAUTH_GOOGLE_CLIENT_ID,
+        id_info = await google_verifier.verify(
+            payload.credential, settings.OAUTH_GOOGLE_CLIENT_ID
         )
-    except (ValueError, google_exceptions.GoogleAuthError) as exc:
+    except GoogleKeysUnavailable as exc:
+        logger.exception("Google signing keys are unavailable")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Google sign-in is temporarily unavailable.",
+        ) from exc
+    except GoogleTokenError as exc:
         logger.exception("Failed to verify Google credential")
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -360,6 +390,7 @@ async def signin_with_google(
     if should_commit:
         session.add(user)
         await session.commit()
+        principal_cache.invalidate_user(user.id)
         await session.refresh(user)
         logger.debug("Updated profile details from Google for user=%s", user.id)
 
@@ -384,16 +415,14 @@ async def signin_with_google(
             else _derive_default_organization_name(display_name, email)
         )
         tenant_service = TenantService(session)
-        slug = await generate_unique_slug(session, organization_name)
-        await tenant_service.create_tenant(
-            user,
-            TenantCreate(name=organization_name, slug=slug),
+        tenant = await tenant_service.create_tenant_with_generated_slug(
+            user, organization_name
         )
         membership_changed = True
         logger.info(
             "Created default tenant name=%s slug=%s for new Google user=%s",
             organization_name,
-            slug,
+            tenant.slug,
             user.id,
         )
 
@@ -524,11 +553,7 @@ async def signup(
             )
 
         tenant_service = TenantService(session)
-        slug = await generate_unique_slug(session, org_name)
-        await tenant_service.create_tenant(
-            user,
-            TenantCreate(name=org_name, slug=slug),
-        )
+        await tenant_service.create_tenant_with_generated_slug(user, org_name)
 
     await session.refresh(user)
     return await _build_auth_response(
@@ -575,11 +600,7 @@ async def create_organization(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Organization name cannot be empty.",
         )
-    slug = await generate_unique_slug(session, name)
-    await tenant_service.create_tenant(
-        user,
-        TenantCreate(name=name, slug=slug),
-    )
+    await tenant_service.create_tenant_with_generated_slug(user, name)
     await session.refresh(user)
     return await _build_auth_response(
         user=user,
@@ -639,6 +660,7 @@ async def list_members(
     organization_id: UUID,
     user: User = Depends(current_active_user),
     session: AsyncSession = Depends(get_async_session),
+    read_session: AsyncSession = Depends(get_read_session),
 ) -> list[OrganizationMemberPublic]:
     await resolve_tenant(tenant_id=organization_id, user=user, session=session)
 
@@ -648,7 +670,7 @@ async def list_members(
         .where(UserTenant.tenant_id == organization_id)
         .order_by(UserTenant.created_at.asc())
     )
-    result = await session.execute(statement)
+    result = await read_session.execute(statement)
     return [
         _serialize_member(membership, member) for membership, member in result.all()
     ]
@@ -705,6 +727,7 @@ async def remove_member(
 
     await session.delete(membership)
     await session.commit()
+    principal_cache.invalidate_user(member_id)
     return MessageResponse(message="Member removed.")
 
 
@@ -11,11 +11,17 @@ from src.auth.schemas import TenantCreate, TenantRead, TenantUpdate
 from src.auth.services.tenants import TenantService
 from src.auth.services.users import current_active_user
 from src.database import get_async_session
+from src.query_budget import QueryBudget
 
 router = APIRouter(tags=["tenants"])
 
 
-@router.post("/", response_model=TenantRead, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/",
+    response_model=TenantRead,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(QueryBudget(6))],
+)
 async def create_tenant(
     payload: TenantCreate,
     user=Depends(current_active_user),
@@ -39,7 +45,9 @@ async def create_tenant(
     )
 
 
-@router.get("/", response_model=list[TenantRead])
+@router.get(
+    "/", response_model=list[TenantRead], dependencies=[Depends(QueryBudget(2))]
+)
 async def list_tenants(
     user=Depends(current_active_user),
     session: AsyncSession = Depends(get_async_session),
@@ -48,7 +56,9 @@ async def list_tenants(
     return await service.list_for_user(user)
 
 
-@router.patch("/{tenant_id}", response_model=TenantRead)
+@router.patch(
+    "/{tenant_id}", response_model=TenantRead, dependencies=[Depends(QueryBudget(4))]
+)
 async def update_tenant(
     tenant_id: UUID,
     payload: TenantUpdate,
@@ -79,7 +89,9 @@ async def update_tenant(
     )
 
 
-@router.get("/{tenant_id}", response_model=TenantRead)
+@router.get(
+    "/{tenant_id}", response_model=TenantRead, dependencies=[Depends(QueryBudget(2))]
+)
 async def get_tenant(
     tenant_id: UUID,
     user=Depends(current_active_user),
@@ -104,6 +116,7 @@ async def get_tenant(
 @router.post(
     "/{tenant_id}/make-default",
     status_code=status.HTTP_200_OK,
+    dependencies=[Depends(QueryBudget(4))],
 )
 async def make_default(
     tenant_id: UUID,
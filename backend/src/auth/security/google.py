@@ -0,0 +1,167 @@
+"""Google ID-token verification against cached signing keys.
+
+:class:`GoogleIdTokenVerifier` keeps Google's JSON Web Key Set from
+``OAUTH_GOOGLE_JWKS_URL`` in memory for as long as the response's
+``Cache-Control: max-age`` allows (less its ``Age``), and :meth:`run
+<GoogleIdTokenVerifier.run>` refreshes it in the background shortly before
+then, so verifying a sign-in is a local RS256 check with no network I/O.
+
+A sign-in only waits on a fetch when there are no keys yet or the token
+names a key id the cache does not know, which is how a key rotation shows
+before the scheduled refresh. Those fetches are single-flight and happen at
+most once every ``MIN_REFRESH_SECONDS``, so tokens with made-up key ids
+cannot hammer Google. Keys past their max-age keep verifying while a refresh
+fails; Google publishes new keys well before it retires old ones.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import re
+import time
+from typing import Any
+
+import httpx
+import jwt
+
+from src import metrics
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+# Used when the key set response carries no max-age.
+DEFAULT_MAX_AGE_SECONDS = 3600
+# The background refresh runs this long before the keys expire.
+REFRESH_AHEAD_SECONDS = 60
+# Floor between fetches, and the retry delay after a failed one.
+MIN_REFRESH_SECONDS = 30
+FETCH_TIMEOUT_SECONDS = 5
+
+_MAX_AGE = re.compile(r"(?:^|,)\s*max-age\s*=\s*\"?(\d+)", re.IGNORECASE)
+
+KEY_FETCHES = metrics.counter(
+    "google_jwks_fetches_total",
+    "Fetches of Google's ID-token signing keys, by outcome.",
+    ["outcome"],
+)
+
+
+class GoogleTokenError(Exception):
+    """Raised when a Google ID token does not verify."""
+
+
+class GoogleKeysUnavailable(Exception):
+    """Raised when Google's signing keys cannot be fetched."""
+
+
+def _max_age(headers: httpx.Headers) -> float:
+    match = _MAX_AGE.search(headers.get("cache-control", ""))
+    if match is None:
+        return DEFAULT_MAX_AGE_SECONDS
+    try:
+        age = int(headers.get("age", "0"))
+    except ValueError:
+        age = 0
+    return max(int(match.group(1)) - age, 0)
+
+
+class GoogleIdTokenVerifier:
+    def __init__(
+        self, jwks_url: str, *, transport: httpx.AsyncBaseTransport | None = None
+    ) -> None:
+        self.jwks_url = jwks_url
+        self.transport = transport
+        self._keys: dict[str, jwt.PyJWK] = {}
+        self._expires_at = 0.0
+        self._fetched_at = -math.inf
+        self._lock = asyncio.Lock()
+
+    async def refresh(self, *, force: bool = True) -> None:
+        """Fetch the key set, skipped unforced if one ran very recently."""
+        async with self._lock:
+            now = time.monotonic()
+            if not force and now - self._fetched_at < MIN_REFRESH_SECONDS:
+                return
+            # Set before fetching so failures are rate limited too.
+            self._fetched_at = now
+            try:
+                async with httpx.AsyncClient(
+                    transport=self.transport, timeout=FETCH_TIMEOUT_SECONDS
+                ) as client:
+                    response = await client.get(self.jwks_url)
+                response.raise_for_status()
+                keys = {}
+                for data in response.json()["keys"]:
+                    if data.get("kid"):
+                        keys[data["kid"]] = jwt.PyJWK(data)
+            except (httpx.HTTPError, ValueError, KeyError, TypeError) as exc:
+                # PyJWKError is a ValueError too.
+                KEY_FETCHES.labels(outcome="error").inc()
+                raise GoogleKeysUnavailable(
+                    f"Fetching {self.jwks_url} failed: {exc!r}"
+                ) from exc
+            if not keys:
+                KEY_FETCHES.labels(outcome="error").inc()
+                raise GoogleKeysUnavailable(f"{self.jwks_url} returned no keys")
+            KEY_FETCHES.labels(outcome="ok").inc()
+            self._keys = keys
+            self._expires_at = now + _max_age(response.headers)
+
+    async def verify(self, token: str, audience: str) -> dict[str, Any]:
+        """Return the claims of a Google ID token issued to ``audience``."""
+        try:
+            kid = jwt.get_unverified_header(token).get("kid")
+        except jwt.InvalidTokenError as exc:
+            raise GoogleTokenError(str(exc)) from exc
+        key = self._keys.get(kid)
+        if key is None:
+            try:
+                await self.refresh(force=False)
+            except GoogleKeysUnavailable:
+                # Cached keys still verify, so an unknown key id is the
+                # token's fault, not an outage.
+                if not self._keys:
+                    raise
+            key = self._keys.get(kid)
+            if not self._keys:
+                raise GoogleKeysUnavailable("No Google signing keys yet")
+            if key is None:
+                raise GoogleTokenError(f"Unknown signing key {kid!r}")
+        try:
+            claims = jwt.decode(
+                token,
+                key.key,
+                algorithms=["RS256"],
+                audience=audience,
+                options={"require": ["exp", "iat", "iss", "aud"]},
+            )
+        except jwt.InvalidTokenError as exc:
+            raise GoogleTokenError(str(exc)) from exc
+        if claims["iss"] not in GOOGLE_ISSUERS:
+            raise GoogleTokenError(f"Unexpected issuer {claims['iss']!r}")
+        return claims
+
+    async def run(self) -> None:
+        """Keep the keys fresh, refreshing ahead of their expiry."""
+        while True:
+            try:
+                await self.refresh()
+                delay = self._expires_at - time.monotonic() - REFRESH_AHEAD_SECONDS
+            except GoogleKeysUnavailable:
+                logger.warning("Refreshing Google signing keys failed", exc_info=True)
+                delay = 0
+            await asyncio.sleep(max(delay, MIN_REFRESH_SECONDS))
+
+
+google_verifier = GoogleIdTokenVerifier(settings.OAUTH_GOOGLE_JWKS_URL)
+
+
+__all__ = [
+    "GoogleIdTokenVerifier",
+    "GoogleKeysUnavailable",
+    "GoogleTokenError",
+    "google_verifier",
+]
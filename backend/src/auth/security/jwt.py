@@ -1,12 +1,136 @@
 from __future__ import annotations
 
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any
+from uuid import UUID
+
+import jwt
 from fastapi_users.authentication import JWTStrategy
+from fastapi_users.jwt import decode_jwt, generate_jwt
+from sqlalchemy import select
+from sqlalchemy.exc import NoInspectionAvailable
+from sqlalchemy.ext.asyncio import AsyncSession, async_object_session
+from sqlalchemy.orm.exc import UnmappedInstanceError
 
 from src.auth.config import auth_config
+from src.auth.models import User, UserTenant, UserTenantRole
+from src.database import async_session_factory
+
+# [[tenant_id, role, is_default], ...]; absent from tokens minted without it.
+TENANTS_CLAIM = "tenants"
+
+
+@dataclass(frozen=True)
+class TenantAccess:
+    tenant_id: UUID
+    role: UserTenantRole
+    is_default: bool
+
+    @classmethod
+    def from_membership(cls, membership: UserTenant) -> TenantAccess:
+        return cls(
+            tenant_id=membership.tenant_id,
+            role=membership.role,
+            is_default=membership.is_default,
+        )
+
+    @classmethod
+    def from_claim(cls, claim: Sequence[Any]) -> TenantAccess:
+        tenant_id, role, is_default = claim
+        return cls(
+            tenant_id=UUID(tenant_id),
+            role=UserTenantRole(role),
+            is_default=bool(is_default),
+        )
+
+    def to_claim(self) -> list[Any]:
+        return [str(self.tenant_id), self.role.value, int(self.is_default)]
+
+
+@dataclass(frozen=True)
+class AccessTokenClaims:
+    user_id: UUID
+    expires_at: float | None
+    # None when the token carries no tenant claim.
+    tenants: tuple[TenantAccess, ...] | None = None
+
+
+async def load_tenant_access(
+    session: AsyncSession, user_id: UUID
+) -> list[TenantAccess]:
+    result = await session.execute(
+        select(UserTenant)
+        .where(UserTenant.user_id == user_id)
+        .order_by(UserTenant.created_at.asc())
+    )
+    return [TenantAccess.from_membership(row) for row in result.scalars()]
+
+
+class TenantClaimsJWTStrategy(JWTStrategy[User, UUID]):
+    """Access tokens that also list the user's tenant memberships.
+
+    Requests can then authorize a tenant from the token alone. Membership
+    changes reach the claims when the next token is minted, i.e. within one
+    access token lifetime.
+    """
+
+    async def write_token(self, user: User) -> str:
+        session = _object_session(user)
+        if session is None:
+            async with async_session_factory() as session:
+                tenants = await load_tenant_access(session, user.id)
+        else:
+            tenants = await load_tenant_access(session, user.id)
+        data = {
+            "sub": str(user.id),
+            "aud": self.token_audience,
+            TENANTS_CLAIM: [access.to_claim() for access in tenants],
+        }
+        return generate_jwt(
+            data, self.encode_key, self.lifetime_seconds, algorithm=self.algorithm
+        )
+
+
+def _object_session(user: User) -> AsyncSession | None:
+    try:
+        return async_object_session(user)
+    except (NoInspectionAvailable, UnmappedInstanceError):
+        return None
 
 
 def get_jwt_strategy() -> JWTStrategy:
-    return JWTStrategy(
+    strategy_class = (
+        TenantClaimsJWTStrategy if auth_config.tenant_claims else JWTStrategy
+    )
+    return strategy_class(
         secret=auth_config.jwt_secret,
         lifetime_seconds=int(auth_config.access_token_ttl.total_seconds()),
     )
+
+
+def read_access_token(
+    strategy: JWTStrategy, token: str | None
+) -> AccessTokenClaims | None:
+    """Verify an access token without loading the user it belongs to."""
+    if token is None:
+        return None
+    try:
+        data = decode_jwt(
+            token,
+            strategy.decode_key,
+            strategy.token_audience,
+            algorithms=[strategy.algorithm],
+        )
+        tenants = data.get(TENANTS_CLAIM)
+        return AccessTokenClaims(
+            user_id=UUID(data["sub"]),
+            expires_at=data.get("exp"),
+            tenants=(
+                tuple(TenantAccess.from_claim(claim) for claim in tenants)
+                if tenants is not None
+                else None
+            ),
+        )
+    except (jwt.PyJWTError, KeyError, TypeError, ValueError):
+        return None
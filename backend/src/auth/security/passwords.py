@@ -0,0 +1,129 @@
+"""Password hashing off the event loop.
+
+Argon2 takes a few hundred milliseconds of CPU per hash or verify, which
+stalled every other request of the worker during a burst of sign-ins.
+:class:`PooledPasswordHelper` runs them on ``PASSWORD_HASH_WORKERS``
+threads instead (0 keeps them on the loop). argon2-cffi and bcrypt release
+the GIL while hashing, so the loop keeps serving meanwhile. ``UserManager``
+awaits
+:meth:`~PooledPasswordHelper.hash_async` and
+:meth:`~PooledPasswordHelper.verify_and_update_async` wherever fastapi-users
+would hash inline.
+
+Calls beyond the workers queue up. With ``PASSWORD_HASH_MAX_QUEUE`` set,
+a call that would find that many already queued gets a 503 with
+``Retry-After`` instead of waiting behind them, so a burst of sign-ins
+fails fast rather than running into client timeouts.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import TypeVar
+
+from fastapi_users.password import PasswordHelper
+
+from src import metrics
+from src.config import settings
+from src.exceptions import ServiceUnavailable
+
+T = TypeVar("T")
+
+PASSWORD_HASH_QUEUED = metrics.gauge(
+    "password_hash_queued",
+    "Password hashes and verifications waiting for a hashing thread.",
+    multiprocess_mode="livesum",
+)
+PASSWORD_HASH_RUNNING = metrics.gauge(
+    "password_hash_running",
+    "Password hashes and verifications running on a hashing thread.",
+    multiprocess_mode="livesum",
+)
+PASSWORD_HASH_WAIT_SECONDS = metrics.histogram(
+    "password_hash_wait_seconds",
+    "Time each password hash or verification waited for a hashing thread.",
+    ["operation"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+PASSWORD_HASH_SECONDS = metrics.histogram(
+    "password_hash_seconds",
+    "Time each password hash or verification ran on a hashing thread.",
+    ["operation"],
+    buckets=(0.01, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1, 2.5),
+)
+PASSWORD_HASH_SHED = metrics.counter(
+    "password_hash_shed_total",
+    "Password hashes and verifications refused because the queue was full.",
+    ["operation"],
+)
+
+
+class PooledPasswordHelper(PasswordHelper):
+    """A ``PasswordHelper`` that can hash and verify on a bounded thread pool."""
+
+    def __init__(self, workers: int, max_queue: int = 0) -> None:
+        super().__init__()
+        self.workers = workers
+        self.max_queue = max_queue
+        # Submitted and not finished, whether queued or running.
+        self.pending = 0
+        self._executor = (
+            ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+            if workers
+            else None
+        )
+
+    async def _run(self, operation: str, function: Callable[..., T], *args) -> T:
+        if self._executor is None:
+            return function(*args)
+        if self.max_queue and self.pending >= self.workers + self.max_queue:
+            PASSWORD_HASH_SHED.labels(operation=operation).inc()
+            raise ServiceUnavailable(settings.ADMISSION_RETRY_AFTER_SECONDS)
+        submitted = time.perf_counter()
+
+        def timed() -> T:
+            began = time.perf_counter()
+            PASSWORD_HASH_WAIT_SECONDS.labels(operation=operation).observe(
+                began - submitted
+            )
+            PASSWORD_HASH_QUEUED.dec()
+            PASSWORD_HASH_RUNNING.inc()
+            try:
+                return function(*args)
+            finally:
+                PASSWORD_HASH_RUNNING.dec()
+                PASSWORD_HASH_SECONDS.labels(operation=operation).observe(
+                    time.perf_counter() - began
+                )
+
+        self.pending += 1
+        PASSWORD_HASH_QUEUED.inc()
+        future = self._executor.submit(timed)
+        try:
+            return await asyncio.wrap_future(future)
+        finally:
+            self.pending -= 1
+            if future.cancelled():
+                # Cancelled while still queued, so ``timed`` never ran.
+                PASSWORD_HASH_QUEUED.dec()
+
+    async def hash_async(self, password: str) -> str:
+        return await self._run("hash", self.hash, password)
+
+    async def verify_and_update_async(
+        self, plain_password: str, hashed_password: str
+    ) -> tuple[bool, str | None]:
+        return await self._run(
+            "verify", self.verify_and_update, plain_password, hashed_password
+        )
+
+
+password_helper = PooledPasswordHelper(
+    settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_QUEUE
+)
+
+
+__all__ = ["PooledPasswordHelper", "password_helper"]
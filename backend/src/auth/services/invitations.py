@@ -11,6 +11,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.auth.config import auth_config
 from src.auth.models import Invitation, InvitationStatus, Tenant, User, UserTenant
+from src.auth.principal_cache import principal_cache
 from src.auth.schemas import InvitationCreate
 from src.mailer import send_invitation_email
 from src.utils import build_frontend_url
@@ -119,6 +120,7 @@ class InvitationService:
 
         invitation.status = InvitationStatus.ACCEPTED
         await self.session.commit()
+        principal_cache.invalidate_user(user.id)
         await self.session.refresh(invitation)
         return invitation
 
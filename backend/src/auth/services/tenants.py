@@ -3,11 +3,13 @@ from __future__ import annotations
 from uuid import UUID
 
 from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload
 
 from src.auth.models import Tenant, User, UserTenant, UserTenantRole
+from src.auth.principal_cache import principal_cache
 from src.auth.schemas import TenantCreate, TenantRead, TenantUpdate
+from src.utils import generate_unique_slug
 
 try:  # pragma: no cover - optional dependency
     from src.expenses.constants import DEFAULT_EXPENSE_TYPE_NAMES
@@ -16,6 +18,9 @@ except ModuleNotFoundError:  # pragma: no cover - fallback when module absent
     DEFAULT_EXPENSE_TYPE_NAMES: list[str] = []
     expense_types = None
 
+# Slug picks that may lose to concurrent sign-ups before one is given up on
+SLUG_ATTEMPTS = 5
+
 
 class TenantService:
     def __init__(self, session: AsyncSession) -> None:
@@ -33,7 +38,36 @@ class TenantService:
         )
         self.session.add(tenant)
         await self.session.flush()
+        return await self._add_owner(user, tenant)
+
+    async def create_tenant_with_generated_slug(self, user: User, name: str) -> Tenant:
+        """Create a tenant named ``name`` with a slug generated from it.
+
+        Concurrent sign-ups with the same name can pick the same slug. The
+        insert that loses runs in a savepoint and picks again, this time
+        under the base slug's advisory lock.
+        """
+        for attempt in range(SLUG_ATTEMPTS - 1):
+            try:
+                tenant = await self._insert_with_generated_slug(name, lock=attempt > 0)
+                break
+            except IntegrityError as exc:
+                if "tenant_slug_key" not in str(exc.orig):
+                    raise
+        else:
+            tenant = await self._insert_with_generated_slug(name, lock=True)
+        return await self._add_owner(user, tenant)
+
+    async def _insert_with_generated_slug(self, name: str, *, lock: bool) -> Tenant:
+        # Outside the savepoint: rolling one back releases locks taken in it.
+        slug = await generate_unique_slug(self.session, name, lock=lock)
+        tenant = Tenant(name=name, slug=slug)
+        async with self.session.begin_nested():
+            self.session.add(tenant)
+            await self.session.flush()
+        return tenant
 
+    async def _add_owner(self, user: User, tenant: Tenant) -> Tenant:
         await self._seed_default_expense_types(tenant.id)
 
         should_set_default = await self._has_default_membership(user.id) is False
@@ -46,6 +80,7 @@ class TenantService:
         )
         self.session.add(membership)
         await self.session.commit()
+        principal_cache.invalidate_user(user.id)
         await self.session.refresh(tenant)
         return tenant
 
@@ -54,7 +89,6 @@ class TenantService:
             select(Tenant, UserTenant)
             .join(UserTenant, UserTenant.tenant_id == Tenant.id)
             .where(UserTenant.user_id == user.id)
-            .options(joinedload(Tenant.members))
         )
         result = await self.session.execute(statement)
         tenants: list[TenantRead] = []
@@ -86,6 +120,7 @@ class TenantService:
             tenant.business_image = normalized_image or None
         self.session.add(tenant)
         await self.session.commit()
+        principal_cache.invalidate_tenant(tenant.id)
         await self.session.refresh(tenant)
         return tenant
 
@@ -104,6 +139,7 @@ class TenantService:
             .values(is_default=True)
         )
         await self.session.commit()
+        principal_cache.invalidate_user(user_id)
 
     async def _has_default_membership(self, user_id: UUID) -> bool:
         statement = select(UserTenant).where(
@@ -2,20 +2,25 @@ from __future__ import annotations
 
 import logging
 from collections.abc import AsyncGenerator
-from typing import Optional
+from typing import Any, Optional
 from uuid import UUID
 
+import jwt
 from fastapi import Depends, HTTPException, Request, Response, status
-from fastapi_users import FastAPIUsers
+from fastapi.security import OAuth2PasswordRequestForm
+from fastapi_users import FastAPIUsers, exceptions
 from fastapi_users.authentication import AuthenticationBackend, BearerTransport
+from fastapi_users.jwt import decode_jwt, generate_jwt
 from fastapi_users.manager import BaseUserManager, UUIDIDMixin
 from fastapi_users_db_sqlalchemy import SQLAlchemyUserDatabase
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.auth.config import auth_config
 from src.auth.models import User
+from src.auth.principal_cache import principal_cache
 from src.auth.schemas import UserCreate, UserRead, UserUpdate
 from src.auth.security.jwt import get_jwt_strategy
+from src.auth.security.passwords import password_helper
 from src.auth.security.refresh import (
     RefreshTokenNotFound,
     RefreshTokenService,
@@ -29,6 +34,21 @@ logger = logging.getLogger(__name__)
 
 
 class UserManager(UUIDIDMixin, BaseUserManager[User, UUID]):
+    """fastapi-users manager that hashes passwords on the hashing threads.
+
+    ``create``, ``authenticate``, ``_update``, ``forgot_password`` and
+    ``reset_password`` are fastapi-users 14.0.2's, except that they await
+    ``password_helper`` instead of hashing on the event loop, and that
+    ``create`` and ``authenticate`` hold no pooled connection while it runs.
+    fastapi-users calls its password helper synchronously, so there is no
+    narrower seam to override.
+
+    pyproject.toml pins fastapi-users to that release. Before upgrading, diff
+    these methods against the new ``BaseUserManager`` and port its changes,
+    security fixes especially, then bump the pin and the version in
+    tests/test_user_manager.py.
+    """
+
     reset_password_token_secret = auth_config.jwt_secret
     verification_token_secret = auth_config.jwt_secret
 
@@ -37,9 +57,147 @@ class UserManager(UUIDIDMixin, BaseUserManager[User, UUID]):
         user_db: SQLAlchemyUserDatabase[User, UUID],
         session: AsyncSession,
     ):
-        super().__init__(user_db)
+        super().__init__(user_db, password_helper)
         self.session = session
 
+    async def create(
+        self,
+        user_create: UserCreate,
+        safe: bool = False,
+        request: Optional[Request] = None,
+    ) -> User:
+        await self.validate_password(user_create.password, user_create)
+        # Before the lookup, so a fresh session holds no connection meanwhile.
+        hashed_password = await self.password_helper.hash_async(user_create.password)
+
+        existing_user = await self.user_db.get_by_email(user_create.email)
+        if existing_user is not None:
+            raise exceptions.UserAlreadyExists()
+
+        user_dict = (
+            user_create.create_update_dict()
+            if safe
+            else user_create.create_update_dict_superuser()
+        )
+        del user_dict["password"]
+        user_dict["hashed_password"] = hashed_password
+
+        created_user = await self.user_db.create(user_dict)
+
+        await self.on_after_register(created_user, request)
+
+        return created_user
+
+    async def authenticate(
+        self, credentials: OAuth2PasswordRequestForm
+    ) -> Optional[User]:
+        """fastapi-users' ``authenticate``, verifying on the hashing threads.
+
+        Commits ``self.session`` after the lookup, before hashing, so the
+        request's transaction ends there: call it before any writes of the
+        request, as the sign-in routes do.
+        """
+        try:
+            user = await self.get_by_email(credentials.username)
+        except exceptions.UserNotExists:
+            user = None
+        # The lookup only read; hand its connection back to the pool while
+        # the hash runs instead of idling in the transaction.
+        await self.session.commit()
+        if user is None:
+            # Hash anyway so unknown emails take as long as wrong passwords.
+            await self.password_helper.hash_async(credentials.password)
+            return None
+
+        verified, new_hash = await self.password_helper.verify_and_update_async(
+            credentials.password, user.hashed_password
+        )
+        if not verified:
+            return None
+        if new_hash is not None:
+            await self.user_db.update(user, {"hashed_password": new_hash})
+
+        return user
+
+    async def _update(self, user: User, update_dict: dict[str, Any]) -> User:
+        validated_update_dict = {}
+        for field, value in update_dict.items():
+            if field == "email" and value != user.email:
+                try:
+                    await self.get_by_email(value)
+                    raise exceptions.UserAlreadyExists()
+                except exceptions.UserNotExists:
+                    validated_update_dict["email"] = value
+                    validated_update_dict["is_verified"] = False
+            elif field == "password" and value is not None:
+                await self.validate_password(value, user)
+                validated_update_dict[
+                    "hashed_password"
+                ] = await self.password_helper.hash_async(value)
+            else:
+                validated_update_dict[field] = value
+        return await self.user_db.update(user, validated_update_dict)
+
+    async def forgot_password(
+        self, user: User, request: Optional[Request] = None
+    ) -> None:
+        if not user.is_active:
+            raise exceptions.UserInactive()
+
+        token_data = {
+            "sub": str(user.id),
+            "password_fgpt": await self.password_helper.hash_async(
+                user.hashed_password
+            ),
+            "aud": self.reset_password_token_audience,
+        }
+        token = generate_jwt(
+            token_data,
+            self.reset_password_token_secret,
+            self.reset_password_token_lifetime_seconds,
+        )
+        await self.on_after_forgot_password(user, token, request)
+
+    async def reset_password(
+        self, token: str, password: str, request: Optional[Request] = None
+    ) -> User:
+        try:
+            data = decode_jwt(
+                token,
+                self.reset_password_token_secret,
+                [self.reset_password_token_audience],
+            )
+        except jwt.PyJWTError:
+            raise exceptions.InvalidResetPasswordToken()
+
+        try:
+            user_id = data["sub"]
+            password_fingerprint = data["password_fgpt"]
+        except KeyError:
+            raise exceptions.InvalidResetPasswordToken()
+
+        try:
+            parsed_id = self.parse_id(user_id)
+        except exceptions.InvalidID:
+            raise exceptions.InvalidResetPasswordToken()
+
+        user = await self.get(parsed_id)
+
+        valid_fingerprint, _ = await self.password_helper.verify_and_update_async(
+            user.hashed_password, password_fingerprint
+        )
+        if not valid_fingerprint:
+            raise exceptions.InvalidResetPasswordToken()
+
+        if not user.is_active:
+            raise exceptions.UserInactive()
+
+        updated_user = await self._update(user, {"password": password})
+
+        await self.on_after_reset_password(user, request)
+
+        return updated_user
+
     async def on_after_register(
         self, user: User, request: Optional[Request] = None
     ) -> None:
@@ -82,6 +240,14 @@ class UserManager(UUIDIDMixin, BaseUserManager[User, UUID]):
         )
         logger.info("Verification email dispatched for %s", user.id)
 
+    async def on_after_update(
+        self,
+        user: User,
+        update_dict: dict[str, Any],
+        request: Optional[Request] = None,
+    ) -> None:
+        principal_cache.invalidate_user(user.id)
+
     async def on_after_login(
         self,
         user: User,
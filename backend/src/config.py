@@ -1,4 +1,4 @@
-from typing import Any
+from typing import Any, Literal
 
 from pydantic import PostgresDsn, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -16,8 +16,19 @@ class Config(CustomBaseSettings):
     DATABASE_URL: PostgresDsn
     DATABASE_ASYNC_URL: PostgresDsn
     DATABASE_POOL_SIZE: int = 16
+    DATABASE_POOL_MAX_OVERFLOW: int = 10
+    # Seconds a checkout waits for a connection before failing with a 503,
+    # well below the gunicorn worker timeout
+    DATABASE_POOL_TIMEOUT: float = 10
     DATABASE_POOL_TTL: int = 60 * 20  # 20 minutes
     DATABASE_POOL_PRE_PING: bool = True
+    # Read replicas for read-only routes (src/replicas.py), async DSNs
+    DATABASE_REPLICA_URLS: list[PostgresDsn] = []
+    DATABASE_REPLICA_MAX_LAG_SECONDS: float = 1
+    DATABASE_REPLICA_CHECK_SECONDS: float = 1
+    # Reads stay on the primary this long after the same login wrote, 0 for
+    # not at all
+    DATABASE_REPLICA_STICKY_SECONDS: float = 5
 
     ENVIRONMENT: Environment = Environment.PRODUCTION
 
@@ -29,6 +40,40 @@ class Config(CustomBaseSettings):
 
     APP_VERSION: str = "0.1"
 
+    # Seconds between checks of the cached item catalog against the database
+    ITEM_CATALOG_CHECK_SECONDS: float = 60
+
+    # Session timeout sweeper (src/game/sweeper.py)
+    SESSION_SWEEPER_IN_PROCESS: bool = False
+    SESSION_SWEEPER_INTERVAL_SECONDS: float = 60
+    SESSION_SWEEPER_BATCH_SIZE: int = 500
+
+    # Gameplay event outbox relay (src/game/outbox.py)
+    OUTBOX_RELAY_IN_PROCESS: bool = False
+    OUTBOX_RELAY_INTERVAL_SECONDS: float = 5
+    OUTBOX_RELAY_BATCH_SIZE: int = 500
+    OUTBOX_NDJSON_DIRECTORY: str = "var/events"
+    OUTBOX_NDJSON_MAX_BYTES: int = 64 * 1024 * 1024
+
+    # Per-worker cache of authenticated principals (src/auth/principal_cache.py)
+    PRINCIPAL_CACHE_ENABLED: bool = False
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 30
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10_000
+
+    # Serialize trusted game responses directly (src/game/responses.py)
+    FAST_JSON_RESPONSES: bool = False
+
+    # What a route or service call over its statement budget does
+    # (src/query_budget.py): "off", "log" or "raise"
+    QUERY_BUDGETS: Literal["off", "log", "raise"] = "off"
+
+    # Shed low-priority requests while checkouts wait this long for a pooled
+    # connection (src/admission.py)
+    ADMISSION_CONTROL_ENABLED: bool = False
+    ADMISSION_POOL_WAIT_SECONDS: float = 0.25
+    ADMISSION_WINDOW_SECONDS: float = 1
+    ADMISSION_RETRY_AFTER_SECONDS: int = 2
+
     # Auth settings
     AUTH_ACCESS_TOKEN_TTL_MIN: int = 15
     AUTH_REFRESH_TTL_DAYS: int = 7
@@ -38,11 +83,20 @@ class Config(CustomBaseSettings):
     AUTH_COOKIE_SAMESITE: str = "lax"
     AUTH_COOKIE_ACCESS_NAME: str = "access_token"
     AUTH_COOKIE_REFRESH_NAME: str = "refresh_token"
+    # Embed tenant memberships in access tokens (src/auth/security/jwt.py)
+    AUTH_TENANT_CLAIMS: bool = False
+    # Threads hashing and verifying passwords (0 hashes on the event loop),
+    # and how many calls may queue for them before getting a 503, 0 for no
+    # limit (src/auth/security/passwords.py)
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_QUEUE: int = 0
 
     # OAuth settings
     OAUTH_GOOGLE_CLIENT_ID: str | None = None
     OAUTH_GOOGLE_CLIENT_SECRET: str | None = None
     OAUTH_GOOGLE_REDIRECT_URI: str | None = None
+    # Signing keys for Google ID tokens (src/auth/security/google.py)
+    OAUTH_GOOGLE_JWKS_URL: str = "https://www.googleapis.com/oauth2/v3/certs"
 
     # URL settings
     FRONTEND_URL: str | None = None
@@ -21,15 +21,22 @@ from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 from src.config import settings
 from src.constants import DB_NAMING_CONVENTION
+from src.db_timing import TimedAsyncQueuePool, instrument_engine
+from src.query_budget import watch_query_budgets
 
 DATABASE_URL = str(settings.DATABASE_ASYNC_URL)
 
 engine = create_async_engine(
     DATABASE_URL,
+    poolclass=TimedAsyncQueuePool,
     pool_size=settings.DATABASE_POOL_SIZE,
+    max_overflow=settings.DATABASE_POOL_MAX_OVERFLOW,
+    pool_timeout=settings.DATABASE_POOL_TIMEOUT,
     pool_recycle=settings.DATABASE_POOL_TTL,
     pool_pre_ping=settings.DATABASE_POOL_PRE_PING,
 )
+instrument_engine(engine.sync_engine)
+watch_query_budgets(engine.sync_engine)
 metadata = MetaData(naming_convention=DB_NAMING_CONVENTION)
 
 
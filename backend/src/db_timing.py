@@ -0,0 +1,257 @@
+"""Per-request database statistics.
+
+:class:`DbTimingMiddleware` gives each HTTP request a :class:`RequestDbStats`
+that the engine hooks installed by :func:`instrument_engine` fill in: how
+many statements ran, the time spent in them, the time spent waiting for a
+pooled connection and the slowest statement. Work outside a request (the
+sweeper, the outbox relay, scripts) is not recorded.
+
+In debug environments the numbers go out as a ``Server-Timing`` header,
+which browser dev tools show next to the request. They are always observed
+into Prometheus histograms labelled by method and route template.
+
+:class:`TimedAsyncQueuePool` also reports the pool itself: connections
+checked out, overflow in use, checkouts waiting and the wait of every
+checkout, and it keeps the recent wait that admission control
+(``src/admission.py``) sheds low-priority requests on.
+"""
+
+from __future__ import annotations
+
+import itertools
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src import metrics
+from src.config import settings
+
+SLOWEST_STATEMENT_CHARS = 80
+
+DB_STATEMENTS = metrics.histogram(
+    "http_db_statements_per_request",
+    "SQL statements executed per HTTP request.",
+    ["method", "route"],
+    buckets=(0, 1, 2, 3, 4, 6, 8, 12, 16, 24, 32, 64),
+)
+DB_TIME_SECONDS = metrics.histogram(
+    "http_db_time_seconds",
+    "Time per HTTP request spent executing SQL statements.",
+    ["method", "route"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+DB_POOL_WAIT_SECONDS = metrics.histogram(
+    "http_db_pool_wait_seconds",
+    "Time per HTTP request spent waiting for pooled connections.",
+    ["method", "route"],
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5),
+)
+DB_SLOWEST_STATEMENT_SECONDS = metrics.histogram(
+    "http_db_slowest_statement_seconds",
+    "Duration of the slowest SQL statement of each HTTP request.",
+    ["method", "route"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1),
+)
+DB_POOL_CHECKOUT_WAIT_SECONDS = metrics.histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time each connection checkout waited, including pre-ping and connecting.",
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+DB_POOL_CHECKED_OUT = metrics.gauge(
+    "db_pool_checked_out_connections",
+    "Pooled connections currently checked out.",
+    multiprocess_mode="livesum",
+)
+DB_POOL_OVERFLOW = metrics.gauge(
+    "db_pool_overflow_connections",
+    "Connections open beyond the pool size.",
+    multiprocess_mode="livesum",
+)
+DB_POOL_WAITING = metrics.gauge(
+    "db_pool_waiting_checkouts",
+    "Checkouts waiting for a pooled connection.",
+    multiprocess_mode="livesum",
+)
+
+
+@dataclass
+class RequestDbStats:
+    statements: int = 0
+    db_seconds: float = 0.0
+    pool_wait_seconds: float = 0.0
+    slowest_seconds: float = 0.0
+    slowest_statement: str | None = None
+
+    def add_statement(self, statement: str, seconds: float) -> None:
+        self.statements += 1
+        self.db_seconds += seconds
+        if seconds >= self.slowest_seconds:
+            self.slowest_seconds = seconds
+            self.slowest_statement = statement
+
+    def server_timing(self) -> str:
+        parts = [
+            f'db;dur={self.db_seconds * 1000:.2f};desc="{self.statements} statements"',
+            f"db-pool;dur={self.pool_wait_seconds * 1000:.2f}",
+        ]
+        if self.slowest_statement is not None:
+            parts.append(
+                f"db-slowest;dur={self.slowest_seconds * 1000:.2f};"
+                f'desc="{_describe(self.slowest_statement)}"'
+            )
+        return ", ".join(parts)
+
+
+def _describe(statement: str) -> str:
+    # A quoted-string in an ASCII header: no quotes, backslashes or newlines.
+    text = " ".join(statement.split())[:SLOWEST_STATEMENT_CHARS]
+    return (
+        text.encode("ascii", "replace")
+        .decode()
+        .translate({ord('"'): "'", ord("\\"): "/"})
+    )
+
+
+_current: ContextVar[RequestDbStats | None] = ContextVar(
+    "request_db_stats", default=None
+)
+
+
+def current_db_stats() -> RequestDbStats | None:
+    """Statistics of the request being handled, if any."""
+    return _current.get()
+
+
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Adds the time spent checking out a connection to the current request.
+
+    That includes the pre-ping, when enabled, and opening new connections.
+    The wait of the checkouts in progress and of the last one that finished
+    is kept for :meth:`recent_wait`.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._tickets = itertools.count()
+        self._waiting: dict[int, float] = {}
+        self._last_wait = 0.0
+        self._last_checkout_at = 0.0
+
+    def connect(self) -> Any:
+        started = time.perf_counter()
+        ticket = next(self._tickets)
+        self._waiting[ticket] = started
+        DB_POOL_WAITING.inc()
+        try:
+            return super().connect()
+        finally:
+            del self._waiting[ticket]
+            DB_POOL_WAITING.dec()
+            now = time.perf_counter()
+            waited = now - started
+            self._last_wait, self._last_checkout_at = waited, now
+            DB_POOL_CHECKOUT_WAIT_SECONDS.observe(waited)
+            self.report_usage()
+            stats = _current.get()
+            if stats is not None:
+                stats.pool_wait_seconds += waited
+
+    def _do_return_conn(self, record: Any) -> None:
+        super()._do_return_conn(record)
+        self.report_usage()
+
+    def recent_wait(self, window: float) -> float:
+        """Longest wait of the checkouts in progress and of the last checkout,
+        if that finished less than ``window`` seconds ago."""
+        now = time.perf_counter()
+        waits = [now - started for started in self._waiting.values()]
+        if now - self._last_checkout_at <= window:
+            waits.append(self._last_wait)
+        return max(waits, default=0.0)
+
+    def report_usage(self) -> None:
+        DB_POOL_CHECKED_OUT.set(self.checkedout())
+        DB_POOL_OVERFLOW.set(max(self.overflow(), 0))
+
+
+def _before_cursor_execute(
+    _conn, _cursor, _statement, _parameters, context, _executemany
+) -> None:
+    if context is not None and _current.get() is not None:
+        context._db_timing_started = time.perf_counter()
+
+
+def _after_cursor_execute(
+    _conn, _cursor, statement, _parameters, context, _executemany
+) -> None:
+    started = getattr(context, "_db_timing_started", None)
+    stats = _current.get()
+    if started is not None and stats is not None:
+        stats.add_statement(statement, time.perf_counter() - started)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Attribute the statements of ``engine`` (a sync engine) to requests."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class DbTimingMiddleware:
+    def __init__(self, app: ASGIApp, *, server_timing: bool | None = None) -> None:
+        self.app = app
+        self.server_timing = (
+            settings.ENVIRONMENT.is_debug if server_timing is None else server_timing
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestDbStats()
+        token = _current.set(stats)
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append(
+                    "Server-Timing", stats.server_timing()
+                )
+            await send(message)
+
+        try:
+            await self.app(
+                scope, receive, send_with_timing if self.server_timing else send
+            )
+        finally:
+            _current.reset(token)
+            self._observe(scope, stats)
+
+    @staticmethod
+    def _observe(scope: Scope, stats: RequestDbStats) -> None:
+        route = scope.get("route")
+        labels = {
+            "method": scope["method"],
+            # Route templates keep the label set bounded; unmatched paths share one.
+            "route": getattr(route, "path_format", None) or "unmatched",
+        }
+        DB_STATEMENTS.labels(**labels).observe(stats.statements)
+        DB_TIME_SECONDS.labels(**labels).observe(stats.db_seconds)
+        DB_POOL_WAIT_SECONDS.labels(**labels).observe(stats.pool_wait_seconds)
+        if stats.statements:
+            DB_SLOWEST_STATEMENT_SECONDS.labels(**labels).observe(stats.slowest_seconds)
+
+
+__all__ = [
+    "DbTimingMiddleware",
+    "RequestDbStats",
+    "TimedAsyncQueuePool",
+    "current_db_stats",
+    "instrument_engine",
+]
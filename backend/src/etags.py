@@ -0,0 +1,57 @@
+"""Conditional GET: strong ETags and ``If-None-Match``.
+
+Endpoints hash an ETag from whatever marks their response as changed, send
+it with :func:`set_etag`, and answer a request whose ``If-None-Match`` still
+matches with :func:`not_modified_response` instead of building the body.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from collections.abc import Iterable
+from typing import Any
+
+from fastapi import Response, status
+
+# Responses are per user; clients and proxies must revalidate before reuse.
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    digest = hashlib.blake2b(
+        "\x1f".join(map(str, parts)).encode(), digest_size=16
+    ).hexdigest()
+    return f'"{digest}"'
+
+
+def _candidates(header: str) -> Iterable[str]:
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        # If-None-Match uses the weak comparison (RFC 9110, 13.1.2).
+        yield candidate.removeprefix("W/")
+
+
+def not_modified(header: str | None, etag: str) -> bool:
+    if not header:
+        return False
+    return any(candidate in ("*", etag) for candidate in _candidates(header))
+
+
+def not_modified_response(etag: str) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+    )
+
+
+def set_etag(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
+
+__all__ = [
+    "make_etag",
+    "not_modified",
+    "not_modified_response",
+    "set_etag",
+]
@@ -0,0 +1,165 @@
+"""In-process snapshot of the cosmetic item catalog.
+
+The catalog only changes when new cosmetics ship, so drops sample from
+tables derived from an immutable snapshot instead of querying ``items`` on
+every successful roll. Drop tables are built lazily per (level band, room)
+and live as long as the snapshot.
+The snapshot is loaded in the application lifespan and reloaded when the
+catalog version (item count and latest change) in the database moves.
+"""
+
+from __future__ import annotations
+
+import time
+from bisect import bisect_right
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field
+from datetime import datetime
+from types import MappingProxyType
+from uuid import UUID
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import settings
+from src.game.drops import DropTable
+from src.game.enums import ItemRarity, ItemType, Room
+from src.game.models import Item
+
+CatalogVersion = tuple[int, datetime | None]
+
+
+@dataclass(frozen=True, slots=True)
+class CatalogItem:
+    id: UUID
+    name: str
+    type: ItemType
+    rarity: ItemRarity
+    sprite_key: str
+    room_affinity: Room | None
+    unlock_level: int
+
+    @classmethod
+    def from_model(cls, item: Item) -> CatalogItem:
+        return cls(
+            id=item.id,
+            name=item.name,
+            type=item.type,
+            rarity=item.rarity,
+            sprite_key=item.sprite_key,
+            room_affinity=item.room_affinity,
+            unlock_level=item.unlock_level,
+        )
+
+
+@dataclass(frozen=True)
+class ItemCatalog:
+    version: CatalogVersion
+    items: Mapping[UUID, CatalogItem]
+    # Items keyed by room_affinity (None = any room), sorted by unlock_level.
+    by_affinity: Mapping[Room | None, tuple[CatalogItem, ...]]
+    # Distinct unlock levels; the droppable set only changes at these levels.
+    level_bands: tuple[int, ...]
+    _drop_tables: dict[tuple[int, Room], DropTable] = field(
+        default_factory=dict, compare=False, repr=False
+    )
+
+    @classmethod
+    def build(
+        cls, version: CatalogVersion, items: Iterable[CatalogItem]
+    ) -> ItemCatalog:
+        by_id: dict[UUID, CatalogItem] = {}
+        grouped: dict[Room | None, list[CatalogItem]] = {}
+        for item in items:
+            by_id[item.id] = item
+            grouped.setdefault(item.room_affinity, []).append(item)
+        for bucket in grouped.values():
+            bucket.sort(key=lambda item: item.unlock_level)
+
+        return cls(
+            version=version,
+            items=MappingProxyType(by_id),
+            by_affinity=MappingProxyType(
+                {affinity: tuple(bucket) for affinity, bucket in grouped.items()}
+            ),
+            level_bands=tuple(sorted({item.unlock_level for item in by_id.values()})),
+        )
+
+    def drop_table(self, *, room: Room, hero_level: int) -> DropTable:
+        """The drop table for ``room`` at ``hero_level``, built once per band."""
+        band = bisect_right(self.level_bands, hero_level)
+        key = (band, room)
+        table = self._drop_tables.get(key)
+        if table is None:
+            max_level = self.level_bands[band - 1] if band else 0
+            table = DropTable.build(
+                [
+                    item
+                    for affinity in (None, room)
+                    for item in self.by_affinity.get(affinity, ())
+                    if item.unlock_level <= max_level
+                ]
+            )
+            self._drop_tables[key] = table
+        return table
+
+
+async def get_catalog_version(session: AsyncSession) -> CatalogVersion:
+    result = await session.execute(
+        select(
+            func.count(Item.id),
+            func.max(func.coalesce(Item.updated_at, Item.created_at)),
+        )
+    )
+    count, changed_at = result.one()
+    return count, changed_at
+
+
+async def load_item_catalog(session: AsyncSession) -> ItemCatalog:
+    version = await get_catalog_version(session)
+    result = await session.execute(select(Item))
+    return ItemCatalog.build(
+        version, (CatalogItem.from_model(item) for item in result.scalars())
+    )
+
+
+class ItemCatalogCache:
+    """Process-wide holder of the current :class:`ItemCatalog` snapshot."""
+
+    def __init__(self, check_interval: float) -> None:
+        self.check_interval = check_interval
+        self._catalog: ItemCatalog | None = None
+        self._checked_at = 0.0
+
+    async def load(self, session: AsyncSession) -> ItemCatalog:
+        self._catalog = await load_item_catalog(session)
+        self._checked_at = time.monotonic()
+        return self._catalog
+
+    async def get(self, session: AsyncSession) -> ItemCatalog:
+        catalog = self._catalog
+        if catalog is None:
+            return await self.load(session)
+        if time.monotonic() - self._checked_at < self.check_interval:
+            return catalog
+
+        self._checked_at = time.monotonic()
+        if await get_catalog_version(session) != catalog.version:
+            return await self.load(session)
+        return catalog
+
+    def invalidate(self) -> None:
+        self._catalog = None
+
+
+item_catalog_cache = ItemCatalogCache(settings.ITEM_CATALOG_CHECK_SECONDS)
+
+
+__all__ = [
+    "CatalogItem",
+    "ItemCatalog",
+    "ItemCatalogCache",
+    "get_catalog_version",
+    "item_catalog_cache",
+    "load_item_catalog",
+]
@@ -0,0 +1,570 @@
+"""Single-statement session completion.
+
+The ORM flow for ``POST /session/complete`` needs a locking SELECT, the
+progression get-or-create queries, the reward writes and three refreshes.
+This module folds the session transition, the hero reward and the world
+state progression into one ``WITH ... UPDATE ... RETURNING`` statement. A
+second statement is only issued when the drop roll succeeds.
+
+The statements are plain SQL built once at import: the PostgreSQL ``insert``
+construct is not cacheable in SQLAlchemy 2.0, and recompiling the CTE on
+every call costs more than the round trips it saves.
+
+Offline clients replay queued sessions through ``complete_sessions_batch``,
+which uses the ORM flow but takes the hero and world state locks once for
+the whole batch.
+"""
+
+from __future__ import annotations
+
+import random
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from uuid import UUID, uuid4
+
+from fastapi import HTTPException, status
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import flag_modified
+
+from src.game.catalog import CatalogItem, item_catalog_cache
+from src.game.drops import OwnedItems
+from src.game.enums import GameEventType, ItemType, Room, SessionStatus
+from src.game.focus_stats import (
+    finished_sessions_sql,
+    record_finished_sessions,
+    stats_upsert_sql,
+)
+from src.game.leaderboard import (
+    period_params,
+    record_session_scores,
+    score_upsert_sql,
+)
+from src.game.levels import LEVEL_CURVE
+from src.game.models import Hero, Session, WorldState
+from src.game.outbox import insert_event_sql, record_event, session_success_payload
+from src.game.schemas import DroppedItem, RewardSummary, SessionBatchResult
+from src.game.services import (
+    COMPLETION_WINDOW_RATIO,
+    DROP_CHANCE,
+    EXP_PER_MINUTE,
+    GOLD_PER_MINUTE,
+    ROOM_THRESHOLDS,
+    apply_rewards,
+    choose_cosmetic_drop,
+    compute_rewards,
+    get_owned_item_ids,
+    grant_cosmetic_item,
+    initialize_progression,
+    item_to_dropped,
+    update_world_state_on_success,
+    validate_completion_window,
+)
+
+IN_PROGRESS_STATUSES = (SessionStatus.PENDING, SessionStatus.ACTIVE)
+EQUIP_SLOTS: dict[ItemType, str] = {
+    ItemType.HAT: "equipped_hat_id",
+    ItemType.OUTFIT: "equipped_outfit_id",
+    ItemType.ACCESSORY: "equipped_accessory_id",
+}
+
+
+def total_exp_sql(level: str, exp: str) -> str:
+    """SQL for ``LEVEL_CURVE.total_for_level(level) + exp``."""
+    return f"({LEVEL_CURVE.step} * ({level} * ({level} - 1) / 2) + {exp})"
+
+
+def level_progress_sql(total_exp: str) -> str:
+    """Sub-select yielding ``(level, exp)`` for a hero with ``total_exp``.
+
+    The SQL twin of ``LinearCurve.level_for_total`` for ``LEVEL_CURVE``. The
+    sqrt runs on numeric, which keeps perfect squares exact.
+    """
+    step = LEVEL_CURVE.step
+    return (
+        f"SELECT level, total - {step} * (level * (level - 1) / 2) "
+        "FROM (SELECT total, "
+        f"floor(({step} + sqrt({step * step} + {8 * step} * total::numeric))"
+        f" / {2 * step})::int AS level "
+        f"FROM (SELECT {total_exp} AS total) AS t) AS l"
+    )
+
+
+def _room_level_sql(column: str, threshold_key: str) -> str:
+    threshold = ROOM_THRESHOLDS[threshold_key]
+    return (
+        f"CASE WHEN w.total_sessions_success + 1 >= {threshold} "
+        f"THEN 2 ELSE w.{column} END"
+    )
+
+
+def _initial_room_level(threshold_key: str) -> int:
+    return 2 if ROOM_THRESHOLDS[threshold_key] <= 1 else 1
+
+
+_IN_PROGRESS_SQL = ", ".join(f"'{state.value}'" for state in IN_PROGRESS_STATUSES)
+_COMPLETION_WINDOW_SQL = f"interval '{COMPLETION_WINDOW_RATIO * 60:g} seconds'"
+
+COMPLETE_SESSION_SQL = f"""
+WITH completed AS (
+    UPDATE sessions
+    SET status = '{SessionStatus.SUCCESS.value}',
+        ended_at = CAST(:now AS timestamptz),
+        reward_exp = duration_minutes * {EXP_PER_MINUTE},
+        reward_gold = duration_minutes * {GOLD_PER_MINUTE},
+        updated_at = now()
+    WHERE id = :session_id
+      AND user_id = :user_id
+      AND tenant_id = :tenant_id
+      AND status IN ({_IN_PROGRESS_SQL})
+      AND started_at
+          <= CAST(:now AS timestamptz) - duration_minutes * {_COMPLETION_WINDOW_SQL}
+    RETURNING id, tenant_id, user_id, room, status, ended_at, duration_minutes,
+        reward_exp, reward_gold
+),
+hero AS (
+    INSERT INTO heroes AS h (id, tenant_id, user_id, level, exp, gold)
+    SELECT :hero_id, :tenant_id, :user_id, p.level, p.exp, c.reward_gold
+    FROM completed AS c
+    CROSS JOIN LATERAL ({level_progress_sql("c.reward_exp")}) AS p (level, exp)
+    ON CONFLICT ON CONSTRAINT uq_hero_tenant_user DO UPDATE
+    SET (level, exp) = (
+            {level_progress_sql(
+                total_exp_sql("h.level", "h.exp")
+                + " + (SELECT reward_exp FROM completed)"
+            )}
+        ),
+        gold = h.gold + EXCLUDED.gold,
+        updated_at = now()
+    RETURNING h.id, h.level, h.exp, h.gold,
+        h.equipped_hat_id, h.equipped_outfit_id, h.equipped_accessory_id
+),
+world AS (
+    INSERT INTO world_states AS w (
+        id, tenant_id, user_id,
+        study_room_level, build_room_level, training_room_level, plaza_level,
+        total_sessions_success, day_streak, last_session_date
+    )
+    SELECT :world_state_id, :tenant_id, :user_id,
+        {_initial_room_level("study_room_level_2")},
+        {_initial_room_level("build_room_level_2")},
+        1,
+        {_initial_room_level("plaza_level_2")},
+        1, 1, :today
+    FROM completed
+    ON CONFLICT ON CONSTRAINT uq_world_state_tenant_user DO UPDATE
+    SET total_sessions_success = w.total_sessions_success + 1,
+        day_streak = CASE
+            WHEN w.last_session_date = :today THEN w.day_streak
+            WHEN w.last_session_date = :yesterday THEN w.day_streak + 1
+            ELSE 1
+        END,
+        last_session_date = :today,
+        plaza_level = {_room_level_sql("plaza_level", "plaza_level_2")},
+        build_room_level = {_room_level_sql("build_room_level", "build_room_level_2")},
+        study_room_level = {_room_level_sql("study_room_level", "study_room_level_2")},
+        updated_at = now()
+    RETURNING w.id, w.study_room_level, w.build_room_level,
+        w.training_room_level, w.plaza_level, w.total_sessions_success,
+        w.day_streak, w.last_session_date
+),
+scored AS ({score_upsert_sql("completed")}),
+rolled AS ({stats_upsert_sql(finished_sessions_sql("completed"))}),
+-- Reads the hero CTE, so it runs under the hero row lock: a user's events
+-- get ids in commit order.
+evented AS (
+    {insert_event_sql(
+        GameEventType.SESSION_SUCCESS,
+        session_id="c.id",
+        room="c.room",
+        duration_minutes="c.duration_minutes",
+        reward_exp="c.reward_exp",
+        reward_gold="c.reward_gold",
+        hero_level="h.level",
+    )}
+    FROM completed AS c, hero AS h
+)
+SELECT
+    c.id AS session_id, c.room, c.reward_exp, c.reward_gold,
+    h.id AS hero_id, h.level, h.exp, h.gold,
+    h.equipped_hat_id, h.equipped_outfit_id, h.equipped_accessory_id,
+    w.id AS world_state_id, w.study_room_level, w.build_room_level,
+    w.training_room_level, w.plaza_level, w.total_sessions_success,
+    w.day_streak, w.last_session_date
+FROM completed AS c, hero AS h, world AS w
+"""
+
+complete_session_statement = text(COMPLETE_SESSION_SQL).columns(
+    room=Session.__table__.c.room.type,
+)
+
+AWARD_DROP_SQL = """
+WITH granted AS (
+    INSERT INTO inventory (id, tenant_id, user_id, item_id)
+    VALUES (:inventory_id, :tenant_id, :user_id, :item_id)
+    ON CONFLICT ON CONSTRAINT uq_inventory_item DO NOTHING
+    RETURNING item_id
+),
+logged AS (
+    INSERT INTO cosmetic_drop_logs (id, tenant_id, session_id, item_id)
+    SELECT :drop_log_id, :tenant_id, :session_id, item_id FROM granted
+),
+tagged AS (
+    UPDATE sessions SET drop_item_id = :item_id, updated_at = now()
+    WHERE id = :session_id
+),
+evented AS (
+    {insert_event}
+    FROM granted AS g
+    JOIN items AS i ON i.id = g.item_id
+)
+UPDATE heroes
+SET {slot} = COALESCE({slot}, :item_id),
+    inventory_version = inventory_version + (SELECT count(*) FROM granted),
+    updated_at = now()
+WHERE id = :hero_id
+RETURNING {slot}
+"""
+
+award_drop_statements = {
+    item_type: text(
+        AWARD_DROP_SQL.format(
+            slot=slot,
+            insert_event=insert_event_sql(
+                GameEventType.DROP_AWARDED,
+                session_id="CAST(:session_id AS uuid)",
+                item_id="g.item_id",
+                item_type="i.type",
+                rarity="i.rarity",
+            ),
+        )
+    )
+    for item_type, slot in EQUIP_SLOTS.items()
+}
+
+
+@dataclass
+class CompletionOutcome:
+    session_id: UUID
+    room: Room
+    reward: RewardSummary
+    hero: Hero
+    world_state: WorldState
+    dropped_item: DroppedItem | None = None
+
+
+async def raise_completion_error(
+    session: AsyncSession,
+    *,
+    session_id: UUID,
+    user_id: UUID,
+    tenant_id: UUID,
+    now: datetime,
+) -> None:
+    """Explain why the guarded UPDATE matched no row (cold path only)."""
+    result = await session.execute(
+        select(Session.status, Session.started_at, Session.duration_minutes).where(
+            Session.id == session_id,
+            Session.user_id == user_id,
+            Session.tenant_id == tenant_id,
+        )
+    )
+    row = result.first()
+    if row is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Session not found."
+        )
+    required = timedelta(minutes=row.duration_minutes * COMPLETION_WINDOW_RATIO)
+    if row.status in IN_PROGRESS_STATUSES and now - row.started_at < required:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Session cannot be completed yet.",
+        )
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="Session already finished.",
+    )
+
+
+async def award_cosmetic_drop(
+    session: AsyncSession,
+    *,
+    user_id: UUID,
+    tenant_id: UUID,
+    hero: Hero,
+    session_id: UUID,
+    item: CatalogItem,
+) -> None:
+    """Grant ``item`` and auto-equip it into an empty slot in one statement."""
+    result = await session.execute(
+        award_drop_statements[item.type],
+        {
+            "inventory_id": uuid4(),
+            "drop_log_id": uuid4(),
+            "tenant_id": tenant_id,
+            "user_id": user_id,
+            "session_id": session_id,
+            "hero_id": hero.id,
+            "item_id": item.id,
+        },
+    )
+    setattr(hero, EQUIP_SLOTS[item.type], result.scalar_one())
+
+
+async def complete_session_atomic(
+    session: AsyncSession,
+    *,
+    session_id: UUID,
+    user_id: UUID,
+    tenant_id: UUID,
+) -> CompletionOutcome:
+    """Complete a session, reward the hero and roll a drop in one transaction.
+
+    Semantics match ``apply_rewards``, ``update_world_state_on_success`` and
+    the drop roll of :func:`complete_sessions_batch`, and the earned exp is
+    added to the leaderboards. The caller owns the final commit.
+    """
+    now = datetime.now(UTC)
+    today = now.date()
+    result = await session.execute(
+        complete_session_statement,
+        {
+            "session_id": session_id,
+            "user_id": user_id,
+            "tenant_id": tenant_id,
+            "hero_id": uuid4(),
+            "world_state_id": uuid4(),
+            "now": now,
+            "today": today,
+            "yesterday": today - timedelta(days=1),
+            **period_params(now),
+        },
+    )
+    row = result.first()
+    if row is None:
+        await raise_completion_error(
+            session,
+            session_id=session_id,
+            user_id=user_id,
+            tenant_id=tenant_id,
+            now=now,
+        )
+
+    # Transient instances so the existing *_to_public helpers can be reused.
+    hero = Hero(
+        id=row.hero_id,
+        tenant_id=tenant_id,
+        user_id=user_id,
+        level=row.level,
+        exp=row.exp,
+        gold=row.gold,
+        equipped_hat_id=row.equipped_hat_id,
+        equipped_outfit_id=row.equipped_outfit_id,
+        equipped_accessory_id=row.equipped_accessory_id,
+    )
+    world_state = WorldState(
+        id=row.world_state_id,
+        tenant_id=tenant_id,
+        user_id=user_id,
+        study_room_level=row.study_room_level,
+        build_room_level=row.build_room_level,
+        training_room_level=row.training_room_level,
+        plaza_level=row.plaza_level,
+        total_sessions_success=row.total_sessions_success,
+        day_streak=row.day_streak,
+        last_session_date=row.last_session_date,
+    )
+    outcome = CompletionOutcome(
+        session_id=row.session_id,
+        room=row.room,
+        reward=RewardSummary(exp_reward=row.reward_exp, gold_reward=row.reward_gold),
+        hero=hero,
+        world_state=world_state,
+    )
+
+    if random.random() >= DROP_CHANCE:
+        return outcome
+
+    item = await choose_cosmetic_drop(
+        session,
+        user_id=user_id,
+        tenant_id=tenant_id,
+        hero_level=hero.level,
+        room=row.room,
+    )
+    if item is None:
+        return outcome
+
+    await award_cosmetic_drop(
+        session,
+        user_id=user_id,
+        tenant_id=tenant_id,
+        hero=hero,
+        session_id=row.session_id,
+        item=item,
+    )
+    outcome.dropped_item = item_to_dropped(item)
+    return outcome
+
+
+@dataclass
+class BatchCompletionOutcome:
+    results: list[SessionBatchResult]
+    hero: Hero
+    world_state: WorldState
+
+
+async def complete_sessions_batch(
+    session: AsyncSession,
+    *,
+    session_ids: Sequence[UUID],
+    user_id: UUID,
+    tenant_id: UUID,
+) -> BatchCompletionOutcome:
+    """Complete queued sessions oldest first under a single hero lock.
+
+    Each session is judged like ``POST /session/complete`` would judge it;
+    failures are reported per item instead of aborting the batch. Results
+    follow the order of ``session_ids``. The caller owns the final commit.
+
+    A queued session is finished at its planned end, ``started_at`` plus its
+    duration (or now, if that is still ahead), not when the batch arrives:
+    that time is its ``ended_at`` and decides the streak day, the focus stats
+    day and the leaderboard periods it counts toward.
+
+    Sessions the sweeper timed out get a 409, as they would from
+    ``POST /session/complete``: they no longer count toward the in-progress
+    limit of ``POST /session/start``, so paying them out would let a client
+    collect for more overlapping sessions than it may run.
+    """
+    rows = await session.scalars(
+        select(Session)
+        .where(
+            Session.id.in_(set(session_ids)),
+            Session.user_id == user_id,
+            Session.tenant_id == tenant_id,
+        )
+        .order_by(Session.started_at)
+        .with_for_update()
+    )
+    sessions = list(rows)
+    hero, world_state = await initialize_progression(
+        session, user_id=user_id, tenant_id=tenant_id, lock=True
+    )
+    now = datetime.now(UTC)
+    owned: OwnedItems | None = None
+    results: dict[UUID, SessionBatchResult] = {}
+    completed: list[Session] = []
+    # Drop lookups must not flush each session's writes on their own; one
+    # flush below sends them as a single executemany per statement.
+    with session.no_autoflush:
+        for session_obj in sessions:
+            if session_obj.status not in IN_PROGRESS_STATUSES:
+                results[session_obj.id] = SessionBatchResult(
+                    session_id=session_obj.id,
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="Session already finished.",
+                )
+                continue
+            try:
+                validate_completion_window(session_obj)
+            except HTTPException as exc:
+                results[session_obj.id] = SessionBatchResult(
+                    session_id=session_obj.id,
+                    status_code=exc.status_code,
+                    detail=exc.detail,
+                )
+                continue
+
+            exp_reward, gold_reward = compute_rewards(session_obj.duration_minutes)
+            apply_rewards(hero, exp_reward, gold_reward)
+            finished_at = min(
+                session_obj.started_at
+                + timedelta(minutes=session_obj.duration_minutes),
+                now,
+            )
+            session_obj.status = SessionStatus.SUCCESS
+            session_obj.ended_at = finished_at
+            session_obj.reward_exp = exp_reward
+            session_obj.reward_gold = gold_reward
+            # Written whether or not it drops: rows updating the same columns
+            # flush as one executemany, mixed ones as a statement per run.
+            flag_modified(session_obj, "drop_item_id")
+            update_world_state_on_success(
+                world_state, finished_at.astimezone(UTC).date()
+            )
+            completed.append(session_obj)
+            record_event(
+                session,
+                GameEventType.SESSION_SUCCESS,
+                tenant_id=tenant_id,
+                user_id=user_id,
+                payload=session_success_payload(session_obj, hero_level=hero.level),
+            )
+
+            dropped_item = None
+            if random.random() < DROP_CHANCE:
+                catalog = await item_catalog_cache.get(session)
+                if owned is None:
+                    owned = await get_owned_item_ids(
+                        session, user_id=user_id, tenant_id=tenant_id
+                    )
+                item = catalog.drop_table(
+                    room=session_obj.room, hero_level=hero.level
+                ).sample(owned)
+                if item is not None:
+                    owned.add(item.id)
+                    dropped_item = grant_cosmetic_item(
+                        session,
+                        user_id=user_id,
+                        tenant_id=tenant_id,
+                        hero=hero,
+                        session_obj=session_obj,
+                        item=item,
+                    )
+
+            results[session_obj.id] = SessionBatchResult(
+                session_id=session_obj.id,
+                status_code=status.HTTP_200_OK,
+                session=RewardSummary(exp_reward=exp_reward, gold_reward=gold_reward),
+                dropped_item=dropped_item,
+            )
+
+    await record_finished_sessions(session, completed)
+    await record_session_scores(session, completed)
+    await session.flush()
+    seen: set[UUID] = set()
+    ordered: list[SessionBatchResult] = []
+    for session_id in session_ids:
+        result = results.get(session_id)
+        if result is None:
+            result = SessionBatchResult(
+                session_id=session_id,
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Session not found.",
+            )
+        elif session_id in seen:
+            # Repeated ids are reported like a second call would be.
+            result = SessionBatchResult(
+                session_id=session_id,
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Session already finished.",
+            )
+        seen.add(session_id)
+        ordered.append(result)
+
+    return BatchCompletionOutcome(results=ordered, hero=hero, world_state=world_state)
+
+
+__all__ = [
+    "COMPLETE_SESSION_SQL",
+    "BatchCompletionOutcome",
+    "CompletionOutcome",
+    "award_cosmetic_drop",
+    "complete_session_atomic",
+    "complete_sessions_batch",
+    "complete_session_statement",
+    "level_progress_sql",
+    "total_exp_sql",
+]
@@ -0,0 +1,200 @@
+"""Alias-method drop tables for cosmetic rolls.
+
+A :class:`DropTable` covers the items droppable for one (level band, room)
+pair. Item weights reproduce the rarity rule of the drop roll: a rarity is
+picked by ``RARITY_WEIGHTS`` among the rarities present, then an item
+uniformly within it. Draws use Walker's alias method (Vose's construction),
+so sampling is O(1) regardless of catalog size.
+
+Owned items are excluded at draw time instead of rebuilding the table.
+:class:`OwnedItems` wraps a player's owned ids and keeps, per table it was
+used with, how many of them fall in each rarity; the count is taken once
+(O(owned)) when the ids are loaded for that table, which the inventory query
+already costs, and kept in step by :meth:`OwnedItems.add`. A draw is an
+alias lookup, repeated while it lands on a fully owned rarity, then uniform
+redraws within the rarity while they land on an owned item. That keeps the
+drop probabilities of the original roll exactly and costs expected
+O(1 / (1 - w)) + O(1 / (1 - f)) tries, where ``w`` is the weight share of
+fully owned rarities and ``f`` the owned fraction of the drawn rarity. Each
+loop stops after ``MAX_REJECTIONS`` tries and falls back to one O(rarities)
+pick or one O(rarity size) filter, so a mostly-owned rarity costs linear
+time in its size at worst. With nothing owned in the table a draw is a
+single alias lookup.
+"""
+
+from __future__ import annotations
+
+import random
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import TYPE_CHECKING
+from uuid import UUID
+
+from src.game.enums import ItemRarity
+
+if TYPE_CHECKING:
+    from src.game.catalog import CatalogItem
+
+RARITY_WEIGHTS: dict[ItemRarity, float] = {
+    ItemRarity.COMMON: 0.75,
+    ItemRarity.RARE: 0.2,
+    ItemRarity.EPIC: 0.05,
+}
+# Rejection draws before falling back to an explicit pick or filter.
+MAX_REJECTIONS = 8
+
+
+@dataclass(frozen=True, slots=True)
+class AliasTable:
+    prob: tuple[float, ...]
+    alias: tuple[int, ...]
+
+    @classmethod
+    def build(cls, weights: Sequence[float]) -> AliasTable:
+        size = len(weights)
+        total = sum(weights)
+        scaled = [weight * size / total for weight in weights]
+        prob = [1.0] * size
+        alias = list(range(size))
+        small = [index for index, value in enumerate(scaled) if value < 1.0]
+        large = [index for index, value in enumerate(scaled) if value >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            prob[less] = scaled[less]
+            alias[less] = more
+            scaled[more] += scaled[less] - 1.0
+            (small if scaled[more] < 1.0 else large).append(more)
+        # Whatever is left is 1.0 up to rounding error and keeps prob 1.0.
+        return cls(prob=tuple(prob), alias=tuple(alias))
+
+    def sample(self) -> int:
+        index = int(random.random() * len(self.prob))
+        return index if random.random() < self.prob[index] else self.alias[index]
+
+
+def choose_weighted_rarity(rarities: Iterable[ItemRarity]) -> ItemRarity | None:
+    weights = [(rarity, RARITY_WEIGHTS.get(rarity, 0.0)) for rarity in rarities]
+    if not weights:
+        return None
+    total_weight = sum(weight for _, weight in weights)
+    if total_weight == 0:
+        return random.choice(weights)[0]
+    pick = random.random() * total_weight
+    for rarity, weight in weights:
+        pick -= weight
+        if pick < 0:
+            return rarity
+    return weights[-1][0]
+
+
+# eq=False: tables are compared and hashed by identity, as OwnedItems keys.
+@dataclass(frozen=True, eq=False)
+class DropTable:
+    items: tuple[CatalogItem, ...]
+    by_rarity: Mapping[ItemRarity, tuple[CatalogItem, ...]]
+    # Keyed by ``UUID.int``: hashing a UUID object runs Python code per call.
+    positions: Mapping[int, int]
+    alias: AliasTable | None
+
+    @classmethod
+    def build(cls, items: Sequence[CatalogItem]) -> DropTable:
+        grouped: dict[ItemRarity, list[CatalogItem]] = {}
+        for item in items:
+            grouped.setdefault(item.rarity, []).append(item)
+        ordered = tuple(item for bucket in grouped.values() for item in bucket)
+
+        total_weight = sum(RARITY_WEIGHTS.get(rarity, 0.0) for rarity in grouped)
+        weights: list[float] = []
+        for rarity, bucket in grouped.items():
+            rarity_weight = RARITY_WEIGHTS.get(rarity, 0.0) if total_weight else 1.0
+            weights.extend([rarity_weight / len(bucket)] * len(bucket))
+
+        return cls(
+            items=ordered,
+            by_rarity=MappingProxyType(
+                {rarity: tuple(bucket) for rarity, bucket in grouped.items()}
+            ),
+            positions=MappingProxyType(
+                {item.id.int: index for index, item in enumerate(ordered)}
+            ),
+            alias=AliasTable.build(weights) if ordered else None,
+        )
+
+    def sample(self, owned: OwnedItems | None = None) -> CatalogItem | None:
+        """Draw one item that is not in ``owned``; ``None`` if all are owned."""
+        if self.alias is None:
+            return None
+        counts = owned.counts(self) if owned is not None else {}
+        if not counts:
+            return self.items[self.alias.sample()]
+        if sum(counts.values()) == len(self.items):
+            return None
+
+        # The alias draw picks the rarity with its weight among all present;
+        # redrawing when it is fully owned renormalizes over the rest.
+        for _ in range(MAX_REJECTIONS):
+            item = self.items[self.alias.sample()]
+            if counts.get(item.rarity, 0) < len(self.by_rarity[item.rarity]):
+                break
+        else:
+            rarity = choose_weighted_rarity(
+                rarity
+                for rarity, bucket in self.by_rarity.items()
+                if counts.get(rarity, 0) < len(bucket)
+            )
+            item = random.choice(self.by_rarity[rarity])
+        # Then uniformly among the rarity's items the player does not own.
+        bucket = self.by_rarity[item.rarity]
+        for _ in range(MAX_REJECTIONS):
+            if item.id.int not in owned.ids:
+                return item
+            item = random.choice(bucket)
+        return random.choice([item for item in bucket if item.id.int not in owned.ids])
+
+
+class OwnedItems:
+    """A player's owned item ids, with their per-rarity counts per table."""
+
+    def __init__(self, item_ids: Iterable[UUID] = ()) -> None:
+        # Keyed by ``UUID.int``, like DropTable.positions.
+        self.ids: set[int] = {item_id.int for item_id in item_ids}
+        self._counts: dict[DropTable, dict[ItemRarity, int]] = {}
+
+    def __contains__(self, item_id: UUID) -> bool:
+        return item_id.int in self.ids
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def counts(self, table: DropTable) -> Mapping[ItemRarity, int]:
+        """Owned items of ``table`` per rarity, counted on first use."""
+        counts = self._counts.get(table)
+        if counts is None:
+            counts = {}
+            for item_int in self.ids:
+                position = table.positions.get(item_int)
+                if position is not None:
+                    rarity = table.items[position].rarity
+                    counts[rarity] = counts.get(rarity, 0) + 1
+            self._counts[table] = counts
+        return counts
+
+    def add(self, item_id: UUID) -> None:
+        if item_id.int in self.ids:
+            return
+        self.ids.add(item_id.int)
+        for table, counts in self._counts.items():
+            position = table.positions.get(item_id.int)
+            if position is not None:
+                rarity = table.items[position].rarity
+                counts[rarity] = counts.get(rarity, 0) + 1
+
+
+__all__ = [
+    "RARITY_WEIGHTS",
+    "AliasTable",
+    "DropTable",
+    "OwnedItems",
+    "choose_weighted_rarity",
+]
@@ -36,9 +36,23 @@ class ItemRarity(str, Enum):
     EPIC = "epic"
 
 
+class LeaderboardPeriod(str, Enum):
+    DAILY = "daily"
+    WEEKLY = "weekly"
+    ALL_TIME = "all_time"
+
+
+class GameEventType(str, Enum):
+    SESSION_SUCCESS = "session_success"
+    SESSION_CANCEL = "session_cancel"
+    DROP_AWARDED = "drop_awarded"
+
+
 __all__ = [
+    "GameEventType",
     "ItemRarity",
     "ItemType",
+    "LeaderboardPeriod",
     "Room",
     "SessionStatus",
     "TaskCategory",
@@ -0,0 +1,75 @@
+"""ETags for the polled progression endpoints.
+
+``/worldstate`` and ``/inventory`` carry strong ETags hashed from version
+markers rather than from the body: the ``updated_at`` of the hero and world
+state, the hero's ``inventory_version`` counter and, for the inventory, the
+item catalog version. Every writer of those rows bumps its marker, so a
+request whose ``If-None-Match`` still matches is answered with 304 after one
+indexed lookup, without building or serializing the response.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.etags import make_etag
+from src.game.catalog import CatalogVersion
+from src.game.models import Hero, WorldState
+
+
+@dataclass(frozen=True)
+class ProgressionVersions:
+    hero_updated_at: datetime | None
+    inventory_version: int
+    world_state_updated_at: datetime | None
+
+    @classmethod
+    def of(cls, hero: Hero, world_state: WorldState) -> ProgressionVersions:
+        return cls(
+            hero_updated_at=hero.updated_at,
+            inventory_version=hero.inventory_version,
+            world_state_updated_at=world_state.updated_at,
+        )
+
+
+async def load_progression_versions(
+    session: AsyncSession, *, user_id: UUID, tenant_id: UUID
+) -> ProgressionVersions | None:
+    """The version markers alone; None until the progression rows exist."""
+    result = await session.execute(
+        select(Hero.updated_at, Hero.inventory_version, WorldState.updated_at)
+        .join(
+            WorldState,
+            (WorldState.tenant_id == Hero.tenant_id)
+            & (WorldState.user_id == Hero.user_id),
+        )
+        .where(Hero.tenant_id == tenant_id, Hero.user_id == user_id)
+    )
+    row = result.first()
+    if row is None:
+        return None
+    return ProgressionVersions(*row)
+
+
+def world_state_etag(versions: ProgressionVersions) -> str:
+    return make_etag("worldstate", versions.world_state_updated_at)
+
+
+def inventory_etag(versions: ProgressionVersions, catalog: CatalogVersion) -> str:
+    # Equipping touches the hero; the catalog version covers item edits.
+    return make_etag(
+        "inventory", versions.hero_updated_at, versions.inventory_version, *catalog
+    )
+
+
+__all__ = [
+    "ProgressionVersions",
+    "inventory_etag",
+    "load_progression_versions",
+    "world_state_etag",
+]
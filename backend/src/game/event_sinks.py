@@ -0,0 +1,106 @@
+"""Destinations for gameplay events drained from the outbox.
+
+A sink receives each relay batch in order and must have stored it durably
+when ``write`` returns: the relay deletes the batch from the outbox right
+after. A batch whose write raises stays in the outbox and is retried, so
+sinks see events at least once and consumers dedupe on the event ``id``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import IO, Any, Protocol
+from uuid import UUID
+
+
+@dataclass(frozen=True)
+class RelayedEvent:
+    id: int
+    event_type: str
+    tenant_id: UUID
+    user_id: UUID
+    payload: dict[str, Any]
+    occurred_at: datetime
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "id": self.id,
+                "type": self.event_type,
+                "tenant_id": str(self.tenant_id),
+                "user_id": str(self.user_id),
+                "occurred_at": self.occurred_at.isoformat(),
+                "payload": self.payload,
+            },
+            separators=(",", ":"),
+        )
+
+
+class OutboxSink(Protocol):
+    async def write(self, events: Sequence[RelayedEvent]) -> None: ...
+
+    async def close(self) -> None: ...
+
+
+class NdjsonFileSink:
+    """Appends events as JSON lines to files in ``directory``.
+
+    A file is closed and a new one started once it reaches ``max_bytes``.
+    File names carry the creation time and the process id, so relays in
+    several processes can share a directory. Each batch is fsynced before
+    ``write`` returns.
+    """
+
+    def __init__(self, directory: str | Path, *, max_bytes: int) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._file: IO[str] | None = None
+        self._size = 0
+        self._lock = asyncio.Lock()
+
+    @property
+    def path(self) -> Path | None:
+        return Path(self._file.name) if self._file is not None else None
+
+    async def write(self, events: Sequence[RelayedEvent]) -> None:
+        if not events:
+            return
+        data = "".join(f"{event.to_json()}\n" for event in events)
+        async with self._lock:
+            await asyncio.to_thread(self._append, data)
+
+    async def close(self) -> None:
+        async with self._lock:
+            if self._file is not None:
+                await asyncio.to_thread(self._file.close)
+                self._file = None
+
+    def _append(self, data: str) -> None:
+        file = self._file
+        if file is None or self._size >= self.max_bytes:
+            file = self._file = self._rotate()
+        file.write(data)
+        file.flush()
+        os.fsync(file.fileno())
+        self._size += len(data.encode())
+
+    def _rotate(self) -> IO[str]:
+        if self._file is not None:
+            self._file.close()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now(UTC).strftime("%Y%m%dT%H%M%S%f")
+        self._size = 0
+        return open(
+            self.directory / f"events-{stamp}-{os.getpid()}.ndjson",
+            "a",
+            encoding="utf-8",
+        )
+
+
+__all__ = ["NdjsonFileSink", "OutboxSink", "RelayedEvent"]
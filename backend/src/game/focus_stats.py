@@ -0,0 +1,272 @@
+"""Daily focus rollups.
+
+``focus_daily_stats`` holds one row per (tenant, player, day, room) with the
+sessions that ended that UTC day: successes, cancels and timeouts, minutes
+focused and rewards earned. Every writer that finishes a session adds to
+the row in the same transaction: the completion statement, the batch
+completion, cancel and the timeout sweeper. Stats endpoints read only
+these rows, never ``sessions``.
+
+The table can be rebuilt from the sessions themselves::
+
+    python -m src.game.focus_stats --rebuild [--tenant-id UUID]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from uuid import UUID
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from src.database import engine
+from src.game.enums import Room, SessionStatus
+from src.game.models import FocusDailyStats, Session
+
+logger = logging.getLogger(__name__)
+
+COUNTERS = (
+    "sessions_success",
+    "sessions_cancel",
+    "sessions_timeout",
+    "minutes_focused",
+    "reward_exp",
+    "reward_gold",
+)
+
+
+def stats_upsert_sql(source: str) -> str:
+    """Add each row of ``source`` to its daily bucket.
+
+    ``source`` is a FROM item with ``tenant_id``, ``user_id``, ``day``,
+    ``room`` and every name in ``COUNTERS``, at most one row per bucket.
+    """
+    columns = ", ".join(COUNTERS)
+    return f"""
+    INSERT INTO focus_daily_stats AS fs
+        (tenant_id, user_id, day, room, {columns}, updated_at)
+    SELECT r.tenant_id, r.user_id, r.day, r.room, {
+        ", ".join(f"r.{name}" for name in COUNTERS)
+    }, now()
+    FROM {source} AS r
+    ON CONFLICT ON CONSTRAINT focus_daily_stats_pkey DO UPDATE
+    SET {", ".join(f"{name} = fs.{name} + EXCLUDED.{name}" for name in COUNTERS)},
+        updated_at = now()
+    """
+
+
+def finished_sessions_sql(source: str) -> str:
+    """One row per bucket from finished sessions in ``source``.
+
+    ``source`` needs the ``sessions`` columns ``tenant_id``, ``user_id``,
+    ``room``, ``status``, ``ended_at``, ``duration_minutes``, ``reward_exp``
+    and ``reward_gold``.
+    """
+    return f"""(
+        SELECT s.tenant_id, s.user_id,
+            (s.ended_at AT TIME ZONE 'UTC')::date AS day,
+            s.room,
+            count(*) FILTER (
+                WHERE s.status = '{SessionStatus.SUCCESS.value}'
+            ) AS sessions_success,
+            count(*) FILTER (
+                WHERE s.status = '{SessionStatus.CANCEL.value}'
+            ) AS sessions_cancel,
+            count(*) FILTER (
+                WHERE s.status = '{SessionStatus.TIMEOUT.value}'
+            ) AS sessions_timeout,
+            coalesce(sum(s.duration_minutes) FILTER (
+                WHERE s.status = '{SessionStatus.SUCCESS.value}'
+            ), 0) AS minutes_focused,
+            coalesce(sum(s.reward_exp), 0) AS reward_exp,
+            coalesce(sum(s.reward_gold), 0) AS reward_gold
+        FROM {source} AS s
+        WHERE s.ended_at IS NOT NULL
+        GROUP BY 1, 2, 3, 4
+    )"""
+
+
+_FINISHED_SQL = ", ".join(
+    f"'{state.value}'"
+    for state in (SessionStatus.SUCCESS, SessionStatus.CANCEL, SessionStatus.TIMEOUT)
+)
+
+REBUILD_SQL = stats_upsert_sql(
+    finished_sessions_sql(
+        f"""(
+        SELECT * FROM sessions
+        WHERE status IN ({_FINISHED_SQL})
+          AND (CAST(:tenant_id AS uuid) IS NULL
+               OR tenant_id = CAST(:tenant_id AS uuid))
+    )"""
+    )
+)
+
+_SESSIONS_BY_ID_SQL = """(
+    SELECT * FROM sessions
+    WHERE id = ANY(CAST(:session_ids AS uuid[]))
+)"""
+
+record_sessions_statement = text(
+    stats_upsert_sql(finished_sessions_sql(_SESSIONS_BY_ID_SQL))
+)
+
+
+async def record_finished_sessions(
+    session: AsyncSession, sessions: Iterable[Session]
+) -> None:
+    """Add sessions that just reached a final status to their buckets.
+
+    Flushes first: the buckets are computed from the rows as written.
+    """
+    session_ids = [session_obj.id for session_obj in sessions]
+    if not session_ids:
+        return
+    await session.flush()
+    await session.execute(record_sessions_statement, {"session_ids": session_ids})
+
+
+@dataclass
+class DayStats:
+    day: date
+    sessions_success: int = 0
+    sessions_cancel: int = 0
+    sessions_timeout: int = 0
+    minutes_focused: int = 0
+    reward_exp: int = 0
+    reward_gold: int = 0
+    minutes_by_room: dict[Room, int] = field(default_factory=dict)
+
+
+def _totals(rows: Iterable, key) -> list[DayStats]:
+    buckets: dict[date, DayStats] = {}
+    for row in rows:
+        bucket = buckets.setdefault(key(row.day), DayStats(day=key(row.day)))
+        for name in COUNTERS:
+            setattr(bucket, name, getattr(bucket, name) + getattr(row, name))
+        if row.minutes_focused:
+            bucket.minutes_by_room[row.room] = (
+                bucket.minutes_by_room.get(row.room, 0) + row.minutes_focused
+            )
+    return sorted(buckets.values(), key=lambda bucket: bucket.day)
+
+
+def week_start(day: date) -> date:
+    return day - timedelta(days=day.weekday())
+
+
+async def _load_rows(
+    session: AsyncSession,
+    *,
+    tenant_id: UUID,
+    user_id: UUID | None,
+    start: date,
+    end: date,
+):
+    statement = select(
+        FocusDailyStats.day,
+        FocusDailyStats.room,
+        *(func.sum(getattr(FocusDailyStats, name)).label(name) for name in COUNTERS),
+    ).where(
+        FocusDailyStats.tenant_id == tenant_id,
+        FocusDailyStats.day >= start,
+        FocusDailyStats.day <= end,
+    )
+    if user_id is not None:
+        statement = statement.where(FocusDailyStats.user_id == user_id)
+    statement = statement.group_by(FocusDailyStats.day, FocusDailyStats.room)
+    result = await session.execute(statement)
+    return result.all()
+
+
+async def get_daily_stats(
+    session: AsyncSession,
+    *,
+    tenant_id: UUID,
+    user_id: UUID,
+    start: date,
+    end: date,
+) -> list[DayStats]:
+    """Per-day totals for the heatmap; days without sessions are omitted."""
+    rows = await _load_rows(
+        session, tenant_id=tenant_id, user_id=user_id, start=start, end=end
+    )
+    return _totals(rows, lambda day: day)
+
+
+async def get_weekly_stats(
+    session: AsyncSession,
+    *,
+    tenant_id: UUID,
+    user_id: UUID | None,
+    start: date,
+    end: date,
+) -> list[DayStats]:
+    """Totals per week (Monday start) for one player, or the whole tenant."""
+    rows = await _load_rows(
+        session, tenant_id=tenant_id, user_id=user_id, start=start, end=end
+    )
+    return _totals(rows, week_start)
+
+
+async def rebuild_focus_stats(
+    connection: AsyncConnection,
+    *,
+    tenant_id: UUID | None = None,
+) -> int:
+    """Recompute the buckets from finished sessions; returns the rows written.
+
+    The table lock makes concurrent writers wait until the rebuild commits,
+    so no session is counted twice or lost in between.
+    """
+    await connection.execute(
+        text("LOCK TABLE focus_daily_stats IN SHARE ROW EXCLUSIVE MODE")
+    )
+    delete = FocusDailyStats.__table__.delete()
+    if tenant_id is not None:
+        delete = delete.where(FocusDailyStats.tenant_id == tenant_id)
+    await connection.execute(delete)
+    result = await connection.execute(text(REBUILD_SQL), {"tenant_id": tenant_id})
+    return result.rowcount
+
+
+async def main(tenant_id: UUID | None) -> None:
+    try:
+        async with engine.begin() as connection:
+            written = await rebuild_focus_stats(connection, tenant_id=tenant_id)
+    finally:
+        await engine.dispose()
+    logger.info("Rebuilt focus stats, %s rows written", written)
+
+
+__all__ = [
+    "COUNTERS",
+    "DayStats",
+    "finished_sessions_sql",
+    "get_daily_stats",
+    "get_weekly_stats",
+    "rebuild_focus_stats",
+    "record_finished_sessions",
+    "stats_upsert_sql",
+    "week_start",
+]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Focus stats maintenance.")
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        required=True,
+        help="recompute the daily buckets from finished sessions",
+    )
+    parser.add_argument("--tenant-id", type=UUID, default=None)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main(args.tenant_id))
@@ -0,0 +1,376 @@
+"""Per-tenant leaderboards.
+
+Scores live in ``leaderboard_scores``, one row per (tenant, period, period
+start, player) holding the exp earned in that period. The reward path adds
+to the daily, weekly and all-time rows in the same statement that completes
+the session. Reads then never aggregate: top-N is a range scan of the
+ranking index, and a player's rank counts the index entries ahead of them.
+That count stops at ``RANK_EXACT_LIMIT``: further down, the rank is reported
+as ``RANK_EXACT_LIMIT + 1`` with ``rank_exact`` false ("1000+"), so a rank
+costs at most that many index entries however large the tenant.
+
+Periods are bucketed by UTC date; weeks start on Monday. Only the current
+period is read, so a daily job drops daily rows older than
+``DAILY_RETENTION_DAYS`` and weekly rows older than
+``WEEKLY_RETENTION_WEEKS``; all-time rows are kept. The table can also be
+rebuilt from successful sessions, which applies the same retention::
+
+    python -m src.game.leaderboard --prune
+    python -m src.game.leaderboard --rebuild [--tenant-id UUID]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import UTC, date, datetime, timedelta
+from uuid import UUID
+
+from sqlalchemy import and_, func, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from sqlalchemy.orm import aliased
+
+from src.auth.models import User
+from src.database import engine
+from src.game.enums import LeaderboardPeriod, SessionStatus
+from src.game.models import LeaderboardScore, Session
+
+logger = logging.getLogger(__name__)
+
+ALL_TIME_START = date(1970, 1, 1)
+RANK_EXACT_LIMIT = 1000
+DAILY_RETENTION_DAYS = 14
+WEEKLY_RETENTION_WEEKS = 12
+
+
+def period_start(period: LeaderboardPeriod, day: date) -> date:
+    if period == LeaderboardPeriod.DAILY:
+        return day
+    if period == LeaderboardPeriod.WEEKLY:
+        return day - timedelta(days=day.weekday())
+    return ALL_TIME_START
+
+
+def period_params(now: datetime) -> dict[str, date]:
+    """Bind parameters for :func:`score_upsert_sql`."""
+    day = now.astimezone(UTC).date()
+    return {
+        "daily_start": period_start(LeaderboardPeriod.DAILY, day),
+        "weekly_start": period_start(LeaderboardPeriod.WEEKLY, day),
+        "all_time_start": ALL_TIME_START,
+    }
+
+
+def score_upsert_sql(source: str) -> str:
+    """Add ``reward_exp`` of each row in ``source`` to the player's periods.
+
+    ``source`` is a FROM item with a ``reward_exp`` column; ``:tenant_id``,
+    ``:user_id`` and the :func:`period_params` names are bound by the caller.
+    """
+    periods = ", ".join(
+        f"('{period.value}'::leaderboard_period, CAST(:{period.value}_start AS date))"
+        for period in LeaderboardPeriod
+    )
+    return f"""
+    INSERT INTO leaderboard_scores AS ls
+        (tenant_id, period, period_start, user_id, score, updated_at)
+    SELECT :tenant_id, p.period, p.period_start, :user_id, c.reward_exp, now()
+    FROM {source} AS c
+    CROSS JOIN (VALUES {periods}) AS p (period, period_start)
+    ON CONFLICT ON CONSTRAINT leaderboard_scores_pkey DO UPDATE
+    SET score = ls.score + EXCLUDED.score,
+        updated_at = now()
+    """
+
+
+record_score_statement = text(
+    score_upsert_sql("(SELECT CAST(:reward_exp AS integer) AS reward_exp)")
+)
+
+# One (period, period_start) row per period of the session ``s`` ended in.
+_SESSION_PERIODS_SQL = f"""
+CROSS JOIN LATERAL (
+    VALUES
+        ('{LeaderboardPeriod.DAILY.value}'::leaderboard_period,
+         (s.ended_at AT TIME ZONE 'UTC')::date),
+        ('{LeaderboardPeriod.WEEKLY.value}'::leaderboard_period,
+         date_trunc('week', s.ended_at AT TIME ZONE 'UTC')::date),
+        ('{LeaderboardPeriod.ALL_TIME.value}'::leaderboard_period,
+         DATE '{ALL_TIME_START.isoformat()}')
+) AS p (period, period_start)
+"""
+
+# Periods a score row may no longer be kept for; see retention_params.
+_PAST_RETENTION_SQL = f"""(
+    (period = '{LeaderboardPeriod.DAILY.value}'
+     AND period_start < CAST(:daily_cutoff AS date))
+    OR (period = '{LeaderboardPeriod.WEEKLY.value}'
+        AND period_start < CAST(:weekly_cutoff AS date))
+)"""
+
+REBUILD_SQL = f"""
+INSERT INTO leaderboard_scores
+    (tenant_id, period, period_start, user_id, score, updated_at)
+SELECT s.tenant_id, p.period, p.period_start, s.user_id, sum(s.reward_exp), now()
+FROM sessions AS s
+{_SESSION_PERIODS_SQL}
+WHERE s.status = '{SessionStatus.SUCCESS.value}'
+  AND s.ended_at IS NOT NULL
+  AND (CAST(:tenant_id AS uuid) IS NULL OR s.tenant_id = CAST(:tenant_id AS uuid))
+  AND NOT {_PAST_RETENTION_SQL}
+GROUP BY s.tenant_id, p.period, p.period_start, s.user_id
+"""
+
+PRUNE_SQL = f"""
+DELETE FROM leaderboard_scores
+WHERE {_PAST_RETENTION_SQL}
+"""
+
+
+record_sessions_statement = text(
+    f"""
+INSERT INTO leaderboard_scores AS ls
+    (tenant_id, period, period_start, user_id, score, updated_at)
+SELECT s.tenant_id, p.period, p.period_start, s.user_id, sum(s.reward_exp), now()
+FROM sessions AS s
+{_SESSION_PERIODS_SQL}
+WHERE s.id = ANY(CAST(:session_ids AS uuid[]))
+  AND s.status = '{SessionStatus.SUCCESS.value}'
+  AND s.ended_at IS NOT NULL
+GROUP BY s.tenant_id, p.period, p.period_start, s.user_id
+ON CONFLICT ON CONSTRAINT leaderboard_scores_pkey DO UPDATE
+SET score = ls.score + EXCLUDED.score,
+    updated_at = now()
+"""
+)
+
+
+@dataclass
+class RankedScore:
+    rank: int
+    user_id: UUID
+    score: int
+    full_name: str | None = None
+    profile_picture: str | None = None
+    # False when the player is below RANK_EXACT_LIMIT: ``rank`` is a floor.
+    rank_exact: bool = True
+
+
+async def record_score(
+    session: AsyncSession,
+    *,
+    tenant_id: UUID,
+    user_id: UUID,
+    reward_exp: int,
+    now: datetime,
+) -> None:
+    await session.execute(
+        record_score_statement,
+        {
+            "tenant_id": tenant_id,
+            "user_id": user_id,
+            "reward_exp": reward_exp,
+            **period_params(now),
+        },
+    )
+
+
+async def record_session_scores(
+    session: AsyncSession, sessions: Iterable[Session]
+) -> None:
+    """Add successful sessions to the periods each of them ended in.
+
+    Unlike :func:`record_score`, which books one amount at ``now``, a batch
+    of sessions finished at different times can span days or weeks. Flushes
+    first: the periods are computed from the rows as written.
+    """
+    session_ids = [session_obj.id for session_obj in sessions]
+    if not session_ids:
+        return
+    await session.flush()
+    await session.execute(record_sessions_statement, {"session_ids": session_ids})
+
+
+def _board_filter(tenant_id: UUID, period: LeaderboardPeriod, start: date):
+    return and_(
+        LeaderboardScore.tenant_id == tenant_id,
+        LeaderboardScore.period == period,
+        LeaderboardScore.period_start == start,
+    )
+
+
+async def get_top_scores(
+    session: AsyncSession,
+    *,
+    tenant_id: UUID,
+    period: LeaderboardPeriod,
+    start: date,
+    limit: int,
+) -> list[RankedScore]:
+    result = await session.execute(
+        select(
+            LeaderboardScore.user_id,
+            LeaderboardScore.score,
+            User.full_name,
+            User.profile_picture,
+        )
+        .join(User, User.id == LeaderboardScore.user_id)
+        .where(_board_filter(tenant_id, period, start))
+        .order_by(LeaderboardScore.score.desc(), LeaderboardScore.user_id)
+        .limit(limit)
+    )
+    return [
+        RankedScore(
+            rank=position,
+            user_id=row.user_id,
+            score=row.score,
+            full_name=row.full_name,
+            profile_picture=row.profile_picture,
+        )
+        for position, row in enumerate(result, start=1)
+    ]
+
+
+async def get_player_rank(
+    session: AsyncSession,
+    *,
+    tenant_id: UUID,
+    user_id: UUID,
+    period: LeaderboardPeriod,
+    start: date,
+) -> RankedScore | None:
+    """The player's rank, exact down to ``RANK_EXACT_LIMIT``."""
+    me = (
+        select(LeaderboardScore.score, LeaderboardScore.user_id)
+        .where(
+            _board_filter(tenant_id, period, start),
+            LeaderboardScore.user_id == user_id,
+        )
+        .cte("me")
+    )
+    ahead = aliased(LeaderboardScore)
+    # The LIMIT bounds the ranking index scan.
+    ahead_rows = (
+        select(ahead.user_id)
+        .where(
+            ahead.tenant_id == tenant_id,
+            ahead.period == period,
+            ahead.period_start == start,
+            or_(
+                ahead.score > me.c.score,
+                and_(ahead.score == me.c.score, ahead.user_id < me.c.user_id),
+            ),
+        )
+        .limit(RANK_EXACT_LIMIT)
+        .subquery()
+    )
+    ahead_count = select(func.count()).select_from(ahead_rows).scalar_subquery()
+    result = await session.execute(select(me.c.score, ahead_count.label("ahead")))
+    row = result.first()
+    if row is None:
+        return None
+    return RankedScore(
+        rank=row.ahead + 1,
+        user_id=user_id,
+        score=row.score,
+        rank_exact=row.ahead < RANK_EXACT_LIMIT,
+    )
+
+
+def retention_params(today: date | None = None) -> dict[str, date]:
+    today = today or datetime.now(UTC).date()
+    return {
+        "daily_cutoff": today - timedelta(days=DAILY_RETENTION_DAYS),
+        "weekly_cutoff": period_start(LeaderboardPeriod.WEEKLY, today)
+        - timedelta(weeks=WEEKLY_RETENTION_WEEKS),
+    }
+
+
+async def prune_leaderboards(
+    connection: AsyncConnection, *, today: date | None = None
+) -> int:
+    """Drop daily and weekly rows past their retention; returns the rows.
+
+    One unindexed DELETE: run daily, the table only ever holds the retained
+    periods plus a day, so the scan stays proportional to the live rows.
+    """
+    result = await connection.execute(text(PRUNE_SQL), retention_params(today))
+    return result.rowcount
+
+
+async def rebuild_leaderboards(
+    connection: AsyncConnection,
+    *,
+    tenant_id: UUID | None = None,
+) -> int:
+    """Recompute scores from successful sessions; returns the rows written.
+
+    The table lock makes concurrent completions wait until the rebuild
+    commits, so no reward is counted twice or lost in between.
+    """
+    await connection.execute(
+        text("LOCK TABLE leaderboard_scores IN SHARE ROW EXCLUSIVE MODE")
+    )
+    delete = LeaderboardScore.__table__.delete()
+    if tenant_id is not None:
+        delete = delete.where(LeaderboardScore.tenant_id == tenant_id)
+    await connection.execute(delete)
+    result = await connection.execute(
+        text(REBUILD_SQL), {"tenant_id": tenant_id, **retention_params()}
+    )
+    return result.rowcount
+
+
+async def main(args: argparse.Namespace) -> None:
+    try:
+        async with engine.begin() as connection:
+            if args.prune:
+                pruned = await prune_leaderboards(connection)
+            else:
+                written = await rebuild_leaderboards(
+                    connection, tenant_id=args.tenant_id
+                )
+    finally:
+        await engine.dispose()
+    if args.prune:
+        logger.info("Pruned leaderboards, %s rows deleted", pruned)
+    else:
+        logger.info("Rebuilt leaderboards, %s rows written", written)
+
+
+__all__ = [
+    "ALL_TIME_START",
+    "RANK_EXACT_LIMIT",
+    "RankedScore",
+    "get_player_rank",
+    "get_top_scores",
+    "period_params",
+    "period_start",
+    "prune_leaderboards",
+    "rebuild_leaderboards",
+    "record_score",
+    "record_session_scores",
+    "score_upsert_sql",
+]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Leaderboard maintenance.")
+    action = parser.add_mutually_exclusive_group(required=True)
+    action.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="recompute scores from successful sessions",
+    )
+    action.add_argument(
+        "--prune",
+        action="store_true",
+        help="drop daily and weekly scores past their retention",
+    )
+    parser.add_argument("--tenant-id", type=UUID, default=None)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main(args))
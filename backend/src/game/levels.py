@@ -0,0 +1,100 @@
+"""Hero level curves.
+
+A curve says how much exp a level takes to clear. Rewards are applied on
+cumulative exp: ``add_exp`` converts (level, exp into the level) to a total,
+adds the grant and maps the total back. That costs O(1) on the linear curve
+(closed form with an integer square root) and O(log n) on any other curve,
+through a table of cumulative thresholds searched with ``bisect``. The old
+level-by-level loop was O(levels gained), which large grants made slow.
+
+Levels start at 1 with 0 exp.
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from bisect import bisect_right
+from collections.abc import Callable
+from math import isqrt
+
+EXP_PER_LEVEL = 100
+
+
+class LevelCurve(ABC):
+    @abstractmethod
+    def exp_to_next(self, level: int) -> int:
+        """Exp needed to go from ``level`` to ``level + 1``."""
+
+    @abstractmethod
+    def total_for_level(self, level: int) -> int:
+        """Cumulative exp at which ``level`` is reached."""
+
+    @abstractmethod
+    def level_for_total(self, total: int) -> tuple[int, int]:
+        """``(level, exp into that level)`` for ``total`` cumulative exp."""
+
+    def add_exp(self, level: int, exp: int, gained: int) -> tuple[int, int]:
+        level = max(level, 1)
+        return self.level_for_total(self.total_for_level(level) + exp + gained)
+
+
+class LinearCurve(LevelCurve):
+    """Level n takes ``step * n`` exp, so reaching it costs step * n(n-1) / 2."""
+
+    def __init__(self, step: int) -> None:
+        self.step = step
+
+    def exp_to_next(self, level: int) -> int:
+        return max(level, 1) * self.step
+
+    def total_for_level(self, level: int) -> int:
+        return self.step * level * (level - 1) // 2
+
+    def level_for_total(self, total: int) -> tuple[int, int]:
+        # Largest n with step * n(n-1) / 2 <= total.
+        step = self.step
+        level = (step + isqrt(step * step + 8 * step * total)) // (2 * step)
+        return level, total - self.total_for_level(level)
+
+
+class TabulatedCurve(LevelCurve):
+    """Any curve, given ``exp_to_next``; thresholds are cached as they are hit.
+
+    The table doubles whenever a total lies past its end, so it stays small
+    for curves that grow at least linearly. ``exp_to_next`` must be positive.
+    """
+
+    def __init__(self, exp_to_next: Callable[[int], int]) -> None:
+        self._exp_to_next = exp_to_next
+        # _totals[i] is the cumulative exp at which level i + 1 is reached.
+        self._totals = [0]
+
+    def exp_to_next(self, level: int) -> int:
+        return self._exp_to_next(max(level, 1))
+
+    def total_for_level(self, level: int) -> int:
+        self._extend(lambda: len(self._totals) >= level)
+        return self._totals[level - 1]
+
+    def level_for_total(self, total: int) -> tuple[int, int]:
+        self._extend(lambda: self._totals[-1] > total)
+        level = bisect_right(self._totals, total)
+        return level, total - self._totals[level - 1]
+
+    def _extend(self, covered: Callable[[], bool]) -> None:
+        totals = self._totals
+        while not covered():
+            for _ in range(len(totals)):
+                totals.append(totals[-1] + self._exp_to_next(len(totals)))
+
+
+LEVEL_CURVE = LinearCurve(EXP_PER_LEVEL)
+
+
+__all__ = [
+    "EXP_PER_LEVEL",
+    "LEVEL_CURVE",
+    "LevelCurve",
+    "LinearCurve",
+    "TabulatedCurve",
+]
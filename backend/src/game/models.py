@@ -1,27 +1,46 @@
 from __future__ import annotations
 
 from datetime import date, datetime
+from enum import Enum
+from typing import Any
 from uuid import UUID, uuid4
 
 from sqlalchemy import (
+    BigInteger,
     CheckConstraint,
     Date,
     DateTime,
     ForeignKey,
+    Identity,
+    Index,
     Integer,
     String,
     Text,
     UniqueConstraint,
     func,
+    text,
 )
 from sqlalchemy import (
     Enum as SQLEnum,
 )
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.dialects.postgresql import UUID as PGUUID
 from sqlalchemy.orm import Mapped, mapped_column
 
 from src.database import Base, TimestampMixin
-from src.game.enums import ItemRarity, ItemType, Room, SessionStatus, TaskCategory
+from src.game.enums import (
+    ItemRarity,
+    ItemType,
+    LeaderboardPeriod,
+    Room,
+    SessionStatus,
+    TaskCategory,
+)
+
+
+def _enum_values(enum_cls: type[Enum]) -> list[str]:
+    # Persist enum values (e.g. "study_room") to match the migrated Postgres types.
+    return [member.value for member in enum_cls]
 
 
 class Hero(TimestampMixin, Base):
@@ -62,6 +81,10 @@ class Hero(TimestampMixin, Base):
         PGUUID(as_uuid=True),
         ForeignKey("items.id", ondelete="SET NULL"),
     )
+    # Bumped whenever an inventory row is added; part of the inventory ETag.
+    inventory_version: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
+    )
 
 
 class TaskTemplate(TimestampMixin, Base):
@@ -86,13 +109,13 @@ class TaskTemplate(TimestampMixin, Base):
     )
     name: Mapped[str] = mapped_column(String(length=255), nullable=False)
     category: Mapped[TaskCategory] = mapped_column(
-        SQLEnum(TaskCategory, name="task_category"),
+        SQLEnum(TaskCategory, name="task_category", values_callable=_enum_values),
         nullable=False,
         default=TaskCategory.STUDY,
     )
     default_duration_minutes: Mapped[int] = mapped_column(Integer, nullable=False)
     room: Mapped[Room] = mapped_column(
-        SQLEnum(Room, name="task_room"),
+        SQLEnum(Room, name="task_room", values_callable=_enum_values),
         nullable=False,
         default=Room.STUDY,
     )
@@ -102,6 +125,14 @@ class TaskTemplate(TimestampMixin, Base):
             "default_duration_minutes IN (25, 50, 90)",
             name="default_duration_minutes_check",
         ),
+        # Keyset pagination of GET /tasks (src/game/pagination.py).
+        Index(
+            "ix_task_templates_owner_created_at",
+            "tenant_id",
+            "user_id",
+            "created_at",
+            "id",
+        ),
     )
 
 
@@ -135,7 +166,7 @@ class Session(TimestampMixin, Base):
         nullable=False,
     )
     room: Mapped[Room] = mapped_column(
-        SQLEnum(Room, name="session_room"),
+        SQLEnum(Room, name="session_room", values_callable=_enum_values),
         nullable=False,
     )
     started_at: Mapped[datetime] = mapped_column(
@@ -145,7 +176,7 @@ class Session(TimestampMixin, Base):
     )
     ended_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
     status: Mapped[SessionStatus] = mapped_column(
-        SQLEnum(SessionStatus, name="session_status"),
+        SQLEnum(SessionStatus, name="session_status", values_callable=_enum_values),
         default=SessionStatus.PENDING,
         nullable=False,
         index=True,
@@ -157,6 +188,23 @@ class Session(TimestampMixin, Base):
         ForeignKey("items.id", ondelete="SET NULL"),
     )
 
+    __table_args__ = (
+        # Keyset pagination of GET /sessions/history (src/game/pagination.py).
+        Index(
+            "ix_sessions_owner_started_at",
+            "tenant_id",
+            "user_id",
+            "started_at",
+            "id",
+        ),
+        # Only in-progress rows, for the timeout sweeper.
+        Index(
+            "ix_sessions_in_progress_started_at",
+            "started_at",
+            postgresql_where=text("status IN ('pending', 'active')"),
+        ),
+    )
+
 
 class Item(TimestampMixin, Base):
     __tablename__ = "items"
@@ -168,17 +216,17 @@ class Item(TimestampMixin, Base):
     )
     name: Mapped[str] = mapped_column(String(length=255), nullable=False)
     type: Mapped[ItemType] = mapped_column(
-        SQLEnum(ItemType, name="item_type"),
+        SQLEnum(ItemType, name="item_type", values_callable=_enum_values),
         nullable=False,
     )
     rarity: Mapped[ItemRarity] = mapped_column(
-        SQLEnum(ItemRarity, name="item_rarity"),
+        SQLEnum(ItemRarity, name="item_rarity", values_callable=_enum_values),
         nullable=False,
         default=ItemRarity.COMMON,
     )
     sprite_key: Mapped[str] = mapped_column(String(length=255), nullable=False)
     room_affinity: Mapped[Room | None] = mapped_column(
-        SQLEnum(Room, name="item_room_affinity"),
+        SQLEnum(Room, name="item_room_affinity", values_callable=_enum_values),
         nullable=True,
     )
     unlock_level: Mapped[int] = mapped_column(Integer, default=1, nullable=False)
@@ -235,6 +283,15 @@ class WorldState(TimestampMixin, Base):
             "user_id",
             name="uq_world_state_tenant_user",
         ),
+        # Walk order of the streak-reset job within a tenant bucket (the
+        # expression is src.game.streaks.BUCKET_SQL); only live streaks.
+        Index(
+            "ix_world_states_live_streak_shard",
+            text("((hashtext(tenant_id::text) & 2147483647) % 64)"),
+            "last_session_date",
+            "id",
+            postgresql_where=text("day_streak > 0"),
+        ),
     )
 
     id: Mapped[UUID] = mapped_column(
@@ -298,11 +355,118 @@ class CosmeticDropLog(Base):
     )
 
 
+class LeaderboardScore(Base):
+    """Exp earned by a player in one leaderboard period."""
+
+    __tablename__ = "leaderboard_scores"
+
+    tenant_id: Mapped[UUID] = mapped_column(
+        PGUUID(as_uuid=True),
+        ForeignKey("tenant.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    period: Mapped[LeaderboardPeriod] = mapped_column(
+        SQLEnum(
+            LeaderboardPeriod,
+            name="leaderboard_period",
+            values_callable=_enum_values,
+        ),
+        primary_key=True,
+    )
+    period_start: Mapped[date] = mapped_column(Date, primary_key=True)
+    user_id: Mapped[UUID] = mapped_column(
+        PGUUID(as_uuid=True),
+        ForeignKey("user.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    score: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
+
+
+Index(
+    "ix_leaderboard_scores_ranking",
+    LeaderboardScore.tenant_id,
+    LeaderboardScore.period,
+    LeaderboardScore.period_start,
+    LeaderboardScore.score.desc(),
+    LeaderboardScore.user_id,
+)
+
+
+class FocusDailyStats(Base):
+    """Finished sessions of a player per UTC day (of ``ended_at``) and room.
+
+    Maintained by the writers that finish sessions, see src/game/focus_stats.py.
+    """
+
+    __tablename__ = "focus_daily_stats"
+    __table_args__ = (Index("ix_focus_daily_stats_tenant_day", "tenant_id", "day"),)
+
+    tenant_id: Mapped[UUID] = mapped_column(
+        PGUUID(as_uuid=True),
+        ForeignKey("tenant.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    user_id: Mapped[UUID] = mapped_column(
+        PGUUID(as_uuid=True),
+        ForeignKey("user.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    room: Mapped[Room] = mapped_column(
+        SQLEnum(Room, name="session_room", values_callable=_enum_values),
+        primary_key=True,
+    )
+    sessions_success: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    sessions_cancel: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    sessions_timeout: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    minutes_focused: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    reward_exp: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    reward_gold: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
+
+
+class OutboxEvent(Base):
+    """Gameplay event waiting to be relayed, see src/game/outbox.py.
+
+    Written in the transaction that made the change and deleted once a sink
+    has it. No foreign keys: events are a log, not part of the game state.
+    """
+
+    __tablename__ = "outbox_events"
+    __table_args__ = (
+        # Per-user ordering check of the relay.
+        Index("ix_outbox_events_user_id_id", "user_id", "id"),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, Identity(), primary_key=True)
+    event_type: Mapped[str] = mapped_column(String(length=64), nullable=False)
+    tenant_id: Mapped[UUID] = mapped_column(PGUUID(as_uuid=True), nullable=False)
+    user_id: Mapped[UUID] = mapped_column(PGUUID(as_uuid=True), nullable=False)
+    payload: Mapped[dict[str, Any]] = mapped_column(JSONB, nullable=False)
+    occurred_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
+
+
 __all__ = [
     "CosmeticDropLog",
+    "FocusDailyStats",
     "Hero",
     "Inventory",
     "Item",
+    "LeaderboardScore",
+    "OutboxEvent",
     "Session",
     "TaskTemplate",
     "WorldState",
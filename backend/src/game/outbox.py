@@ -0,0 +1,278 @@
+"""Transactional outbox for gameplay events.
+
+``session_success``, ``session_cancel`` and ``drop_awarded`` rows are
+written to ``outbox_events`` by the same transaction as the state change,
+so an event exists exactly when its change committed. The relay drains the
+table in batches to an :class:`~src.game.event_sinks.OutboxSink`, away from
+the request path.
+
+Batches are claimed with ``FOR UPDATE SKIP LOCKED`` so several relays can
+run at once. Events of one user are delivered in ``id`` order: an event is
+left for a later batch while an older event of the same user is held by
+another relay. Delivery is at least once (see src/game/event_sinks.py).
+
+Run in-process by setting ``OUTBOX_RELAY_IN_PROCESS``, or standalone::
+
+    python -m src.game.outbox [--once]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import time
+from datetime import UTC, datetime
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from src import metrics
+from src.config import settings
+from src.database import engine
+from src.game.catalog import CatalogItem
+from src.game.enums import GameEventType
+from src.game.event_sinks import NdjsonFileSink, OutboxSink, RelayedEvent
+from src.game.models import OutboxEvent, Session
+
+logger = logging.getLogger(__name__)
+
+
+def record_event(
+    session: AsyncSession,
+    event_type: GameEventType,
+    *,
+    tenant_id: UUID,
+    user_id: UUID,
+    payload: dict[str, Any],
+) -> None:
+    """Queue an event with the caller's transaction.
+
+    The caller must hold the user's hero row lock until it commits
+    (``initialize_progression(lock=True)``, or the ``hero`` CTE of the
+    completion statement). Ids are taken on insert and the relay delivers a
+    user's events in id order, so the lock keeps that order the commit order.
+    """
+    session.add(
+        OutboxEvent(
+            event_type=event_type.value,
+            tenant_id=tenant_id,
+            user_id=user_id,
+            payload=payload,
+        )
+    )
+
+
+# Payloads are built here for ORM writers and by the SQL below for the
+# single-statement paths in src.game.completion; keep the two in step.
+def session_success_payload(session_obj: Session, *, hero_level: int) -> dict:
+    return {
+        "session_id": str(session_obj.id),
+        "room": session_obj.room.value,
+        "duration_minutes": session_obj.duration_minutes,
+        "reward_exp": session_obj.reward_exp,
+        "reward_gold": session_obj.reward_gold,
+        "hero_level": hero_level,
+    }
+
+
+def session_cancel_payload(session_obj: Session) -> dict:
+    return {
+        "session_id": str(session_obj.id),
+        "room": session_obj.room.value,
+        "duration_minutes": session_obj.duration_minutes,
+    }
+
+
+def drop_awarded_payload(session_id: UUID, item: CatalogItem) -> dict:
+    return {
+        "session_id": str(session_id),
+        "item_id": str(item.id),
+        "item_type": item.type.value,
+        "rarity": item.rarity.value,
+    }
+
+
+INSERT_EVENT_SQL = """
+INSERT INTO outbox_events (event_type, tenant_id, user_id, payload)
+SELECT '{event_type}', :tenant_id, :user_id, jsonb_build_object({fields})
+"""
+
+
+def insert_event_sql(event_type: GameEventType, **fields: str) -> str:
+    """``INSERT ... SELECT`` of one event per row; append the ``FROM`` clause.
+
+    ``fields`` maps payload keys to SQL expressions.
+    """
+    return INSERT_EVENT_SQL.strip().format(
+        event_type=event_type.value,
+        fields=", ".join(f"'{key}', {value}" for key, value in fields.items()),
+    )
+
+
+CLAIM_SQL = """
+WITH claimed AS (
+    SELECT id, user_id
+    FROM outbox_events
+    ORDER BY id
+    LIMIT :batch_size
+    FOR UPDATE SKIP LOCKED
+)
+SELECT e.id, e.event_type, e.tenant_id, e.user_id, e.payload, e.occurred_at
+FROM claimed AS c
+JOIN outbox_events AS e ON e.id = c.id
+WHERE NOT EXISTS (
+    SELECT 1
+    FROM outbox_events AS older
+    WHERE older.user_id = c.user_id
+      AND older.id < c.id
+      AND older.id NOT IN (SELECT id FROM claimed)
+)
+ORDER BY e.id
+"""
+
+DELETE_SQL = "DELETE FROM outbox_events WHERE id = ANY(:ids)"
+
+claim_statement = text(CLAIM_SQL).columns(payload=OutboxEvent.__table__.c.payload.type)
+delete_statement = text(DELETE_SQL)
+
+RELAY_BATCH_SIZE = metrics.histogram(
+    "game_outbox_relay_batch_size",
+    "Events delivered per outbox relay batch.",
+    buckets=(0, 1, 5, 10, 50, 100, 250, 500, 1000, 5000),
+)
+RELAY_LAG_SECONDS = metrics.histogram(
+    "game_outbox_relay_lag_seconds",
+    "Delay between an event being written and relayed (oldest event per batch).",
+    buckets=(0.1, 0.5, 1, 5, 15, 30, 60, 300, 900, 3600),
+)
+EVENTS_RELAYED = metrics.counter(
+    "game_outbox_events_relayed_total",
+    "Outbox events delivered to the sink.",
+)
+RELAY_FAILURES = metrics.counter(
+    "game_outbox_relay_failures_total",
+    "Outbox relay batches that raised.",
+)
+
+
+async def relay_batch(
+    sink: OutboxSink,
+    db_engine: AsyncEngine = engine,
+    *,
+    batch_size: int,
+) -> int:
+    """Deliver at most ``batch_size`` events and delete them, in one transaction.
+
+    Returns how many events were delivered.
+    """
+    async with db_engine.begin() as connection:
+        result = await connection.execute(claim_statement, {"batch_size": batch_size})
+        events = [RelayedEvent(**row._mapping) for row in result]
+        if not events:
+            RELAY_BATCH_SIZE.observe(0)
+            return 0
+        await sink.write(events)
+        await connection.execute(
+            delete_statement, {"ids": [event.id for event in events]}
+        )
+
+    RELAY_BATCH_SIZE.observe(len(events))
+    EVENTS_RELAYED.inc(len(events))
+    RELAY_LAG_SECONDS.observe(
+        (datetime.now(UTC) - events[0].occurred_at).total_seconds()
+    )
+    return len(events)
+
+
+async def relay_until_drained(
+    sink: OutboxSink,
+    db_engine: AsyncEngine = engine,
+    *,
+    batch_size: int,
+) -> int:
+    """Relay batches back to back until one comes back empty."""
+    total = 0
+    while True:
+        relayed = await relay_batch(sink, db_engine, batch_size=batch_size)
+        total += relayed
+        if not relayed:
+            return total
+
+
+async def run_outbox_relay(
+    sink: OutboxSink,
+    db_engine: AsyncEngine = engine,
+    *,
+    interval: float,
+    batch_size: int,
+) -> None:
+    """Relay forever, sleeping ``interval`` seconds once the outbox is empty."""
+    while True:
+        started = time.monotonic()
+        try:
+            relayed = await relay_until_drained(sink, db_engine, batch_size=batch_size)
+            if relayed:
+                logger.info(
+                    "Relayed %s outbox events in %.2fs",
+                    relayed,
+                    time.monotonic() - started,
+                )
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            RELAY_FAILURES.inc()
+            logger.exception("Outbox relay failed")
+        await asyncio.sleep(interval)
+
+
+def build_sink() -> OutboxSink:
+    return NdjsonFileSink(
+        settings.OUTBOX_NDJSON_DIRECTORY,
+        max_bytes=settings.OUTBOX_NDJSON_MAX_BYTES,
+    )
+
+
+async def main(once: bool) -> None:
+    sink = build_sink()
+    try:
+        if once:
+            total = await relay_until_drained(
+                sink, batch_size=settings.OUTBOX_RELAY_BATCH_SIZE
+            )
+            logger.info("Relayed %s outbox events", total)
+        else:
+            await run_outbox_relay(
+                sink,
+                interval=settings.OUTBOX_RELAY_INTERVAL_SECONDS,
+                batch_size=settings.OUTBOX_RELAY_BATCH_SIZE,
+            )
+    finally:
+        await sink.close()
+        await engine.dispose()
+
+
+__all__ = [
+    "CLAIM_SQL",
+    "build_sink",
+    "drop_awarded_payload",
+    "insert_event_sql",
+    "record_event",
+    "relay_batch",
+    "relay_until_drained",
+    "run_outbox_relay",
+    "session_cancel_payload",
+    "session_success_payload",
+]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Relay gameplay events.")
+    parser.add_argument(
+        "--once", action="store_true", help="drain the outbox once and exit"
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main(args.once))
@@ -0,0 +1,124 @@
+"""Keyset pagination over ``(timestamp, id)``, newest first.
+
+Pages are cut with a row comparison on the sort key plus the primary key,
+so rows sharing a timestamp are neither skipped nor repeated, and every
+page is an index range scan (see the ``*_owner_*`` indexes in models) no
+matter how deep it is.
+
+Cursors are opaque: the boundary row's key and the paging direction,
+signed per listing so they cannot be forged or replayed on another
+endpoint. ``next_cursor`` walks towards older rows, ``prev_cursor`` back
+towards newer ones.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Generic, Literal, TypeVar
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from itsdangerous import BadSignature, URLSafeSerializer
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+from src.auth.config import auth_config
+
+T = TypeVar("T")
+Direction = Literal["next", "prev"]
+
+
+@dataclass(frozen=True)
+class Cursor:
+    timestamp: datetime
+    id: UUID
+    direction: Direction
+
+
+@dataclass
+class Page(Generic[T]):
+    items: list[T]
+    next_cursor: str | None
+    prev_cursor: str | None
+
+
+class CursorCodec:
+    def __init__(self, scope: str) -> None:
+        self.serializer = URLSafeSerializer(
+            auth_config.jwt_secret,
+            salt=f"page-cursor:{scope}",
+        )
+
+    def encode(self, cursor: Cursor) -> str:
+        return self.serializer.dumps(
+            [cursor.timestamp.isoformat(), cursor.id.hex, cursor.direction]
+        )
+
+    def decode(self, value: str) -> Cursor:
+        try:
+            timestamp, identifier, direction = self.serializer.loads(value)
+            if direction not in ("next", "prev"):
+                raise ValueError(direction)
+            return Cursor(
+                timestamp=datetime.fromisoformat(timestamp),
+                id=UUID(identifier),
+                direction=direction,
+            )
+        except (BadSignature, TypeError, ValueError) as exc:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor.",
+            ) from exc
+
+
+async def paginate(
+    session: AsyncSession,
+    statement: Select[tuple[T]],
+    *,
+    sort_column: InstrumentedAttribute[datetime],
+    id_column: InstrumentedAttribute[UUID],
+    codec: CursorCodec,
+    cursor: str | None,
+    limit: int,
+) -> Page[T]:
+    """Run ``statement`` (filters only, no ordering) for one page."""
+    position = codec.decode(cursor) if cursor else None
+    backwards = position is not None and position.direction == "prev"
+    if position is not None:
+        key = tuple_(sort_column, id_column)
+        boundary = tuple_(position.timestamp, position.id)
+        statement = statement.where(key > boundary if backwards else key < boundary)
+    if backwards:
+        statement = statement.order_by(sort_column.asc(), id_column.asc())
+    else:
+        statement = statement.order_by(sort_column.desc(), id_column.desc())
+
+    result = await session.execute(statement.limit(limit + 1))
+    rows = list(result.scalars().all())
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if backwards:
+        rows.reverse()
+
+    def edge(row: Any, direction: Direction) -> str:
+        return codec.encode(
+            Cursor(
+                timestamp=getattr(row, sort_column.key),
+                id=getattr(row, id_column.key),
+                direction=direction,
+            )
+        )
+
+    # Paging back, the cursor row itself is still ahead of this page.
+    older = has_more if not backwards else True
+    newer = has_more if backwards else position is not None
+    return Page(
+        items=rows,
+        next_cursor=edge(rows[-1], "next") if rows and older else None,
+        prev_cursor=edge(rows[0], "prev") if rows and newer else None,
+    )
+
+
+__all__ = ["Cursor", "CursorCodec", "Page", "paginate"]
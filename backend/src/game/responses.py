@@ -0,0 +1,41 @@
+"""Fast path for game responses built from trusted data.
+
+Game payloads are assembled from ORM rows and already have the right types,
+yet ``response_model`` dumps each returned model, validates the dump again
+and then JSON-encodes the result in Python. Routes build their payloads
+with ``model_construct`` (no validation) and pass them through :func:`render`.
+With FAST_JSON_RESPONSES on, :func:`render` serializes the model once with
+pydantic-core's compiled serializer and returns the bytes as the response,
+so FastAPI skips its own validation and encoding. The JSON is the same
+either way; ``response_model`` still documents the schema.
+"""
+
+from __future__ import annotations
+
+from typing import TypeVar
+
+from fastapi import Response
+from pydantic import BaseModel
+
+from src.config import settings
+
+M = TypeVar("M", bound=BaseModel)
+
+
+def render(model: M, response: Response | None = None) -> M | Response:
+    """``model`` as is, or already serialized when fast responses are on.
+
+    ``response`` is the route's injected response; its headers (e.g. the
+    ETag) are carried over, since FastAPI only merges them into responses
+    it builds itself.
+    """
+    if not settings.FAST_JSON_RESPONSES:
+        return model
+    return Response(
+        content=model.__pydantic_serializer__.to_json(model),
+        media_type="application/json",
+        headers=response.headers if response is not None else None,
+    )
+
+
+__all__ = ["render"]
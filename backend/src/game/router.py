@@ -1,26 +1,63 @@
 from __future__ import annotations
 
-from datetime import UTC, datetime
+from dataclasses import asdict
+from datetime import UTC, datetime, timedelta
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.auth.dependencies import CurrentUser, TenantContext, current_tenant
+from src.admission import shed_when_saturated
+from src.auth.dependencies import (
+    Principal,
+    current_principal,
+    require_role,
+)
+from src.auth.models import UserTenantRole
 from src.database import get_async_session
-from src.game.enums import ItemType, Room, SessionStatus
+from src.etags import not_modified, not_modified_response, set_etag
+from src.game.catalog import item_catalog_cache
+from src.game.completion import complete_session_atomic, complete_sessions_batch
+from src.game.enums import (
+    GameEventType,
+    ItemType,
+    LeaderboardPeriod,
+    Room,
+    SessionStatus,
+)
+from src.game.etags import (
+    ProgressionVersions,
+    inventory_etag,
+    load_progression_versions,
+    world_state_etag,
+)
+from src.game.focus_stats import (
+    DayStats,
+    get_daily_stats,
+    get_weekly_stats,
+    record_finished_sessions,
+    week_start,
+)
+from src.game.leaderboard import get_player_rank, get_top_scores, period_start
 from src.game.models import Inventory, Item, Session, TaskTemplate
+from src.game.outbox import record_event, session_cancel_payload
+from src.game.pagination import CursorCodec, paginate
+from src.game.responses import render
 from src.game.schemas import (
-    ActiveOrganizationResponse,
     EquipItemRequest,
+    FocusHeatmapResponse,
+    FocusStatsBucket,
+    FocusWeeklyResponse,
     HeroEquipped,
     HeroPublic,
     InventoryItemPublic,
     InventoryResponse,
+    LeaderboardEntry,
+    LeaderboardResponse,
     PaginatedTasks,
-    ProfileResponse,
-    RewardSummary,
+    SessionBatchCompleteRequest,
+    SessionBatchCompleteResponse,
     SessionCompleteResponse,
     SessionHistoryEntry,
     SessionHistoryResponse,
@@ -34,17 +71,15 @@ from src.game.schemas import (
 )
 from src.game.services import (
     ALLOWED_DURATIONS,
-    apply_rewards,
-    compute_rewards,
     get_inventory_items,
     get_task_template,
     hero_to_public,
     initialize_progression,
-    maybe_roll_cosmetic_drop,
     milestone_summary,
-    update_world_state_on_success,
     world_state_to_public,
 )
+from src.query_budget import QueryBudget
+from src.replicas import get_read_session
 
 router = APIRouter(tags=["game"])
 
@@ -58,7 +93,7 @@ def ensure_allowed_duration(duration: int) -> None:
 
 
 def serialize_task(template: TaskTemplate) -> TaskTemplatePublic:
-    return TaskTemplatePublic(
+    return TaskTemplatePublic.model_construct(
         id=template.id,
         name=template.name,
         category=template.category,
@@ -69,101 +104,60 @@ def serialize_task(template: TaskTemplate) -> TaskTemplatePublic:
     )
 
 
-def encode_cursor(value: datetime) -> str:
-    return value.isoformat()
-
-
-def decode_cursor(cursor: str) -> datetime:
-    try:
-        return datetime.fromisoformat(cursor)
-    except ValueError as exc:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid cursor.",
-        ) from exc
-
-
-def serialize_active_organization(context: TenantContext) -> ActiveOrganizationResponse:
-    return ActiveOrganizationResponse(
-        id=context.tenant.id,
-        name=context.tenant.name,
-        slug=context.tenant.slug,
-        business_image=context.tenant.business_image,
-        created_at=context.tenant.created_at,
-        role=context.membership.role,
-        is_default=context.membership.is_default,
-    )
+task_cursors = CursorCodec("tasks")
+history_cursors = CursorCodec("sessions-history")
 
 
-@router.get("/profile", response_model=ProfileResponse)
-async def get_profile(
-    user: CurrentUser,
-    context: TenantContext = Depends(current_tenant),
-    session: AsyncSession = Depends(get_async_session),
-) -> ProfileResponse:
-    hero, world_state = await initialize_progression(
-        session,
-        user_id=user.id,
-        tenant_id=context.tenant.id,
-    )
-    return ProfileResponse(
-        user=user,
-        hero=hero_to_public(hero),
-        world_state=world_state_to_public(world_state),
-        organization=serialize_active_organization(context),
-    )
-
-
-@router.get("/tasks", response_model=PaginatedTasks)
+@router.get(
+    "/tasks", response_model=PaginatedTasks, dependencies=[Depends(QueryBudget(2))]
+)
 async def list_tasks(
-    user: CurrentUser,
-    context: TenantContext = Depends(current_tenant),
-    session: AsyncSession = Depends(get_async_session),
+    principal: Principal = Depends(current_principal),
+    session: AsyncSession = Depends(get_read_session),
     room: Room | None = Query(default=None),
     limit: int = Query(default=20, ge=1, le=50),
     cursor: str | None = Query(default=None),
-) -> PaginatedTasks:
-    statement = (
-        select(TaskTemplate)
-        .where(
-            TaskTemplate.user_id == user.id,
-            TaskTemplate.tenant_id == context.tenant.id,
-        )
-        .order_by(TaskTemplate.created_at.desc())
+) -> PaginatedTasks | Response:
+    statement = select(TaskTemplate).where(
+        TaskTemplate.user_id == principal.user_id,
+        TaskTemplate.tenant_id == principal.tenant_id,
     )
     if room:
         statement = statement.where(TaskTemplate.room == room)
-    if cursor:
-        cursor_dt = decode_cursor(cursor)
-        statement = statement.where(TaskTemplate.created_at < cursor_dt)
-    statement = statement.limit(limit + 1)
-
-    result = await session.execute(statement)
-    templates = list(result.scalars().all())
-    next_cursor = None
-    if len(templates) > limit:
-        next_cursor = encode_cursor(templates[limit - 1].created_at)
-        templates = templates[:limit]
+    page = await paginate(
+        session,
+        statement,
+        sort_column=TaskTemplate.created_at,
+        id_column=TaskTemplate.id,
+        codec=task_cursors,
+        cursor=cursor,
+        limit=limit,
+    )
 
-    return PaginatedTasks(
-        items=[serialize_task(template) for template in templates],
-        next_cursor=next_cursor,
+    return render(
+        PaginatedTasks.model_construct(
+            items=[serialize_task(template) for template in page.items],
+            next_cursor=page.next_cursor,
+            prev_cursor=page.prev_cursor,
+        )
     )
 
 
 @router.post(
-    "/tasks", response_model=TaskTemplatePublic, status_code=status.HTTP_201_CREATED
+    "/tasks",
+    response_model=TaskTemplatePublic,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(QueryBudget(3))],
 )
 async def create_task_template(
     payload: TaskTemplateCreate,
-    user: CurrentUser,
-    context: TenantContext = Depends(current_tenant),
+    principal: Principal = Depends(current_principal),
     session: AsyncSession = Depends(get_async_session),
 ) -> TaskTemplatePublic:
     ensure_allowed_duration(payload.default_duration_minutes)
     template = TaskTemplate(
-        tenant_id=context.tenant.id,
-        user_id=user.id,
+        tenant_id=principal.tenant_id,
+        user_id=principal.user_id,
         name=payload.name.strip(),
         category=payload.category,
         default_duration_minutes=payload.default_duration_minutes,
@@ -175,19 +169,22 @@ async def create_task_template(
     return serialize_task(template)
 
 
-@router.put("/tasks/{task_id}", response_model=TaskTemplatePublic)
+@router.put(
+    "/tasks/{task_id}",
+    response_model=TaskTemplatePublic,
+    dependencies=[Depends(QueryBudget(4))],
+)
 async def update_task_template(
     task_id: UUID,
     payload: TaskTemplateUpdate,
-    user: CurrentUser,
-    context: TenantContext = Depends(current_tenant),
+    principal: Principal = Depends(current_principal),
     session: AsyncSession = Depends(get_async_session),
 ) -> TaskTemplatePublic:
     template = await get_task_template(
         session,
         template_id=task_id,
-        user_id=user.id,
-        tenant_id=context.tenant.id,
+        user_id=principal.user_id,
+        tenant_id=principal.tenant_id,
     )
     if not template:
         raise HTTPException(
@@ -213,18 +210,18 @@ async def update_task_template(
     "/tasks/{task_id}",
     status_code=status.HTTP_200_OK,
     response_model=dict[str, bool],
+    dependencies=[Depends(QueryBudget(3))],
 )
 async def delete_task_template(
     task_id: UUID,
-    user: CurrentUser,
-    context: TenantContext = Depends(current_tenant),
+    principal: Principal = Depends(current_principal),
     session: AsyncSession = Depends(get_async_session),
 ) -> None:
     template = await get_task_template(
         session,
         template_id=task_id,
-        user_id=user.id,
-        tenant_id=context.tenant.id,
+        user_id=principal.user_id,
+        tenant_id=principal.tenant_id,
     )
     if not template:
         raise HTTPException(
@@ -239,19 +236,19 @@ async def delete_task_template(
     "/session/start",
     response_model=SessionStartResponse,
     status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(QueryBudget(5))],
 )
 async def start_session(
     payload: SessionStartRequest,
-    user: CurrentUser,
-    context: TenantContext = Depends(current_tenant),
+    principal: Principal = Depends(current_principal),
     session: AsyncSession = Depends(get_async_session),
 ) -> SessionStartResponse:
     ensure_allowed_duration(payload.duration_minutes)
     template = await get_task_template(
         session,
         template_id=payload.task_template_id,
-        user_id=user.id,
-        tenant_id=context.tenant.id,
+        user_id=principal.user_id,
+        tenant_id=principal.tenant_id,
     )
     if not template:
         raise HTTPException(
@@ -262,8 +259,8 @@ async def start_session(
     pending_count_stmt = (
         select(func.count(Session.id))
         .where(
-            Session.user_id == user.id,
-            Session.tenant_id == context.tenant.id,
+            Session.user_id == principal.user_id,
+            Session.tenant_id == principal.tenant_id,
         )
         .where(Session.status.in_([SessionStatus.PENDING, SessionStatus.ACTIVE]))
     )
@@ -275,8 +272,8 @@ async def start_session(
         )
 
     session_obj = Session(
-        tenant_id=context.tenant.id,
-        user_id=user.id,
+        tenant_id=principal.tenant_id,
+        user_id=principal.user_id,
         task_template_id=template.id,
         duration_minutes=payload.duration_minutes,
         room=template.room,
@@ -295,16 +292,6 @@ async def start_session(
     )
 
 
-def validate_completion_window(session_obj: Session) -> None:
-    elapsed = datetime.now(UTC) - session_obj.started_at
-    required_minutes = session_obj.duration_minutes * 0.8
-    if elapsed.total_seconds() < required_minutes * 60:
-        raise HTTPException(
-            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-            detail="Session cannot be completed yet.",
-        )
-
-
 async def get_session_for_user(
     session: AsyncSession,
     *,
@@ -325,75 +312,72 @@ async def get_session_for_user(
     return result.scalars().first()
 
 
-@router.post("/session/complete", response_model=SessionCompleteResponse)
+@router.post(
+    "/session/complete",
+    response_model=SessionCompleteResponse,
+    dependencies=[Depends(QueryBudget(4))],
+)
 async def complete_session(
     payload: SessionIdentifier,
-    user: CurrentUser,
-    context: TenantContext = Depends(current_tenant),
+    principal: Principal = Depends(current_principal),
     session: AsyncSession = Depends(get_async_session),
 ) -> SessionCompleteResponse:
-    session_obj = await get_session_for_user(
+    outcome = await complete_session_atomic(
         session,
         session_id=payload.session_id,
-        user_id=user.id,
-        tenant_id=context.tenant.id,
+        user_id=principal.user_id,
+        tenant_id=principal.tenant_id,
+    )
+    await session.commit()
+
+    return SessionCompleteResponse(
+        session=outcome.reward,
+        dropped_item=outcome.dropped_item,
+        hero=hero_to_public(outcome.hero),
+        world_state=world_state_to_public(outcome.world_state),
     )
-    if not session_obj:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Session not found."
-        )
-    if session_obj.status not in (SessionStatus.PENDING, SessionStatus.ACTIVE):
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail="Session already finished.",
-        )
-    validate_completion_window(session_obj)
 
-    hero, world_state = await initialize_progression(
-        session,
-        user_id=user.id,
-        tenant_id=context.tenant.id,
-    )
-    exp_reward, gold_reward = compute_rewards(session_obj.duration_minutes)
-    apply_rewards(hero, exp_reward, gold_reward)
-    session_obj.reward_exp = exp_reward
-    session_obj.reward_gold = gold_reward
-    session_obj.status = SessionStatus.SUCCESS
-    session_obj.ended_at = datetime.now(UTC)
 
-    update_world_state_on_success(world_state)
-    dropped_item = await maybe_roll_cosmetic_drop(
+@router.post(
+    "/session/complete/batch",
+    response_model=SessionBatchCompleteResponse,
+    dependencies=[Depends(QueryBudget(12))],
+)
+async def complete_sessions(
+    payload: SessionBatchCompleteRequest,
+    principal: Principal = Depends(current_principal),
+    session: AsyncSession = Depends(get_async_session),
+) -> SessionBatchCompleteResponse:
+    outcome = await complete_sessions_batch(
         session,
-        user_id=user.id,
-        tenant_id=context.tenant.id,
-        hero=hero,
-        session_obj=session_obj,
+        session_ids=payload.session_ids,
+        user_id=principal.user_id,
+        tenant_id=principal.tenant_id,
     )
     await session.commit()
-    await session.refresh(hero)
-    await session.refresh(world_state)
-    await session.refresh(session_obj)
 
-    return SessionCompleteResponse(
-        session=RewardSummary(exp_reward=exp_reward, gold_reward=gold_reward),
-        dropped_item=dropped_item,
-        hero=hero_to_public(hero),
-        world_state=world_state_to_public(world_state),
+    return SessionBatchCompleteResponse(
+        results=outcome.results,
+        hero=hero_to_public(outcome.hero),
+        world_state=world_state_to_public(outcome.world_state),
     )
 
 
-@router.post("/session/cancel", response_model=SessionHistoryEntry)
+@router.post(
+    "/session/cancel",
+    response_model=SessionHistoryEntry,
+    dependencies=[Depends(QueryBudget(7))],
+)
 async def cancel_session(
     payload: SessionIdentifier,
-    user: CurrentUser,
-    context: TenantContext = Depends(current_tenant),
+    principal: Principal = Depends(current_principal),
     session: AsyncSession = Depends(get_async_session),
 ) -> SessionHistoryEntry:
     session_obj = await get_session_for_user(
         session,
         session_id=payload.session_id,
-        user_id=user.id,
-        tenant_id=context.tenant.id,
+        user_id=principal.user_id,
+        tenant_id=principal.tenant_id,
     )
     if not session_obj:
         raise HTTPException(
@@ -404,8 +388,20 @@ async def cancel_session(
             status_code=status.HTTP_409_CONFLICT,
             detail="Session already finalized.",
         )
+    # The event needs the hero lock, like every other writer of the outbox.
+    await initialize_progression(
+        session, user_id=principal.user_id, tenant_id=principal.tenant_id, lock=True
+    )
     session_obj.status = SessionStatus.CANCEL
     session_obj.ended_at = datetime.now(UTC)
+    record_event(
+        session,
+        GameEventType.SESSION_CANCEL,
+        tenant_id=principal.tenant_id,
+        user_id=principal.user_id,
+        payload=session_cancel_payload(session_obj),
+    )
+    await record_finished_sessions(session, [session_obj])
     await session.commit()
     await session.refresh(session_obj)
     return SessionHistoryEntry(
@@ -420,70 +416,89 @@ async def cancel_session(
     )
 
 
-@router.get("/sessions/history", response_model=SessionHistoryResponse)
+@router.get(
+    "/sessions/history",
+    response_model=SessionHistoryResponse,
+    dependencies=[Depends(shed_when_saturated), Depends(QueryBudget(2))],
+)
 async def get_session_history(
-    user: CurrentUser,
-    context: TenantContext = Depends(current_tenant),
-    session: AsyncSession = Depends(get_async_session),
+    principal: Principal = Depends(current_principal),
+    session: AsyncSession = Depends(get_read_session),
     limit: int = Query(default=20, ge=1, le=50),
     cursor: str | None = Query(default=None),
-) -> SessionHistoryResponse:
-    statement = (
-        select(Session)
-        .where(
-            Session.user_id == user.id,
-            Session.tenant_id == context.tenant.id,
+) -> SessionHistoryResponse | Response:
+    page = await paginate(
+        session,
+        select(Session).where(
+            Session.user_id == principal.user_id,
+            Session.tenant_id == principal.tenant_id,
+        ),
+        sort_column=Session.started_at,
+        id_column=Session.id,
+        codec=history_cursors,
+        cursor=cursor,
+        limit=limit,
+    )
+
+    return render(
+        SessionHistoryResponse.model_construct(
+            items=[
+                SessionHistoryEntry.model_construct(
+                    id=item.id,
+                    status=item.status,
+                    duration_minutes=item.duration_minutes,
+                    room=item.room,
+                    started_at=item.started_at,
+                    ended_at=item.ended_at,
+                    reward_exp=item.reward_exp,
+                    reward_gold=item.reward_gold,
+                )
+                for item in page.items
+            ],
+            next_cursor=page.next_cursor,
+            prev_cursor=page.prev_cursor,
         )
-        .order_by(Session.started_at.desc())
     )
-    if cursor:
-        cursor_dt = decode_cursor(cursor)
-        statement = statement.where(Session.started_at < cursor_dt)
-    statement = statement.limit(limit + 1)
 
-    result = await session.execute(statement)
-    sessions_list = list(result.scalars().all())
-    next_cursor = None
-    if len(sessions_list) > limit:
-        next_cursor = encode_cursor(sessions_list[limit - 1].started_at)
-        sessions_list = sessions_list[:limit]
-
-    return SessionHistoryResponse(
-        items=[
-            SessionHistoryEntry(
-                id=item.id,
-                status=item.status,
-                duration_minutes=item.duration_minutes,
-                room=item.room,
-                started_at=item.started_at,
-                ended_at=item.ended_at,
-                reward_exp=item.reward_exp,
-                reward_gold=item.reward_gold,
-            )
-            for item in sessions_list
-        ],
-        next_cursor=next_cursor,
-    )
-
-
-@router.get("/inventory", response_model=InventoryResponse)
+
+@router.get(
+    "/inventory",
+    response_model=InventoryResponse,
+    dependencies=[Depends(QueryBudget(3))],
+)
 async def get_inventory(
-    user: CurrentUser,
-    context: TenantContext = Depends(current_tenant),
+    response: Response,
+    principal: Principal = Depends(current_principal),
     session: AsyncSession = Depends(get_async_session),
-) -> InventoryResponse:
-    hero, _ = await initialize_progression(
+    if_none_match: str | None = Header(default=None),
+) -> InventoryResponse | Response:
+    catalog = await item_catalog_cache.get(session)
+    if if_none_match:
+        versions = await load_progression_versions(
+            session, user_id=principal.user_id, tenant_id=principal.tenant_id
+        )
+        if versions is not None:
+            etag = inventory_etag(versions, catalog.version)
+            if not_modified(if_none_match, etag):
+                return not_modified_response(etag)
+
+    hero, world_state = await initialize_progression(
         session,
-        user_id=user.id,
-        tenant_id=context.tenant.id,
+        user_id=principal.user_id,
+        tenant_id=principal.tenant_id,
     )
     rows = await get_inventory_items(
         session,
-        user_id=user.id,
-        tenant_id=context.tenant.id,
+        user_id=principal.user_id,
+        tenant_id=principal.tenant_id,
+    )
+    await session.commit()
+    set_etag(
+        response,
+        inventory_etag(ProgressionVersions.of(hero, world_state), catalog.version),
     )
     items = [
-        InventoryItemPublic(
+        InventoryItemPublic.model_construct(
             id=item.id,
             name=item.name,
             type=item.type,
@@ -493,13 +508,16 @@ async def get_inventory(
         )
         for inventory, item in rows
     ]
-    return InventoryResponse(
-        items=items,
-        equipped=HeroEquipped(
-            hat_id=hero.equipped_hat_id,
-            outfit_id=hero.equipped_outfit_id,
-            accessory_id=hero.equipped_accessory_id,
+    return render(
+        InventoryResponse.model_construct(
+            items=items,
+            equipped=HeroEquipped.model_construct(
+                hat_id=hero.equipped_hat_id,
+                outfit_id=hero.equipped_outfit_id,
+                accessory_id=hero.equipped_accessory_id,
+            ),
         ),
+        response,
     )
 
 
@@ -511,24 +529,27 @@ def map_item_to_slot(item_type: ItemType) -> str:
     return "equipped_accessory_id"
 
 
-@router.post("/inventory/equip", response_model=HeroPublic)
+@router.post(
+    "/inventory/equip",
+    response_model=HeroPublic,
+    dependencies=[Depends(QueryBudget(5))],
+)
 async def equip_item(
     payload: EquipItemRequest,
-    user: CurrentUser,
-    context: TenantContext = Depends(current_tenant),
+    principal: Principal = Depends(current_principal),
     session: AsyncSession = Depends(get_async_session),
 ) -> HeroPublic:
     hero, _ = await initialize_progression(
         session,
-        user_id=user.id,
-        tenant_id=context.tenant.id,
+        user_id=principal.user_id,
+        tenant_id=principal.tenant_id,
     )
     statement = (
         select(Item)
         .join(Inventory, Inventory.item_id == Item.id)
         .where(
-            Inventory.user_id == user.id,
-            Inventory.tenant_id == context.tenant.id,
+            Inventory.user_id == principal.user_id,
+            Inventory.tenant_id == principal.tenant_id,
             Item.id == payload.item_id,
         )
     )
@@ -546,21 +567,155 @@ async def equip_item(
     return hero_to_public(hero)
 
 
-@router.get("/worldstate", response_model=WorldStateResponse)
+@router.get(
+    "/leaderboard",
+    response_model=LeaderboardResponse,
+    dependencies=[Depends(shed_when_saturated), Depends(QueryBudget(3))],
+)
+async def get_leaderboard(
+    principal: Principal = Depends(current_principal),
+    session: AsyncSession = Depends(get_read_session),
+    period: LeaderboardPeriod = Query(default=LeaderboardPeriod.WEEKLY),
+    limit: int = Query(default=10, ge=1, le=100),
+) -> LeaderboardResponse | Response:
+    start = period_start(period, datetime.now(UTC).date())
+    top = await get_top_scores(
+        session,
+        tenant_id=principal.tenant_id,
+        period=period,
+        start=start,
+        limit=limit,
+    )
+    me = next((entry for entry in top if entry.user_id == principal.user_id), None)
+    if me is None:
+        me = await get_player_rank(
+            session,
+            tenant_id=principal.tenant_id,
+            user_id=principal.user_id,
+            period=period,
+            start=start,
+        )
+    return render(
+        LeaderboardResponse.model_construct(
+            period=period,
+            period_start=start,
+            entries=[
+                LeaderboardEntry.model_construct(**asdict(entry)) for entry in top
+            ],
+            me=LeaderboardEntry.model_construct(**asdict(me)) if me else None,
+        )
+    )
+
+
+@router.get(
+    "/worldstate",
+    response_model=WorldStateResponse,
+    dependencies=[Depends(QueryBudget(3))],
+)
 async def get_world_state_endpoint(
-    user: CurrentUser,
-    context: TenantContext = Depends(current_tenant),
+    response: Response,
+    principal: Principal = Depends(current_principal),
     session: AsyncSession = Depends(get_async_session),
-) -> WorldStateResponse:
-    _, world_state = await initialize_progression(
+    if_none_match: str | None = Header(default=None),
+) -> WorldStateResponse | Response:
+    if if_none_match:
+        versions = await load_progression_versions(
+            session, user_id=principal.user_id, tenant_id=principal.tenant_id
+        )
+        if versions is not None:
+            etag = world_state_etag(versions)
+            if not_modified(if_none_match, etag):
+                return not_modified_response(etag)
+
+    hero, world_state = await initialize_progression(
         session,
-        user_id=user.id,
-        tenant_id=context.tenant.id,
+        user_id=principal.user_id,
+        tenant_id=principal.tenant_id,
     )
+    await session.commit()
+    set_etag(response, world_state_etag(ProgressionVersions.of(hero, world_state)))
     return WorldStateResponse(
         world_state=world_state_to_public(world_state),
         milestones=milestone_summary(world_state),
     )
 
 
+def serialize_stats(stats: list[DayStats]) -> list[FocusStatsBucket]:
+    return [FocusStatsBucket.model_construct(**asdict(bucket)) for bucket in stats]
+
+
+@router.get(
+    "/stats/heatmap",
+    response_model=FocusHeatmapResponse,
+    dependencies=[Depends(shed_when_saturated), Depends(QueryBudget(2))],
+)
+async def get_focus_heatmap(
+    principal: Principal = Depends(current_principal),
+    session: AsyncSession = Depends(get_read_session),
+    days: int = Query(default=365, ge=1, le=366),
+) -> FocusHeatmapResponse | Response:
+    end = datetime.now(UTC).date()
+    start = end - timedelta(days=days - 1)
+    stats = await get_daily_stats(
+        session,
+        tenant_id=principal.tenant_id,
+        user_id=principal.user_id,
+        start=start,
+        end=end,
+    )
+    return render(
+        FocusHeatmapResponse.model_construct(
+            start=start, end=end, days=serialize_stats(stats)
+        )
+    )
+
+
+async def weekly_response(
+    session: AsyncSession, *, tenant_id: UUID, user_id: UUID | None, weeks: int
+) -> FocusWeeklyResponse | Response:
+    end = datetime.now(UTC).date()
+    start = week_start(end) - timedelta(weeks=weeks - 1)
+    stats = await get_weekly_stats(
+        session, tenant_id=tenant_id, user_id=user_id, start=start, end=end
+    )
+    return render(
+        FocusWeeklyResponse.model_construct(
+            start=start, end=end, weeks=serialize_stats(stats)
+        )
+    )
+
+
+@router.get(
+    "/stats/weekly",
+    response_model=FocusWeeklyResponse,
+    dependencies=[Depends(shed_when_saturated), Depends(QueryBudget(2))],
+)
+async def get_focus_weekly(
+    principal: Principal = Depends(current_principal),
+    session: AsyncSession = Depends(get_read_session),
+    weeks: int = Query(default=12, ge=1, le=53),
+) -> FocusWeeklyResponse | Response:
+    return await weekly_response(
+        session,
+        tenant_id=principal.tenant_id,
+        user_id=principal.user_id,
+        weeks=weeks,
+    )
+
+
+@router.get(
+    "/stats/organization/weekly",
+    response_model=FocusWeeklyResponse,
+    dependencies=[Depends(shed_when_saturated), Depends(QueryBudget(2))],
+)
+async def get_organization_focus_weekly(
+    principal: Principal = Depends(require_role(UserTenantRole.ADMIN)),
+    session: AsyncSession = Depends(get_read_session),
+    weeks: int = Query(default=12, ge=1, le=53),
+) -> FocusWeeklyResponse | Response:
+    return await weekly_response(
+        session, tenant_id=principal.tenant_id, user_id=None, weeks=weeks
+    )
+
+
 __all__ = ["router"]
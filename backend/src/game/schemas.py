@@ -5,9 +5,14 @@ from uuid import UUID
 
 from pydantic import Field, conint
 
-from src.auth.models import UserTenantRole
-from src.auth.schemas import UserPublic
-from src.game.enums import ItemRarity, ItemType, Room, SessionStatus, TaskCategory
+from src.game.enums import (
+    ItemRarity,
+    ItemType,
+    LeaderboardPeriod,
+    Room,
+    SessionStatus,
+    TaskCategory,
+)
 from src.schemas import CustomModel
 
 
@@ -37,23 +42,6 @@ class WorldStatePublic(CustomModel):
     last_session_date: date | None = None
 
 
-class ActiveOrganizationResponse(CustomModel):
-    id: UUID
-    name: str
-    slug: str
-    business_image: str | None = None
-    created_at: datetime
-    role: UserTenantRole
-    is_default: bool
-
-
-class ProfileResponse(CustomModel):
-    user: UserPublic
-    hero: HeroPublic
-    world_state: WorldStatePublic
-    organization: ActiveOrganizationResponse
-
-
 class TaskTemplateCreate(CustomModel):
     name: str = Field(..., min_length=1, max_length=255)
     category: TaskCategory = TaskCategory.STUDY
@@ -81,6 +69,7 @@ class TaskTemplatePublic(CustomModel):
 class PaginatedTasks(CustomModel):
     items: list[TaskTemplatePublic]
     next_cursor: str | None = None
+    prev_cursor: str | None = None
 
 
 class SessionStartRequest(CustomModel):
@@ -120,6 +109,24 @@ class SessionCompleteResponse(CustomModel):
     world_state: WorldStatePublic
 
 
+class SessionBatchCompleteRequest(CustomModel):
+    session_ids: list[UUID] = Field(min_length=1, max_length=100)
+
+
+class SessionBatchResult(CustomModel):
+    session_id: UUID
+    status_code: int
+    detail: str | None = None
+    session: RewardSummary | None = None
+    dropped_item: DroppedItem | None = None
+
+
+class SessionBatchCompleteResponse(CustomModel):
+    results: list[SessionBatchResult]
+    hero: HeroPublic
+    world_state: WorldStatePublic
+
+
 class SessionHistoryEntry(CustomModel):
     id: UUID
     status: SessionStatus
@@ -134,6 +141,7 @@ class SessionHistoryEntry(CustomModel):
 class SessionHistoryResponse(CustomModel):
     items: list[SessionHistoryEntry]
     next_cursor: str | None = None
+    prev_cursor: str | None = None
 
 
 class InventoryItemPublic(CustomModel):
@@ -155,21 +163,67 @@ class WorldStateResponse(CustomModel):
     milestones: dict[str, int]
 
 
+class LeaderboardEntry(CustomModel):
+    rank: int
+    user_id: UUID
+    score: int
+    full_name: str | None = None
+    profile_picture: str | None = None
+    # False past the first RANK_EXACT_LIMIT players: show ``rank`` as "1000+".
+    rank_exact: bool = True
+
+
+class LeaderboardResponse(CustomModel):
+    period: LeaderboardPeriod
+    period_start: date
+    entries: list[LeaderboardEntry]
+    me: LeaderboardEntry | None = None
+
+
 class EquipItemRequest(CustomModel):
     item_id: UUID
 
 
+class FocusStatsBucket(CustomModel):
+    day: date
+    sessions_success: int
+    sessions_cancel: int
+    sessions_timeout: int
+    minutes_focused: int
+    reward_exp: int
+    reward_gold: int
+    minutes_by_room: dict[Room, int]
+
+
+class FocusHeatmapResponse(CustomModel):
+    start: date
+    end: date
+    days: list[FocusStatsBucket]
+
+
+class FocusWeeklyResponse(CustomModel):
+    start: date
+    end: date
+    weeks: list[FocusStatsBucket]
+
+
 __all__ = [
-    "ActiveOrganizationResponse",
     "DroppedItem",
     "EquipItemRequest",
+    "FocusHeatmapResponse",
+    "FocusStatsBucket",
+    "FocusWeeklyResponse",
     "HeroEquipped",
     "HeroPublic",
     "InventoryItemPublic",
     "InventoryResponse",
+    "LeaderboardEntry",
+    "LeaderboardResponse",
     "PaginatedTasks",
-    "ProfileResponse",
     "RewardSummary",
+    "SessionBatchCompleteRequest",
+    "SessionBatchCompleteResponse",
+    "SessionBatchResult",
     "SessionCompleteResponse",
     "SessionHistoryEntry",
     "SessionHistoryResponse",
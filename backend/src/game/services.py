@@ -1,15 +1,17 @@
 from __future__ import annotations
 
-import random
 from collections.abc import Sequence
-from datetime import date, timedelta
-from typing import Iterable
-from uuid import UUID
+from datetime import UTC, date, datetime, timedelta
+from uuid import UUID, uuid4
 
-from sqlalchemy import Select, and_, select
+from fastapi import HTTPException, status
+from sqlalchemy import Executable, Select, Table, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.game.enums import ItemRarity, ItemType
+from src.game.catalog import CatalogItem, item_catalog_cache
+from src.game.drops import OwnedItems
+from src.game.enums import GameEventType, ItemType, Room
+from src.game.levels import LEVEL_CURVE
 from src.game.models import (
     CosmeticDropLog,
     Hero,
@@ -19,6 +21,7 @@ from src.game.models import (
     TaskTemplate,
     WorldState,
 )
+from src.game.outbox import drop_awarded_payload, record_event
 from src.game.schemas import (
     DroppedItem,
     HeroEquipped,
@@ -27,12 +30,11 @@ from src.game.schemas import (
 )
 
 ALLOWED_DURATIONS = {25, 50, 90}
+EXP_PER_MINUTE = 2
+GOLD_PER_MINUTE = 1
+COMPLETION_WINDOW_RATIO = 0.8
+SESSION_TIMEOUT_GRACE_MINUTES = 15
 DROP_CHANCE = 0.10
-RARITY_WEIGHTS: dict[ItemRarity, float] = {
-    ItemRarity.COMMON: 0.75,
-    ItemRarity.RARE: 0.2,
-    ItemRarity.EPIC: 0.05,
-}
 ROOM_THRESHOLDS = {
     "study_room_level_2": 5,
     "build_room_level_2": 15,
@@ -41,12 +43,12 @@ ROOM_THRESHOLDS = {
 
 
 def exp_to_next_level(level: int) -> int:
-    return max(level, 1) * 100
+    return LEVEL_CURVE.exp_to_next(level)
 
 
 def compute_rewards(duration_minutes: int) -> tuple[int, int]:
-    exp_reward = duration_minutes * 2
-    gold_reward = duration_minutes * 1
+    exp_reward = duration_minutes * EXP_PER_MINUTE
+    gold_reward = duration_minutes * GOLD_PER_MINUTE
     return exp_reward, gold_reward
 
 
@@ -82,30 +84,92 @@ def milestone_summary(world_state: WorldState) -> dict[str, int]:
     return {name: threshold for name, threshold in ROOM_THRESHOLDS.items()}
 
 
+def _get_or_create_sql(table: Table, constraint: str, *, lock: bool) -> str:
+    """CTE returning the caller's row of ``table``, inserting it if missing.
+
+    The insert only runs when the row is not visible yet. If a concurrent
+    request creates it first, ``DO UPDATE`` waits for that transaction and
+    returns the committed row instead of failing on the constraint.
+    """
+    columns = ", ".join(column.name for column in table.c)
+    defaults = {
+        column.name: column.default.arg
+        for column in table.c
+        if column.default is not None and column.default.is_scalar
+    }
+    insert_columns = ", ".join(["id", "tenant_id", "user_id", *defaults])
+    insert_values = ", ".join(
+        [f":{table.name}_id", ":tenant_id", ":user_id", *map(str, defaults.values())]
+    )
+    return f"""
+    {table.name}_found AS (
+        SELECT {columns}
+        FROM {table.name}
+        WHERE tenant_id = :tenant_id AND user_id = :user_id
+        {"FOR UPDATE" if lock else ""}
+    ),
+    {table.name}_created AS (
+        INSERT INTO {table.name} AS t ({insert_columns})
+        SELECT {insert_values}
+        WHERE NOT EXISTS (SELECT 1 FROM {table.name}_found)
+        ON CONFLICT ON CONSTRAINT {constraint} DO UPDATE
+        SET tenant_id = t.tenant_id
+        RETURNING {", ".join(f"t.{column.name}" for column in table.c)}
+    )"""
+
+
+def _progression_statement(*, lock: bool) -> Executable:
+    hero_table = Hero.__table__
+    world_table = WorldState.__table__
+    sql = f"""
+    WITH
+    {_get_or_create_sql(hero_table, "uq_hero_tenant_user", lock=lock)},
+    {_get_or_create_sql(world_table, "uq_world_state_tenant_user", lock=lock)}
+    SELECT h.*, w.*
+    FROM (
+        SELECT * FROM heroes_found UNION ALL SELECT * FROM heroes_created
+    ) AS h
+    CROSS JOIN (
+        SELECT * FROM world_states_found
+        UNION ALL SELECT * FROM world_states_created
+    ) AS w
+    """
+    # Columns are matched by position: both tables share id, user_id, ...
+    textual = text(sql).columns(*hero_table.c, *world_table.c)
+    return (
+        select(Hero, WorldState)
+        .from_statement(textual)
+        .execution_options(populate_existing=lock)
+    )
+
+
+# Plain SQL built once: see the note on cacheability in src.game.completion.
+progression_statement = _progression_statement(lock=False)
+locked_progression_statement = _progression_statement(lock=True)
+
+
 async def initialize_progression(
     session: AsyncSession,
     *,
     user_id: UUID,
     tenant_id: UUID,
+    lock: bool = False,
 ) -> tuple[Hero, WorldState]:
-    hero = await get_hero(session, user_id=user_id, tenant_id=tenant_id)
-    if not hero:
-        hero = Hero(user_id=user_id, tenant_id=tenant_id)
-        session.add(hero)
-        await session.commit()
-        await session.refresh(hero)
-
-    world_state = await get_world_state(
-        session,
-        user_id=user_id,
-        tenant_id=tenant_id,
+    """Fetch the hero and world state, creating them on first access.
+
+    One statement, no commit: new rows become durable with the caller's
+    transaction. ``lock`` also takes row locks on both for the rest of it.
+    """
+    result = await session.execute(
+        locked_progression_statement if lock else progression_statement,
+        {
+            "user_id": user_id,
+            "tenant_id": tenant_id,
+            "heroes_id": uuid4(),
+            "world_states_id": uuid4(),
+        },
     )
-    if not world_state:
-        world_state = WorldState(user_id=user_id, tenant_id=tenant_id)
-        session.add(world_state)
-        await session.commit()
-        await session.refresh(world_state)
-
+    hero, world_state = result.one()
     return hero, world_state
 
 
@@ -153,22 +217,36 @@ async def get_task_template(
     return result.scalars().first()
 
 
+def validate_completion_window(session_obj: Session) -> None:
+    elapsed = datetime.now(UTC) - session_obj.started_at
+    required_minutes = session_obj.duration_minutes * COMPLETION_WINDOW_RATIO
+    if elapsed.total_seconds() < required_minutes * 60:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Session cannot be completed yet.",
+        )
+
+
 def apply_rewards(hero: Hero, exp_reward: int, gold_reward: int) -> None:
-    hero.exp += exp_reward
+    hero.level, hero.exp = LEVEL_CURVE.add_exp(hero.level, hero.exp, exp_reward)
     hero.gold += gold_reward
-    while hero.exp >= exp_to_next_level(hero.level):
-        hero.exp -= exp_to_next_level(hero.level)
-        hero.level += 1
 
 
 def update_world_state_on_success(
     world_state: WorldState,
+    day: date | None = None,
 ) -> None:
+    """Count a successful session that finished on ``day`` (UTC, default today).
+
+    A day before ``last_session_date``, such as an older session replayed
+    after a newer one completed, is counted but leaves the streak alone.
+    """
     world_state.total_sessions_success += 1
-    today = date.today()
+    if day is None:
+        day = datetime.now(UTC).date()
     if world_state.last_session_date:
-        delta = today - world_state.last_session_date
-        if delta == timedelta(days=0):
+        delta = day - world_state.last_session_date
+        if delta <= timedelta(days=0):
             pass
         elif delta == timedelta(days=1):
             world_state.day_streak += 1
@@ -176,7 +254,7 @@ def update_world_state_on_success(
             world_state.day_streak = 1
     else:
         world_state.day_streak = 1
-    world_state.last_session_date = today
+    world_state.last_session_date = max(day, world_state.last_session_date or day)
 
     if world_state.total_sessions_success >= ROOM_THRESHOLDS["plaza_level_2"]:
         world_state.plaza_level = 2
@@ -186,50 +264,27 @@ def update_world_state_on_success(
         world_state.study_room_level = 2
 
 
-async def maybe_roll_cosmetic_drop(
+def grant_cosmetic_item(
     session: AsyncSession,
     *,
     user_id: UUID,
     tenant_id: UUID,
     hero: Hero,
     session_obj: Session,
-) -> DroppedItem | None:
-    if random.random() >= DROP_CHANCE:
-        return None
-
-    stmt = (
-        select(Item)
-        .outerjoin(
-            Inventory,
-            and_(
-                Inventory.item_id == Item.id,
-                Inventory.user_id == user_id,
-                Inventory.tenant_id == tenant_id,
-            ),
-        )
-        .where(Inventory.id.is_(None))
-        .where(Item.unlock_level <= hero.level)
-    )
-    stmt = stmt.where(
-        (Item.room_affinity.is_(None)) | (Item.room_affinity == session_obj.room)
-    )
-    result = await session.execute(stmt)
-    available_items: list[Item] = list(result.scalars().all())
-    if not available_items:
-        return None
-
-    chosen_rarity = choose_weighted_rarity(item.rarity for item in available_items)
-    candidates = [item for item in available_items if item.rarity == chosen_rarity]
-    if not candidates:
-        candidates = available_items
-    item = random.choice(candidates)
+    item: CatalogItem,
+) -> DroppedItem:
+    """Add ``item`` to the inventory and queue its ``drop_awarded`` event.
 
+    ``hero`` must be locked (``initialize_progression(lock=True)``); see
+    ``record_event``.
+    """
     inventory_entry = Inventory(
         tenant_id=tenant_id,
         user_id=user_id,
         item_id=item.id,
     )
     session.add(inventory_entry)
+    hero.inventory_version += 1
     session.add(
         CosmeticDropLog(
             tenant_id=tenant_id,
@@ -238,6 +293,13 @@ async def maybe_roll_cosmetic_drop(
         )
     )
     session_obj.drop_item_id = item.id
+    record_event(
+        session,
+        GameEventType.DROP_AWARDED,
+        tenant_id=tenant_id,
+        user_id=user_id,
+        payload=drop_awarded_payload(session_obj.id, item),
+    )
 
     if item.type == ItemType.HAT and not hero.equipped_hat_id:
         hero.equipped_hat_id = item.id
@@ -246,6 +308,38 @@ async def maybe_roll_cosmetic_drop(
     elif item.type == ItemType.ACCESSORY and not hero.equipped_accessory_id:
         hero.equipped_accessory_id = item.id
 
+    return item_to_dropped(item)
+
+
+async def get_owned_item_ids(
+    session: AsyncSession,
+    *,
+    user_id: UUID,
+    tenant_id: UUID,
+) -> OwnedItems:
+    result = await session.execute(
+        select(Inventory.item_id).where(
+            Inventory.user_id == user_id,
+            Inventory.tenant_id == tenant_id,
+        )
+    )
+    return OwnedItems(result.scalars())
+
+
+async def choose_cosmetic_drop(
+    session: AsyncSession,
+    *,
+    user_id: UUID,
+    tenant_id: UUID,
+    hero_level: int,
+    room: Room,
+) -> CatalogItem | None:
+    catalog = await item_catalog_cache.get(session)
+    owned = await get_owned_item_ids(session, user_id=user_id, tenant_id=tenant_id)
+    return catalog.drop_table(room=room, hero_level=hero_level).sample(owned)
+
+
+def item_to_dropped(item: CatalogItem) -> DroppedItem:
     return DroppedItem(
         id=item.id,
         name=item.name,
@@ -255,21 +349,6 @@ async def maybe_roll_cosmetic_drop(
     )
 
 
-def choose_weighted_rarity(candidates: Iterable[ItemRarity]) -> ItemRarity:
-    unique_rarities = {rarity for rarity in candidates}
-    weights = [(rarity, RARITY_WEIGHTS.get(rarity, 0.0)) for rarity in unique_rarities]
-    total_weight = sum(weight for _, weight in weights)
-    if total_weight == 0:
-        return ItemRarity.COMMON
-    pick = random.random() * total_weight
-    cumulative = 0.0
-    for rarity, weight in weights:
-        cumulative += weight
-        if pick <= cumulative:
-            return rarity
-    return ItemRarity.COMMON
-
-
 async def get_inventory_items(
     session: AsyncSession,
     *,
@@ -292,19 +371,28 @@ async def get_inventory_items(
 
 __all__ = [
     "ALLOWED_DURATIONS",
+    "COMPLETION_WINDOW_RATIO",
+    "DROP_CHANCE",
+    "EXP_PER_MINUTE",
+    "GOLD_PER_MINUTE",
+    "SESSION_TIMEOUT_GRACE_MINUTES",
     "apply_rewards",
     "HeroPublic",
     "HeroEquipped",
     "compute_rewards",
     "exp_to_next_level",
+    "choose_cosmetic_drop",
     "get_hero",
     "get_inventory_items",
+    "get_owned_item_ids",
     "get_task_template",
     "get_world_state",
+    "grant_cosmetic_item",
     "hero_to_public",
     "initialize_progression",
-    "maybe_roll_cosmetic_drop",
+    "item_to_dropped",
     "milestone_summary",
     "update_world_state_on_success",
+    "validate_completion_window",
     "world_state_to_public",
 ]
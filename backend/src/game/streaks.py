@@ -0,0 +1,327 @@
+"""Daily reset of broken day streaks.
+
+``update_world_state_on_success`` only fixes a streak when the player
+completes the next session, so ``/worldstate`` keeps showing a stale streak
+to anyone who skipped a day. This job zeroes every streak whose last session
+is older than yesterday and stamps ``last_reset_at``.
+
+Rows are reset set-wise in chunks. World states are spread over
+``SHARD_BUCKETS`` buckets by a hash of their tenant, and each bucket is
+walked in ``(last_session_date, id)`` order through the partial index on
+``(bucket, last_session_date, id)``, so a chunk is one index range scan.
+The position after each chunk is a watermark: it is logged and can be handed
+back through ``--resume-from``. Disjoint ``--shard K/N`` runs take every
+N-th bucket, so several processes can run in parallel.
+
+Chunks skip rows another transaction holds locked, usually a player
+completing a session at that moment, and the walk moves past them. Once
+every bucket is done the job counts what is still broken and walks again
+from the start, up to ``RECHECK_PASSES`` times; rows already reset have left
+the index, so those passes only visit the leftovers. Rows still locked after
+that are logged and left to the next run.
+
+``--dry-run`` walks the same chunks without writing and reports the rows
+each one would touch and how long it took::
+
+    python -m src.game.streaks [--dry-run] [--shard 0/4] [--chunk-size 5000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import UTC, date, datetime, timedelta
+from functools import partial
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.database import engine
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 5000
+# Fixed, as it is part of the index expression; --shard N can be up to this.
+SHARD_BUCKETS = 64
+RECHECK_PASSES = 3
+RECHECK_DELAY_SECONDS = 1.0
+
+# Must match the expression of ix_world_states_live_streak_shard.
+BUCKET_SQL = f"(hashtext(tenant_id::text) & 2147483647) % {SHARD_BUCKETS}"
+
+_BROKEN_SQL = """
+day_streak > 0
+  AND last_session_date < CAST(:cutoff AS date)
+"""
+
+_CHUNK_SQL = f"""
+SELECT id, last_session_date
+FROM world_states
+WHERE {_BROKEN_SQL}
+  AND {BUCKET_SQL} = CAST(:bucket AS int)
+  AND (last_session_date, id)
+      > (CAST(:after_date AS date), CAST(:after_id AS uuid))
+ORDER BY last_session_date, id
+LIMIT :chunk_size
+"""
+
+RESET_CHUNK_SQL = f"""
+WITH chunk AS (
+    {_CHUNK_SQL}
+    FOR UPDATE SKIP LOCKED
+),
+reset AS (
+    UPDATE world_states AS w
+    SET day_streak = 0,
+        last_reset_at = CAST(:now AS timestamptz),
+        updated_at = now()
+    FROM chunk
+    WHERE w.id = chunk.id
+    RETURNING w.id
+)
+SELECT (SELECT count(*) FROM reset) AS touched, last_session_date, id
+FROM chunk
+ORDER BY last_session_date DESC, id DESC
+LIMIT 1
+"""
+
+COUNT_CHUNK_SQL = f"""
+WITH chunk AS (
+    {_CHUNK_SQL}
+)
+SELECT (SELECT count(*) FROM chunk) AS touched, last_session_date, id
+FROM chunk
+ORDER BY last_session_date DESC, id DESC
+LIMIT 1
+"""
+
+COUNT_BROKEN_SQL = f"""
+SELECT count(*)
+FROM world_states
+WHERE {_BROKEN_SQL}
+  AND {BUCKET_SQL} = ANY(CAST(:buckets AS int[]))
+"""
+
+reset_chunk_statement = text(RESET_CHUNK_SQL)
+count_chunk_statement = text(COUNT_CHUNK_SQL)
+count_broken_statement = text(COUNT_BROKEN_SQL)
+
+
+@dataclass(frozen=True)
+class Watermark:
+    bucket: int
+    last_session_date: date
+    id: UUID
+
+    @classmethod
+    def start(cls, bucket: int = 0) -> Watermark:
+        return cls(bucket=bucket, last_session_date=date.min, id=UUID(int=0))
+
+    @classmethod
+    def parse(cls, value: str) -> Watermark:
+        bucket, day, identifier = value.split("/")
+        return cls(
+            bucket=int(bucket),
+            last_session_date=date.fromisoformat(day),
+            id=UUID(identifier),
+        )
+
+    def __str__(self) -> str:
+        return f"{self.bucket}/{self.last_session_date.isoformat()}/{self.id}"
+
+
+def shard_buckets(shard: int, shard_count: int) -> list[int]:
+    return list(range(shard, SHARD_BUCKETS, shard_count))
+
+
+@dataclass
+class ChunkReport:
+    touched: int
+    elapsed_ms: float
+    watermark: Watermark
+
+
+async def reset_chunk(
+    db_engine: AsyncEngine = engine,
+    *,
+    after: Watermark,
+    cutoff: date,
+    chunk_size: int,
+    dry_run: bool = False,
+) -> ChunkReport | None:
+    """Reset (or count) one chunk of ``after.bucket`` past ``after``.
+
+    ``None`` once none are left in the bucket.
+    """
+    statement = count_chunk_statement if dry_run else reset_chunk_statement
+    started = time.perf_counter()
+    async with db_engine.begin() as connection:
+        result = await connection.execute(
+            statement,
+            {
+                "bucket": after.bucket,
+                "after_date": after.last_session_date,
+                "after_id": after.id,
+                "cutoff": cutoff,
+                "chunk_size": chunk_size,
+                "now": datetime.now(UTC),
+            },
+        )
+        row = result.first()
+    if row is None:
+        return None
+    return ChunkReport(
+        touched=row.touched,
+        elapsed_ms=(time.perf_counter() - started) * 1000,
+        watermark=Watermark(
+            bucket=after.bucket, last_session_date=row.last_session_date, id=row.id
+        ),
+    )
+
+
+async def count_broken_streaks(
+    db_engine: AsyncEngine = engine, *, cutoff: date, buckets: list[int]
+) -> int:
+    async with db_engine.connect() as connection:
+        result = await connection.execute(
+            count_broken_statement, {"cutoff": cutoff, "buckets": buckets}
+        )
+        return result.scalar_one()
+
+
+async def _walk(
+    db_engine: AsyncEngine,
+    *,
+    after: Watermark,
+    buckets: list[int],
+    cutoff: date,
+    chunk_size: int,
+    dry_run: bool,
+) -> int:
+    total = 0
+    for bucket in buckets:
+        if bucket < after.bucket:
+            continue
+        if bucket > after.bucket:
+            after = Watermark.start(bucket)
+        while True:
+            report = await reset_chunk(
+                db_engine,
+                after=after,
+                cutoff=cutoff,
+                chunk_size=chunk_size,
+                dry_run=dry_run,
+            )
+            if report is None:
+                break
+            total += report.touched
+            after = report.watermark
+            logger.info(
+                "%s %s streaks in %.1fms, watermark %s",
+                "Would reset" if dry_run else "Reset",
+                report.touched,
+                report.elapsed_ms,
+                after,
+            )
+    return total
+
+
+async def reset_broken_streaks(
+    db_engine: AsyncEngine = engine,
+    *,
+    today: date | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    shard: int = 0,
+    shard_count: int = 1,
+    resume_from: Watermark | None = None,
+    dry_run: bool = False,
+) -> int:
+    """Walk every broken streak in chunks; returns the rows touched."""
+    # Matches update_world_state_on_success: a session yesterday keeps it.
+    cutoff = (today or datetime.now(UTC).date()) - timedelta(days=1)
+    buckets = shard_buckets(shard, shard_count)
+    walk = partial(
+        _walk,
+        db_engine,
+        buckets=buckets,
+        cutoff=cutoff,
+        chunk_size=chunk_size,
+        dry_run=dry_run,
+    )
+    total = await walk(after=resume_from or Watermark.start(buckets[0]))
+    if dry_run:
+        return total
+
+    # Rows skipped while locked are behind the watermark now.
+    for _ in range(RECHECK_PASSES):
+        left = await count_broken_streaks(db_engine, cutoff=cutoff, buckets=buckets)
+        if not left:
+            return total
+        logger.info("Rechecking %s streaks skipped while locked", left)
+        await asyncio.sleep(RECHECK_DELAY_SECONDS)
+        total += await walk(after=Watermark.start(buckets[0]))
+    left = await count_broken_streaks(db_engine, cutoff=cutoff, buckets=buckets)
+    if left:
+        logger.warning("%s streaks stayed locked; the next run resets them", left)
+    return total
+
+
+def parse_shard(value: str) -> tuple[int, int]:
+    shard, _, count = value.partition("/")
+    shard_index, shard_count = int(shard), int(count)
+    if not 0 <= shard_index < shard_count <= SHARD_BUCKETS:
+        raise argparse.ArgumentTypeError(
+            f"expected K/N with 0 <= K < N <= {SHARD_BUCKETS}"
+        )
+    return shard_index, shard_count
+
+
+async def main(args: argparse.Namespace) -> None:
+    shard, shard_count = args.shard
+    try:
+        total = await reset_broken_streaks(
+            chunk_size=args.chunk_size,
+            shard=shard,
+            shard_count=shard_count,
+            resume_from=args.resume_from,
+            dry_run=args.dry_run,
+        )
+    finally:
+        await engine.dispose()
+    logger.info("%s %s streaks", "Would reset" if args.dry_run else "Reset", total)
+
+
+__all__ = [
+    "BUCKET_SQL",
+    "SHARD_BUCKETS",
+    "ChunkReport",
+    "Watermark",
+    "count_broken_streaks",
+    "reset_broken_streaks",
+    "reset_chunk",
+    "shard_buckets",
+]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reset broken day streaks.")
+    parser.add_argument("--dry-run", action="store_true", help="count, do not write")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        default=(0, 1),
+        help="process the tenant buckets K, K+N, ... (e.g. 0/4)",
+    )
+    parser.add_argument(
+        "--resume-from",
+        type=Watermark.parse,
+        default=None,
+        help="watermark logged by an earlier run (BUCKET/DATE/ID)",
+    )
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,204 @@
+"""Time out abandoned sessions.
+
+Sessions still pending or active ``SESSION_TIMEOUT_GRACE_MINUTES`` after
+their planned end become ``timeout``, so they stop counting toward the
+in-progress limit of ``POST /session/start``. Each batch claims rows with
+``FOR UPDATE SKIP LOCKED``: several sweepers (one per worker, or a separate
+process) share the work without blocking each other or a user completing a
+session at the same moment.
+
+Run in-process by setting ``SESSION_SWEEPER_IN_PROCESS``, or standalone::
+
+    python -m src.game.sweeper [--once]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import UTC, datetime
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src import metrics
+from src.config import settings
+from src.database import engine
+from src.game.enums import SessionStatus
+from src.game.focus_stats import finished_sessions_sql, stats_upsert_sql
+from src.game.services import ALLOWED_DURATIONS, SESSION_TIMEOUT_GRACE_MINUTES
+
+logger = logging.getLogger(__name__)
+
+_IN_PROGRESS_SQL = ", ".join(
+    f"'{state.value}'" for state in (SessionStatus.PENDING, SessionStatus.ACTIVE)
+)
+# Nothing can expire sooner than the shortest allowed duration plus grace.
+# Bounding started_at by it lets the partial index range-scan.
+_MIN_EXPIRY_MINUTES = min(ALLOWED_DURATIONS) + SESSION_TIMEOUT_GRACE_MINUTES
+
+SWEEP_SQL = f"""
+WITH expired AS (
+    SELECT id
+    FROM sessions
+    WHERE status IN ({_IN_PROGRESS_SQL})
+      AND started_at < CAST(:now AS timestamptz)
+          - interval '{_MIN_EXPIRY_MINUTES} minutes'
+      AND started_at
+          + make_interval(mins => duration_minutes + {SESSION_TIMEOUT_GRACE_MINUTES})
+          < CAST(:now AS timestamptz)
+    ORDER BY started_at
+    LIMIT :batch_size
+    FOR UPDATE SKIP LOCKED
+),
+timed_out AS (
+    UPDATE sessions AS s
+    SET status = '{SessionStatus.TIMEOUT.value}',
+        ended_at = CAST(:now AS timestamptz),
+        updated_at = now()
+    FROM expired
+    WHERE s.id = expired.id
+    RETURNING s.tenant_id, s.user_id, s.room, s.status, s.started_at, s.ended_at,
+        s.duration_minutes, s.reward_exp, s.reward_gold
+),
+rolled AS ({stats_upsert_sql(finished_sessions_sql("timed_out"))})
+SELECT
+    count(*) AS swept,
+    max(
+        extract(
+            epoch FROM CAST(:now AS timestamptz) - started_at
+            - make_interval(mins => duration_minutes + {SESSION_TIMEOUT_GRACE_MINUTES})
+        )
+    ) AS max_lag_seconds
+FROM timed_out
+"""
+
+sweep_statement = text(SWEEP_SQL)
+
+SWEEP_BATCH_SIZE = metrics.histogram(
+    "game_session_sweeper_batch_size",
+    "Sessions timed out per sweeper batch.",
+    buckets=(0, 1, 5, 10, 50, 100, 250, 500, 1000, 5000),
+)
+SWEEP_LAG_SECONDS = metrics.histogram(
+    "game_session_sweeper_lag_seconds",
+    "Delay between a session's timeout deadline and the sweep that closed it "
+    "(oldest session per batch).",
+    buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600),
+)
+SESSIONS_TIMED_OUT = metrics.counter(
+    "game_sessions_timed_out_total",
+    "Sessions moved to the timeout status by the sweeper.",
+)
+SWEEP_FAILURES = metrics.counter(
+    "game_session_sweeper_failures_total",
+    "Sweeper batches that raised.",
+)
+
+
+@dataclass
+class SweepResult:
+    swept: int
+    max_lag_seconds: float | None
+
+
+async def sweep_timed_out_sessions(
+    db_engine: AsyncEngine = engine,
+    *,
+    batch_size: int,
+    now: datetime | None = None,
+) -> SweepResult:
+    """Time out at most ``batch_size`` expired sessions in one transaction."""
+    async with db_engine.begin() as connection:
+        result = await connection.execute(
+            sweep_statement,
+            {"now": now or datetime.now(UTC), "batch_size": batch_size},
+        )
+        row = result.one()
+
+    sweep = SweepResult(
+        swept=row.swept,
+        max_lag_seconds=(
+            float(row.max_lag_seconds) if row.max_lag_seconds is not None else None
+        ),
+    )
+    SWEEP_BATCH_SIZE.observe(sweep.swept)
+    if sweep.swept:
+        SESSIONS_TIMED_OUT.inc(sweep.swept)
+        SWEEP_LAG_SECONDS.observe(sweep.max_lag_seconds)
+    return sweep
+
+
+async def sweep_until_drained(
+    db_engine: AsyncEngine = engine,
+    *,
+    batch_size: int,
+) -> int:
+    """Run batches back to back until one comes back short."""
+    total = 0
+    while True:
+        sweep = await sweep_timed_out_sessions(db_engine, batch_size=batch_size)
+        total += sweep.swept
+        if sweep.swept:
+            logger.info(
+                "Timed out %s sessions (max lag %.0fs)",
+                sweep.swept,
+                sweep.max_lag_seconds,
+            )
+        if sweep.swept < batch_size:
+            return total
+
+
+async def run_session_sweeper(
+    db_engine: AsyncEngine = engine,
+    *,
+    interval: float,
+    batch_size: int,
+) -> None:
+    """Sweep forever, sleeping ``interval`` seconds once the backlog is drained."""
+    while True:
+        try:
+            await sweep_until_drained(db_engine, batch_size=batch_size)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            SWEEP_FAILURES.inc()
+            logger.exception("Session sweep failed")
+        await asyncio.sleep(interval)
+
+
+async def main(once: bool) -> None:
+    try:
+        if once:
+            total = await sweep_until_drained(
+                batch_size=settings.SESSION_SWEEPER_BATCH_SIZE
+            )
+            logger.info("Timed out %s sessions", total)
+        else:
+            await run_session_sweeper(
+                interval=settings.SESSION_SWEEPER_INTERVAL_SECONDS,
+                batch_size=settings.SESSION_SWEEPER_BATCH_SIZE,
+            )
+    finally:
+        await engine.dispose()
+
+
+__all__ = [
+    "SWEEP_SQL",
+    "SweepResult",
+    "run_session_sweeper",
+    "sweep_timed_out_sessions",
+    "sweep_until_drained",
+]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time out abandoned sessions.")
+    parser.add_argument(
+        "--once", action="store_true", help="drain the backlog once and exit"
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main(args.once))
@@ -1,22 +1,71 @@
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 from typing import AsyncGenerator
 
 import sentry_sdk
 from fastapi import FastAPI
 from starlette.middleware.cors import CORSMiddleware
 
+from src.admission import install_pool_timeout_handler
 from src.auth.routers.auth import router as auth_router
 from src.auth.routers.invitations import router as invitations_router
 from src.auth.routers.tenants import router as tenants_router
+from src.auth.security.google import google_verifier
 from src.config import app_configs, settings
+from src.database import async_session_factory
+from src.db_timing import DbTimingMiddleware
+from src.game.catalog import item_catalog_cache
+from src.game.outbox import build_sink, run_outbox_relay
 from src.game.router import router as game_router
+from src.game.sweeper import run_session_sweeper
+from src.replicas import ReadYourWritesMiddleware, replica_set, run_replica_monitor
 
 
 @asynccontextmanager
 async def lifespan(_application: FastAPI) -> AsyncGenerator:
     # Startup
+    async with async_session_factory() as session:
+        await item_catalog_cache.load(session)
+    sweeper = None
+    if settings.SESSION_SWEEPER_IN_PROCESS:
+        sweeper = asyncio.create_task(
+            run_session_sweeper(
+                interval=settings.SESSION_SWEEPER_INTERVAL_SECONDS,
+                batch_size=settings.SESSION_SWEEPER_BATCH_SIZE,
+            )
+        )
+    monitor = None
+    if replica_set.replicas:
+        await replica_set.check()
+        monitor = asyncio.create_task(
+            run_replica_monitor(
+                replica_set, interval=settings.DATABASE_REPLICA_CHECK_SECONDS
+            )
+        )
+    key_refresher = None
+    if settings.OAUTH_GOOGLE_CLIENT_ID:
+        # Fetches the keys right away, so startup does not wait on Google.
+        key_refresher = asyncio.create_task(google_verifier.run())
+    relay = sink = None
+    if settings.OUTBOX_RELAY_IN_PROCESS:
+        sink = build_sink()
+        relay = asyncio.create_task(
+            run_outbox_relay(
+                sink,
+                interval=settings.OUTBOX_RELAY_INTERVAL_SECONDS,
+                batch_size=settings.OUTBOX_RELAY_BATCH_SIZE,
+            )
+        )
     yield
     # Shutdown
+    for task in (sweeper, monitor, key_refresher, relay):
+        if task is not None:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+    if sink is not None:
+        await sink.close()
+    await replica_set.dispose()
 
 
 app = FastAPI(**app_configs, lifespan=lifespan)
@@ -29,6 +78,10 @@ app.add_middleware(
     allow_methods=("GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"),
     allow_headers=settings.CORS_HEADERS,
 )
+app.add_middleware(DbTimingMiddleware)
+install_pool_timeout_handler(app)
+if replica_set.replicas:
+    app.add_middleware(ReadYourWritesMiddleware)
 
 if settings.ENVIRONMENT.is_deployed:
     sentry_sdk.init(
@@ -0,0 +1,67 @@
+"""Prometheus metrics.
+
+``prometheus-client`` ships in the prod dependency group only, so every
+metric degrades to a no-op when it is not installed (local runs, CI).
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import Any
+
+try:
+    import prometheus_client
+except ImportError:  # pragma: no cover - depends on the installed groups
+    prometheus_client = None
+
+
+class NoopMetric:
+    def labels(self, *_args: Any, **_kwargs: Any) -> NoopMetric:
+        return self
+
+    def inc(self, _amount: float = 1) -> None:
+        pass
+
+    def dec(self, _amount: float = 1) -> None:
+        pass
+
+    def set(self, _value: float) -> None:
+        pass
+
+    def observe(self, _value: float) -> None:
+        pass
+
+
+def counter(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Any:
+    if prometheus_client is None:
+        return NoopMetric()
+    return prometheus_client.Counter(name, documentation, labelnames)
+
+
+def gauge(
+    name: str,
+    documentation: str,
+    labelnames: Sequence[str] = (),
+    multiprocess_mode: str = "max",
+) -> Any:
+    if prometheus_client is None:
+        return NoopMetric()
+    return prometheus_client.Gauge(
+        name, documentation, labelnames, multiprocess_mode=multiprocess_mode
+    )
+
+
+def histogram(
+    name: str,
+    documentation: str,
+    labelnames: Sequence[str] = (),
+    buckets: Sequence[float] | None = None,
+) -> Any:
+    if prometheus_client is None:
+        return NoopMetric()
+    if buckets is None:
+        return prometheus_client.Histogram(name, documentation, labelnames)
+    return prometheus_client.Histogram(name, documentation, labelnames, buckets=buckets)
+
+
+__all__ = ["NoopMetric", "counter", "gauge", "histogram"]
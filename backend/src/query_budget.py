@@ -0,0 +1,130 @@
+"""Statement budgets for routes and service calls.
+
+A budget caps how many SQL statements a block may run and how often any one
+statement text may repeat, which is how an N+1 loop shows up. Routes
+declare theirs next to the decorator::
+
+    @router.get("/inventory", dependencies=[Depends(QueryBudget(3))])
+
+and service calls can be wrapped directly::
+
+    with query_budget(2, name="grant drop"):
+        await choose_cosmetic_drop(...)
+
+A route budget also covers its dependencies (authentication, tenant
+resolution). ``QUERY_BUDGETS`` decides what happens: ``off`` (the default)
+records nothing, ``log`` warns about each overrun, and ``raise`` raises
+:class:`QueryBudgetExceeded`. The test suite runs with ``raise``, and
+``tests/test_query_budgets.py`` calls every budgeted route there, as does
+``python -m benchmarks.query_budgets``.
+"""
+
+# No ``from __future__ import annotations``: FastAPI reads the annotations of
+# QueryBudget.__call__ and cannot resolve postponed ones on an instance.
+import logging
+from collections import Counter
+from collections.abc import AsyncIterator, Iterator
+from contextlib import AbstractContextManager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@dataclass
+class _Recorder:
+    statements: list[str] = field(default_factory=list)
+
+
+_recorders: ContextVar[tuple[_Recorder, ...]] = ContextVar(
+    "query_budget_recorders", default=()
+)
+
+
+def _record_statement(_conn, _cursor, statement, _parameters, _context, _many) -> None:
+    for recorder in _recorders.get():
+        recorder.statements.append(statement)
+
+
+def watch_query_budgets(engine: Engine) -> None:
+    """Feed the statements of ``engine`` (a sync engine) to active budgets."""
+    event.listen(engine, "before_cursor_execute", _record_statement)
+
+
+@dataclass(frozen=True)
+class QueryBudget:
+    """At most ``statements`` statements, each text at most ``repeats`` times."""
+
+    statements: int
+    repeats: int = 1
+
+    def violations(self, statements: list[str]) -> list[str]:
+        problems = []
+        if len(statements) > self.statements:
+            problems.append(
+                f"{len(statements)} statements, budget is {self.statements}"
+            )
+        for text, count in Counter(statements).most_common():
+            if count <= self.repeats:
+                break
+            problems.append(f"{count}x {' '.join(text.split())[:200]}")
+        return problems
+
+    @contextmanager
+    def track(self, name: str) -> Iterator[None]:
+        if settings.QUERY_BUDGETS == "off":
+            yield
+            return
+        with recorded_statements() as statements:
+            yield
+        if problems := self.violations(statements):
+            message = f"Query budget exceeded in {name}: " + "; ".join(problems)
+            if settings.QUERY_BUDGETS == "raise":
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+
+    async def __call__(self, request: Request) -> AsyncIterator[None]:
+        route = request.scope.get("route")
+        path = getattr(route, "path_format", request.url.path)
+        with self.track(f"{request.method} {path}"):
+            yield
+
+
+@contextmanager
+def recorded_statements() -> Iterator[list[str]]:
+    """Collect the statements run inside the block, whatever ``QUERY_BUDGETS``.
+
+    Budgets record through this; tests use it to pin exact counts.
+    """
+    recorder = _Recorder()
+    token = _recorders.set((*_recorders.get(), recorder))
+    try:
+        yield recorder.statements
+    finally:
+        _recorders.reset(token)
+
+
+def query_budget(
+    statements: int, *, repeats: int = 1, name: str = "block"
+) -> AbstractContextManager[None]:
+    """Enforce a :class:`QueryBudget` on a ``with`` block."""
+    return QueryBudget(statements, repeats).track(name)
+
+
+__all__ = [
+    "QueryBudget",
+    "QueryBudgetExceeded",
+    "query_budget",
+    "recorded_statements",
+    "watch_query_budgets",
+]
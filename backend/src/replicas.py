@@ -0,0 +1,267 @@
+"""Read replicas for read-only routes.
+
+Routes that only read take their session from :func:`get_read_session`
+instead of ``get_async_session``::
+
+    session: AsyncSession = Depends(get_read_session)
+
+It hands out a session on one of the ``DATABASE_REPLICA_URLS`` replicas
+(round robin) unless one of these holds, in which case it uses the primary:
+
+* no replica is configured, or none has reported a replay lag at or under
+  ``DATABASE_REPLICA_MAX_LAG_SECONDS`` yet. :func:`run_replica_monitor`
+  measures it every ``DATABASE_REPLICA_CHECK_SECONDS``; a replica that fails
+  the check is skipped until it passes again.
+* the caller committed a write on the primary in the last
+  ``DATABASE_REPLICA_STICKY_SECONDS`` (read-your-writes; 0 turns it off).
+  :class:`ReadYourWritesMiddleware` ties each request to its access token,
+  so one login's reads stay on the primary after its own writes. Like the
+  principal cache, this is per worker. A write on another worker is seen
+  once the replica catches up, which the lag bound keeps short.
+
+Authentication and tenant resolution keep using the primary session, so
+removed members and deactivated users are never authorized from a replica.
+Statement budgets and request timings cover the replica engines too.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import time
+from collections.abc import AsyncGenerator
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from fastapi import Request
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src import metrics
+from src.config import settings
+from src.database import async_session_factory, engine
+from src.db_timing import TimedAsyncQueuePool, instrument_engine
+from src.query_budget import watch_query_budgets
+
+logger = logging.getLogger(__name__)
+
+# Replay lag in seconds; 0 when everything received is replayed (an idle
+# primary does not make a replica stale) and NULL before anything was.
+REPLICA_LAG_SQL = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE extract(epoch FROM now() - pg_last_xact_replay_timestamp())
+    END
+    """
+)
+
+_WRITE_KEYWORDS = ("insert", "update", "delete", "merge", "with")
+
+READ_ROUTING = metrics.counter(
+    "db_read_routing_total",
+    "Read sessions handed out, by target and the reason for it.",
+    ["target", "reason"],
+)
+REPLICA_LAG_SECONDS = metrics.gauge(
+    "db_replica_lag_seconds",
+    "Replay lag of each read replica at the last check, -1 when it failed.",
+    ["replica"],
+)
+
+
+@dataclass
+class Replica:
+    name: str
+    engine: AsyncEngine
+    session_factory: async_sessionmaker[AsyncSession]
+    # None until a check succeeds, and again after one fails
+    lag_seconds: float | None = None
+
+    @property
+    def usable(self) -> bool:
+        return (
+            self.lag_seconds is not None
+            and self.lag_seconds <= settings.DATABASE_REPLICA_MAX_LAG_SECONDS
+        )
+
+
+class ReplicaSet:
+    def __init__(self, urls: list[str]) -> None:
+        self.replicas: list[Replica] = []
+        for index, url in enumerate(urls):
+            replica_engine = create_async_engine(
+                url,
+                poolclass=TimedAsyncQueuePool,
+                pool_size=settings.DATABASE_POOL_SIZE,
+                max_overflow=settings.DATABASE_POOL_MAX_OVERFLOW,
+                pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+                pool_recycle=settings.DATABASE_POOL_TTL,
+                pool_pre_ping=settings.DATABASE_POOL_PRE_PING,
+            )
+            instrument_engine(replica_engine.sync_engine)
+            watch_query_budgets(replica_engine.sync_engine)
+            self.replicas.append(
+                Replica(
+                    name=f"replica-{index}",
+                    engine=replica_engine,
+                    session_factory=async_sessionmaker(
+                        replica_engine, expire_on_commit=False
+                    ),
+                )
+            )
+        self._turn = itertools.count()
+
+    def choose(self) -> Replica | None:
+        usable = [replica for replica in self.replicas if replica.usable]
+        if not usable:
+            return None
+        return usable[next(self._turn) % len(usable)]
+
+    async def check(self) -> None:
+        for replica in self.replicas:
+            try:
+                async with replica.engine.connect() as connection:
+                    lag = await connection.scalar(REPLICA_LAG_SQL)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("Replica check failed for %s", replica.name)
+                lag = None
+            replica.lag_seconds = None if lag is None else float(lag)
+            REPLICA_LAG_SECONDS.labels(replica=replica.name).set(
+                -1 if lag is None else float(lag)
+            )
+
+    async def dispose(self) -> None:
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+
+replica_set = ReplicaSet([str(url) for url in settings.DATABASE_REPLICA_URLS])
+
+
+class RecentWriters:
+    """Access tokens that wrote on the primary, until their window ends."""
+
+    def __init__(self, max_entries: int = 10_000) -> None:
+        self.max_entries = max_entries
+        # In marking order, which is also expiry order.
+        self._until: dict[str, float] = {}
+
+    def mark(self, token: str) -> None:
+        sticky_seconds = settings.DATABASE_REPLICA_STICKY_SECONDS
+        if sticky_seconds <= 0:
+            return
+        now = time.monotonic()
+        self._until.pop(token, None)
+        self._until[token] = now + sticky_seconds
+        while self._until:
+            oldest = next(iter(self._until))
+            if self._until[oldest] > now and len(self._until) <= self.max_entries:
+                break
+            del self._until[oldest]
+
+    def wrote_recently(self, token: str | None) -> bool:
+        if token is None:
+            return False
+        until = self._until.get(token)
+        return until is not None and until > time.monotonic()
+
+
+recent_writers = RecentWriters()
+
+_request_token: ContextVar[str | None] = ContextVar(
+    "replica_request_token", default=None
+)
+
+
+def _access_token(connection: HTTPConnection) -> str | None:
+    # Same precedence as the fastapi-users backends: cookie, then bearer.
+    token = connection.cookies.get(settings.AUTH_COOKIE_ACCESS_NAME)
+    if token:
+        return token
+    scheme, _, credentials = connection.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and credentials:
+        return credentials
+    return None
+
+
+def _note_write(conn, _cursor, statement, _parameters, _context, _executemany) -> None:
+    if _request_token.get() is None:
+        return
+    # Data-modifying CTEs start with WITH; a read-only one only costs a mark.
+    if statement.lstrip()[:6].lower().startswith(_WRITE_KEYWORDS):
+        conn.info["replica_wrote"] = True
+
+
+def _mark_writer(connection) -> None:
+    token = _request_token.get()
+    if connection.info.pop("replica_wrote", False) and token is not None:
+        recent_writers.mark(token)
+
+
+def _forget_write(connection) -> None:
+    connection.info.pop("replica_wrote", None)
+
+
+event.listen(engine.sync_engine, "before_cursor_execute", _note_write)
+event.listen(engine.sync_engine, "commit", _mark_writer)
+event.listen(engine.sync_engine, "rollback", _forget_write)
+
+
+class ReadYourWritesMiddleware:
+    """Lets commits on the primary mark the request's access token."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = _request_token.set(_access_token(HTTPConnection(scope)))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_token.reset(token)
+
+
+async def get_read_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    if not replica_set.replicas:
+        factory, target, reason = async_session_factory, "primary", "no_replicas"
+    elif recent_writers.wrote_recently(_access_token(request)):
+        factory, target, reason = async_session_factory, "primary", "recent_write"
+    elif (replica := replica_set.choose()) is None:
+        factory, target, reason = async_session_factory, "primary", "lagging"
+    else:
+        factory, target, reason = replica.session_factory, "replica", "read_only"
+    READ_ROUTING.labels(target=target, reason=reason).inc()
+    async with factory() as session:
+        yield session
+
+
+async def run_replica_monitor(replicas: ReplicaSet, *, interval: float) -> None:
+    """Check replica lag every ``interval`` seconds, after the startup check."""
+    while True:
+        await asyncio.sleep(interval)
+        await replicas.check()
+
+
+__all__ = [
+    "ReadYourWritesMiddleware",
+    "ReplicaSet",
+    "get_read_session",
+    "recent_writers",
+    "replica_set",
+    "run_replica_monitor",
+]
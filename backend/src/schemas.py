@@ -9,7 +9,10 @@ def datetime_to_gmt_str(dt: datetime) -> str:
     if not dt.tzinfo:
         dt = dt.replace(tzinfo=ZoneInfo("UTC"))
 
-    return dt.strftime("%Y-%m-%dT%H:%M:%S%z")
+    # Same output as strftime("%Y-%m-%dT%H:%M:%S%z"), in about half the time;
+    # this runs for every datetime in every game response.
+    text = dt.isoformat(timespec="seconds")
+    return text[:19] + text[19:].replace(":", "")
 
 
 class CustomModel(BaseModel):
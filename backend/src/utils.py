@@ -4,7 +4,7 @@ import re
 import string
 from urllib.parse import urlencode, urljoin
 
-from sqlalchemy import select
+from sqlalchemy import func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.auth.models import Tenant
@@ -34,13 +34,23 @@ def _slugify(text: str) -> str:
     return text
 
 
-async def generate_unique_slug(session: AsyncSession, name: str) -> str:
+async def generate_unique_slug(
+    session: AsyncSession, name: str, *, lock: bool = False
+) -> str:
     """
     Generate a unique slug from a name, ensuring it doesn't already exist in the Tenant table.
 
+    The base slug and all of its ``-N`` variants are loaded in one query (a
+    prefix scan of ``ix_tenant_slug_pattern``) and the first free one is
+    picked in memory. A concurrent request can still take it before it is
+    inserted; ``TenantService.create_tenant_with_generated_slug`` retries
+    on that conflict with ``lock`` set.
+
     Args:
         session: The database session
         name: The name to generate a slug from
+        lock: Hold an advisory lock on the base slug until the transaction
+            ends, so picks made with it take turns and see each other's slugs
 
     Returns:
         A unique slug
@@ -50,16 +60,22 @@ async def generate_unique_slug(session: AsyncSession, name: str) -> str:
         # If slugification results in empty string, use a random slug
         base_slug = generate_random_alphanum(8)
 
-    slug = base_slug
-    counter = 1
+    if lock:
+        await session.execute(
+            select(func.pg_advisory_xact_lock(func.hashtext(base_slug)))
+        )
 
-    # Check if slug exists and append counter if needed
-    while True:
-        result = await session.execute(
-            select(Tenant).where(Tenant.slug == slug)
+    # Slugs are letters, digits and hyphens, so nothing needs LIKE escaping.
+    result = await session.execute(
+        select(Tenant.slug).where(
+            or_(Tenant.slug == base_slug, Tenant.slug.like(f"{base_slug}-%"))
         )
-        if result.scalar_one_or_none() is None:
-            break
+    )
+    taken = set(result.scalars())
+
+    slug = base_slug
+    counter = 1
+    while slug in taken:
         slug = f"{base_slug}-{counter}"
         counter += 1
 
@@ -0,0 +1,74 @@
+"""Fixtures for tests that drive the app in-process.
+
+The tests run against the database in ``DATABASE_ASYNC_URL``, migrated to
+head (``alembic upgrade head``); each one signs up its own player, so they
+can share a database with other data. Route budgets raise, so any request
+that overruns its ``QueryBudget`` fails the test that made it.
+"""
+
+import os
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from uuid import UUID, uuid4
+
+import httpx
+import pytest
+
+# Settings are read when src.config is first imported, by the fixtures below
+# or by the test modules, which conftest.py is loaded before.
+os.environ.setdefault("QUERY_BUDGETS", "raise")
+
+PASSWORD = "test-password-1"
+
+
+@dataclass
+class Player:
+    email: str
+    password: str
+    user_id: UUID
+    tenant_id: UUID
+    headers: dict[str, str]
+
+
+@pytest.fixture(scope="session")
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+@pytest.fixture(scope="session")
+async def client() -> AsyncIterator[httpx.AsyncClient]:
+    from src.database import engine
+    from src.main import app
+
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            yield client
+    await engine.dispose()
+
+
+@pytest.fixture
+async def player(client: httpx.AsyncClient) -> Player:
+    """A new account with its own organization, authenticated by header."""
+    suffix = uuid4().hex[:12]
+    email = f"test-{suffix}@example.com"
+    response = await client.post(
+        "/api/signup",
+        json={
+            "email": email,
+            "password": PASSWORD,
+            "organization_name": f"Test {suffix}",
+        },
+    )
+    response.raise_for_status()
+    # Requests authenticate by header only, like the mobile clients.
+    client.cookies.clear()
+    body = response.json()
+    return Player(
+        email=email,
+        password=PASSWORD,
+        user_id=UUID(body["user"]["id"]),
+        tenant_id=UUID(body["user"]["active_organization_id"]),
+        headers={"Authorization": f"Bearer {body['access_token']}"},
+    )
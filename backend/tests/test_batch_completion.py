@@ -0,0 +1,73 @@
+"""Batch completion judges each queued session like POST /session/complete."""
+
+import pytest
+from sqlalchemy import text
+
+from src.database import engine
+from src.game.enums import Room, SessionStatus
+
+pytestmark = pytest.mark.anyio
+
+# Stands in for the sweeper, which would time out everyone's sessions.
+TIME_OUT_SQL = text(
+    f"""
+    UPDATE sessions
+    SET status = '{SessionStatus.TIMEOUT.value}', ended_at = now(),
+        started_at = now() - interval '2 hours'
+    WHERE id = ANY(CAST(:session_ids AS uuid[]))
+    """
+)
+FINISH_SQL = text(
+    """
+    UPDATE sessions SET started_at = now() - interval '30 minutes'
+    WHERE id = ANY(CAST(:session_ids AS uuid[]))
+    """
+)
+
+
+async def start_sessions(client, player, template_id, count: int) -> list[str]:
+    session_ids = []
+    for _ in range(count):
+        response = await client.post(
+            "/api/session/start",
+            json={"task_template_id": template_id, "duration_minutes": 25},
+            headers=player.headers,
+        )
+        response.raise_for_status()
+        session_ids.append(response.json()["session_id"])
+    return session_ids
+
+
+async def test_timed_out_sessions_are_not_paid_out(client, player):
+    response = await client.post(
+        "/api/tasks",
+        json={"name": "Batch", "default_duration_minutes": 25, "room": Room.STUDY},
+        headers=player.headers,
+    )
+    response.raise_for_status()
+    template_id = response.json()["id"]
+
+    # Abandoned, then timed out, which frees the in-progress limit for more.
+    timed_out = await start_sessions(client, player, template_id, 2)
+    async with engine.begin() as connection:
+        await connection.execute(TIME_OUT_SQL, {"session_ids": timed_out})
+    finished = await start_sessions(client, player, template_id, 2)
+    async with engine.begin() as connection:
+        await connection.execute(FINISH_SQL, {"session_ids": finished})
+
+    response = await client.post(
+        "/api/session/complete/batch",
+        json={"session_ids": [*timed_out, *finished]},
+        headers=player.headers,
+    )
+
+    assert response.status_code == 200
+    statuses = {
+        result["session_id"]: result["status_code"]
+        for result in response.json()["results"]
+    }
+    assert statuses == {
+        **dict.fromkeys(timed_out, 409),
+        **dict.fromkeys(finished, 200),
+    }
+    assert response.json()["world_state"]["total_sessions_success"] == 2
@@ -0,0 +1,53 @@
+"""Polled endpoints answer a matching If-None-Match with 304 and no body."""
+
+import pytest
+
+from src.query_budget import recorded_statements
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_profile_not_modified(client, player):
+    response = await client.get("/api/profile", headers=player.headers)
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+
+    with recorded_statements() as statements:
+        response = await client.get(
+            "/api/profile", headers={**player.headers, "If-None-Match": etag}
+        )
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert response.content == b""
+    # Only the request context; nothing is built for a 304.
+    assert len(statements) == 1
+
+
+async def test_profile_etag_changes_with_the_profile(client, player):
+    response = await client.get("/api/profile", headers=player.headers)
+    etag = response.headers["etag"]
+
+    (
+        await client.patch(
+            "/api/profile", json={"full_name": "Renamed"}, headers=player.headers
+        )
+    ).raise_for_status()
+    response = await client.get(
+        "/api/profile", headers={**player.headers, "If-None-Match": etag}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert response.json()["full_name"] == "Renamed"
+
+
+async def test_world_state_not_modified(client, player):
+    response = await client.get("/api/worldstate", headers=player.headers)
+    etag = response.headers["etag"]
+
+    response = await client.get(
+        "/api/worldstate", headers={**player.headers, "If-None-Match": etag}
+    )
+
+    assert response.status_code == 304
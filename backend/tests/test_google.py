@@ -0,0 +1,78 @@
+"""Google ID-token verification while the key server fails."""
+
+import time
+
+import httpx
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from src.auth.security import google
+from src.auth.security.google import (
+    GoogleIdTokenVerifier,
+    GoogleKeysUnavailable,
+    GoogleTokenError,
+)
+
+pytestmark = pytest.mark.anyio
+
+CLIENT_ID = "test-client.apps.googleusercontent.com"
+KID = "current"
+KEY = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+def token(kid: str) -> str:
+    now = int(time.time())
+    claims = {
+        "iss": "https://accounts.google.com",
+        "aud": CLIENT_ID,
+        "sub": "google-user",
+        "iat": now - 10,
+        "exp": now + 3600,
+    }
+    return jwt.encode(claims, KEY, algorithm="RS256", headers={"kid": kid})
+
+
+class KeyServer:
+    def __init__(self) -> None:
+        self.failing = False
+
+    def __call__(self, _request: httpx.Request) -> httpx.Response:
+        if self.failing:
+            return httpx.Response(503)
+        jwk = jwt.algorithms.RSAAlgorithm.to_jwk(KEY.public_key(), as_dict=True)
+        return httpx.Response(200, json={"keys": [{**jwk, "kid": KID}]})
+
+
+@pytest.fixture
+def server(monkeypatch) -> KeyServer:
+    # Every unknown key id may fetch.
+    monkeypatch.setattr(google, "MIN_REFRESH_SECONDS", 0)
+    return KeyServer()
+
+
+@pytest.fixture
+def verifier(server) -> GoogleIdTokenVerifier:
+    return GoogleIdTokenVerifier(
+        "https://keys.test/certs", transport=httpx.MockTransport(server)
+    )
+
+
+async def test_no_keys_is_an_outage(server, verifier):
+    server.failing = True
+    with pytest.raises(GoogleKeysUnavailable):
+        await verifier.verify(token(KID), CLIENT_ID)
+
+
+async def test_cached_keys_verify_during_an_outage(server, verifier):
+    await verifier.refresh()
+    server.failing = True
+    claims = await verifier.verify(token(KID), CLIENT_ID)
+    assert claims["aud"] == CLIENT_ID
+
+
+async def test_unknown_key_during_an_outage_is_a_bad_token(server, verifier):
+    await verifier.refresh()
+    server.failing = True
+    with pytest.raises(GoogleTokenError):
+        await verifier.verify(token("made-up"), CLIENT_ID)
@@ -0,0 +1,92 @@
+"""Level curves agree with the level-by-level loop they replaced."""
+
+import random
+from collections.abc import Callable
+
+import pytest
+
+from src.game.levels import EXP_PER_LEVEL, LevelCurve, LinearCurve, TabulatedCurve
+
+SEEDS = range(20)
+GRANTS_PER_SEED = 500
+
+
+def loop_add_exp(
+    exp_to_next: Callable[[int], int], level: int, exp: int, gained: int
+) -> tuple[int, int]:
+    exp += gained
+    while exp >= exp_to_next(level):
+        exp -= exp_to_next(level)
+        level += 1
+    return level, exp
+
+
+def linear_exp_to_next(level: int) -> int:
+    return max(level, 1) * EXP_PER_LEVEL
+
+
+def quadratic_exp_to_next(level: int) -> int:
+    return 25 * level * level + 75
+
+
+CURVES = {
+    "linear": (lambda: LinearCurve(EXP_PER_LEVEL), linear_exp_to_next),
+    "tabulated_linear": (
+        lambda: TabulatedCurve(linear_exp_to_next),
+        linear_exp_to_next,
+    ),
+    "tabulated_quadratic": (
+        lambda: TabulatedCurve(quadratic_exp_to_next),
+        quadratic_exp_to_next,
+    ),
+}
+
+
+@pytest.fixture(params=list(CURVES))
+def curve(request) -> tuple[LevelCurve, Callable[[int], int]]:
+    make, exp_to_next = CURVES[request.param]
+    return make(), exp_to_next
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_random_grants_match_loop(curve, seed):
+    level_curve, exp_to_next = curve
+    rng = random.Random(seed)
+    for _ in range(GRANTS_PER_SEED):
+        level = rng.randint(1, 500)
+        exp = rng.randrange(exp_to_next(level))
+        gained = rng.choice(
+            [rng.randrange(100), rng.randrange(10_000), rng.randrange(10_000_000)]
+        )
+        assert level_curve.add_exp(level, exp, gained) == loop_add_exp(
+            exp_to_next, level, exp, gained
+        ), (level, exp, gained)
+
+
+def test_new_hero_starts_at_level_one(curve):
+    level_curve, _ = curve
+    assert level_curve.total_for_level(1) == 0
+    assert level_curve.level_for_total(0) == (1, 0)
+    assert level_curve.add_exp(1, 0, 0) == (1, 0)
+
+
+@pytest.mark.parametrize("level", [1, 2, 37, 500])
+def test_zero_grant_keeps_level_and_exp(curve, level):
+    level_curve, exp_to_next = curve
+    assert level_curve.add_exp(level, 0, 0) == (level, 0)
+    last = exp_to_next(level) - 1
+    assert level_curve.add_exp(level, last, 0) == (level, last)
+
+
+@pytest.mark.parametrize("level", [1, 2, 37, 500])
+def test_grant_on_threshold_reaches_next_level(curve, level):
+    level_curve, exp_to_next = curve
+    needed = exp_to_next(level)
+    assert level_curve.add_exp(level, 0, needed - 1) == (level, needed - 1)
+    assert level_curve.add_exp(level, 0, needed) == (level + 1, 0)
+    assert level_curve.add_exp(level, 1, needed - 1) == (level + 1, 0)
+
+
+def test_level_below_one_counts_as_one(curve):
+    level_curve, _ = curve
+    assert level_curve.add_exp(0, 0, 50) == level_curve.add_exp(1, 0, 50)
@@ -0,0 +1,54 @@
+"""Outbox writers hold the hero lock, so a user's event ids follow commits."""
+
+import asyncio
+
+import pytest
+from sqlalchemy import text
+
+from src.database import engine
+from src.game.enums import Room, SessionStatus
+
+pytestmark = pytest.mark.anyio
+
+LOCK_HERO_SQL = text(
+    "SELECT id FROM heroes WHERE tenant_id = :tenant_id AND user_id = :user_id "
+    "FOR UPDATE"
+)
+
+
+async def test_cancel_waits_for_the_hero_lock(client, player):
+    response = await client.post(
+        "/api/tasks",
+        json={"name": "Outbox", "default_duration_minutes": 25, "room": Room.STUDY},
+        headers=player.headers,
+    )
+    response.raise_for_status()
+    response = await client.post(
+        "/api/session/start",
+        json={"task_template_id": response.json()["id"], "duration_minutes": 25},
+        headers=player.headers,
+    )
+    response.raise_for_status()
+    session_id = response.json()["session_id"]
+    (await client.get("/api/worldstate", headers=player.headers)).raise_for_status()
+
+    async with engine.connect() as connection:
+        transaction = await connection.begin()
+        await connection.execute(
+            LOCK_HERO_SQL,
+            {"tenant_id": player.tenant_id, "user_id": player.user_id},
+        )
+        cancel = asyncio.create_task(
+            client.post(
+                "/api/session/cancel",
+                json={"session_id": session_id},
+                headers=player.headers,
+            )
+        )
+        await asyncio.sleep(0.3)
+        assert not cancel.done()
+        await transaction.commit()
+
+    response = await cancel
+    assert response.status_code == 200
+    assert response.json()["status"] == SessionStatus.CANCEL
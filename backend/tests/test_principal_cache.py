@@ -0,0 +1,70 @@
+"""The principal cache hands the same context to every request of a token."""
+
+import dataclasses
+from datetime import UTC, datetime
+from uuid import uuid4
+
+import pytest
+
+from src.auth.dependencies import (
+    MembershipSnapshot,
+    RequestContext,
+    TenantSnapshot,
+    UserSnapshot,
+)
+from src.auth.models import UserTenantRole
+from src.auth.principal_cache import PrincipalCache
+
+NOW = datetime(2026, 10, 18, tzinfo=UTC)
+
+
+def make_context(*tenant_ids) -> RequestContext:
+    return RequestContext(
+        user=UserSnapshot(
+            id=uuid4(),
+            email="cached@example.com",
+            full_name="Cached",
+            profile_picture=None,
+            is_active=True,
+            created_at=NOW,
+            updated_at=NOW,
+        ),
+        memberships=tuple(
+            MembershipSnapshot(
+                tenant=TenantSnapshot(
+                    id=tenant_id,
+                    name="Tenant",
+                    slug=f"tenant-{tenant_id.hex[:8]}",
+                    business_image=None,
+                    created_at=NOW,
+                ),
+                role=UserTenantRole.OWNER,
+                is_default=index == 0,
+            )
+            for index, tenant_id in enumerate(tenant_ids)
+        ),
+    )
+
+
+def test_cached_context_is_immutable():
+    cache = PrincipalCache(enabled=True, ttl_seconds=60, max_entries=10)
+    cache.put("token", make_context(uuid4()), token_expires_at=None)
+    context = cache.get("token")
+
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        context.user.is_active = False
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        context.memberships[0].tenant.name = "Renamed"
+    assert cache.get("token") is context
+
+
+def test_invalidate_tenant_drops_its_members_only():
+    cache = PrincipalCache(enabled=True, ttl_seconds=60, max_entries=10)
+    tenant_id, other_id = uuid4(), uuid4()
+    cache.put("member", make_context(other_id, tenant_id), token_expires_at=None)
+    cache.put("outsider", make_context(other_id), token_expires_at=None)
+
+    cache.invalidate_tenant(tenant_id)
+
+    assert cache.get("member") is None
+    assert cache.get("outsider") is not None
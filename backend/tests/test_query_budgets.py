@@ -0,0 +1,34 @@
+"""Every budgeted route stays within its ``QueryBudget``.
+
+Plays the rounds of ``python -m benchmarks.query_budgets``, so a route that
+grows an N+1 query fails here as the player's data grows between rounds.
+"""
+
+import pytest
+
+from benchmarks.query_budgets import Driver, declared_budgets, give_items, play_round
+from src.config import settings
+from src.game import completion
+
+pytestmark = pytest.mark.anyio
+
+ROUNDS = 3
+ITEMS = 5
+
+
+async def test_routes_stay_within_budget(client, monkeypatch):
+    assert settings.QUERY_BUDGETS == "raise"
+    # Every completion drops an item, the path with the most statements.
+    monkeypatch.setattr(completion, "DROP_CHANCE", 1.0)
+    checks = declared_budgets()
+    driver = Driver(client, checks)
+    await driver.sign_up()
+    item_ids = await give_items(driver.user_id, driver.tenant_id, ITEMS)
+    for round_number in range(ROUNDS):
+        await play_round(driver, round_number, item_ids)
+
+    budgeted = {route: check for route, check in checks.items() if check.budget}
+    assert {route: check.overruns for route, check in budgeted.items()} == {
+        route: [] for route in budgeted
+    }
+    assert [route for route, check in budgeted.items() if not check.calls] == []
@@ -0,0 +1,31 @@
+"""Read-your-writes stickiness after a write on the primary."""
+
+import pytest
+
+# As in the app: src.database loads the routers, which import src.replicas.
+import src.database  # noqa: F401
+from src.config import settings
+from src.replicas import RecentWriters
+
+
+@pytest.mark.parametrize("sticky_seconds", [0, -1])
+def test_stickiness_off_marks_nothing(monkeypatch, sticky_seconds):
+    monkeypatch.setattr(settings, "DATABASE_REPLICA_STICKY_SECONDS", sticky_seconds)
+    writers = RecentWriters()
+
+    writers.mark("token")
+    writers.mark("token")
+
+    assert not writers.wrote_recently("token")
+
+
+def test_marks_until_the_window_ends(monkeypatch):
+    monkeypatch.setattr(settings, "DATABASE_REPLICA_STICKY_SECONDS", 60)
+    writers = RecentWriters(max_entries=2)
+
+    for token in ("first", "second", "third"):
+        writers.mark(token)
+
+    assert not writers.wrote_recently("first")
+    assert writers.wrote_recently("second")
+    assert writers.wrote_recently("third")
@@ -0,0 +1,91 @@
+"""Statements per request for authenticated endpoints.
+
+Authentication, memberships and tenant resolution are one statement, shared
+by ``CurrentUser`` and ``current_tenant`` (they used to be three). The
+counts below are exact, so a change that adds a statement to any of these
+routes has to update them on purpose.
+"""
+
+import pytest
+from sqlalchemy import text
+
+from src.auth.principal_cache import principal_cache
+from src.database import engine
+from src.query_budget import recorded_statements
+
+pytestmark = pytest.mark.anyio
+
+STATEMENTS = {
+    "/api/profile": 1,
+    "/api/worldstate": 2,
+    "/api/sessions/history": 2,
+    "/api/tasks": 2,
+    "/api/stats/heatmap": 2,
+    "/api/inventory": 3,
+    "/api/leaderboard": 3,
+}
+
+
+def is_request_context(statement: str) -> bool:
+    # The only statement of these routes that reads memberships.
+    return "user_tenant" in statement
+
+
+@pytest.fixture
+async def settled(client, player):
+    # The first game request creates the hero and world state.
+    (await client.get("/api/worldstate", headers=player.headers)).raise_for_status()
+    return player
+
+
+@pytest.mark.parametrize(("path", "expected"), STATEMENTS.items())
+async def test_statements_per_endpoint(client, settled, path, expected):
+    with recorded_statements() as statements:
+        response = await client.get(path, headers=settled.headers)
+
+    assert response.status_code == 200
+    assert len(statements) == expected, statements
+    assert sum(map(is_request_context, statements)) == 1
+
+
+@pytest.mark.parametrize("path", STATEMENTS)
+async def test_principal_cache_skips_the_context_query(
+    client, settled, path, monkeypatch
+):
+    monkeypatch.setattr(principal_cache, "enabled", True)
+    (await client.get(path, headers=settled.headers)).raise_for_status()
+
+    with recorded_statements() as statements:
+        response = await client.get(path, headers=settled.headers)
+
+    assert response.status_code == 200
+    assert len(statements) == STATEMENTS[path] - 1
+    assert not any(map(is_request_context, statements))
+
+
+async def test_unauthenticated_request_runs_no_statements(client):
+    with recorded_statements() as statements:
+        response = await client.get("/api/worldstate")
+
+    assert response.status_code == 401
+    assert statements == []
+
+
+async def test_inactive_user_is_forbidden_like_current_active_user(client, player):
+    async with engine.begin() as connection:
+        await connection.execute(
+            text('UPDATE "user" SET is_active = false WHERE id = :user_id'),
+            {"user_id": player.user_id},
+        )
+
+    # PATCH /api/profile still authenticates through current_active_user.
+    responses = [
+        await client.get("/api/profile", headers=player.headers),
+        await client.get("/api/worldstate", headers=player.headers),
+        await client.patch("/api/profile", json={}, headers=player.headers),
+    ]
+
+    assert [response.status_code for response in responses] == [403] * 3
+    assert {response.json()["detail"] for response in responses} == {
+        "User account is inactive."
+    }
@@ -0,0 +1,33 @@
+"""UserManager's copies of fastapi-users methods."""
+
+import fastapi_users
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+def test_fastapi_users_is_the_release_the_methods_were_copied_from():
+    # See the UserManager docstring before changing this.
+    assert fastapi_users.__version__ == "14.0.2"
+
+
+async def test_signin_verifies_the_password(client, player):
+    response = await client.post(
+        "/api/signin", json={"email": player.email, "password": player.password}
+    )
+    client.cookies.clear()
+    assert response.status_code == 200
+
+    response = await client.post(
+        "/api/signin", json={"email": player.email, "password": "wrong-password-1"}
+    )
+    assert response.status_code == 400
+
+
+async def test_signin_with_unknown_email_fails(client):
+    response = await client.post(
+        "/api/signin",
+        json={"email": "nobody-here@example.com", "password": "any-password-1"},
+    )
+
+    assert response.status_code == 400